@@ -0,0 +1,140 @@
+"""
+Benchmark /api/validate throughput against concurrent clients
+Starts the API with uvicorn on a scratch copy of the database, then drives
+it with 1..N concurrent clients. While they run, a probe times /health to
+show whether the event loop stays responsive under load.
+
+Usage: python benchmark_concurrency.py [requests_per_level]
+"""
+
+import sys
+import os
+import asyncio
+import csv
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from utils.auth import create_access_token
+
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32]
+REQUESTS_PER_LEVEL = 200
+ADDRESS_FIELDS = ('house_no', 'street', 'locality', 'city', 'district', 'state', 'pin', 'digipin')
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_requests():
+    path = os.path.join(BACKEND_DIR, "data", "ground_truth_test_set.csv")
+    with open(path, 'r', encoding='utf-8') as f:
+        addresses = [{field: row[field] for field in ADDRESS_FIELDS} for row in csv.DictReader(f)]
+    return [{"user_id": "bench", "address": address, "consent": {"purpose": "benchmark"}} for address in addresses]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", VALIDATION_WORKERS="0")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 120.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("API did not start")
+
+
+async def run_level(client: httpx.AsyncClient, bodies, concurrency: int, total: int):
+    """Returns (requests/s, p50 ms, p95 ms, worst /health ms, errors)"""
+    pending = iter(range(total))
+    latencies, errors = [], 0
+    done = asyncio.Event()
+
+    async def validate_client():
+        nonlocal errors
+        for i in pending:
+            start = time.perf_counter()
+            response = await client.post("/api/validate", json=bodies[i % len(bodies)])
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    async def health_probe():
+        worst = 0.0
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            worst = max(worst, time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+        return worst
+
+    probe = asyncio.create_task(health_probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(validate_client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    worst_health = await probe
+
+    latencies.sort()
+    return (total / elapsed, latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.95)] * 1000, worst_health * 1000, errors)
+
+
+async def run(port: int, total: int):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench_user'})}"}
+    limits = httpx.Limits(max_connections=max(CONCURRENCY_LEVELS) + 1)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", headers=headers,
+                                 limits=limits, timeout=120.0) as client:
+        await wait_until_up(client)
+        bodies = load_requests()
+        await run_level(client, bodies, 1, 20)  # Warm caches
+
+        print(f"{'clients':>8} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'/health max ms':>16} {'errors':>8}")
+        for concurrency in CONCURRENCY_LEVELS:
+            rps, p50, p95, health, errors = await run_level(client, bodies, concurrency, total)
+            print(f"{concurrency:>8} {rps:>10,.1f} {p50:>10.1f} {p95:>10.1f} {health:>16.1f} {errors:>8}")
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS_PER_LEVEL
+
+    print("\n" + "="*70)
+    print(" /api/validate Throughput vs Concurrent Clients".center(70))
+    print("="*70 + "\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "benchmark.db")
+        shutil.copy(os.path.join(BACKEND_DIR, "validation.db"), db_path)
+        port = free_port()
+        server = start_server(db_path, port)
+        try:
+            asyncio.run(run(port, total))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print("\n" + "="*70)
+
+
+if __name__ == "__main__":
+    main()
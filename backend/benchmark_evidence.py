@@ -0,0 +1,226 @@
+"""
+Benchmark evidence lookup latency as the delivery / IoT logs grow
+Run this to check that per-request cost stays flat with history size
+"""
+
+import sys
+import os
+import time
+import random
+import subprocess
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from evidence_aggregator import EvidenceAggregator, DELIVERY_COLUMNS, IOT_COLUMNS
+from utils.evidence_store import ColumnarEvidenceStore
+from utils.geospatial import LANDMARK_RADIUS_M
+from utils.spatial_index import GridSpatialIndex
+from utils.reverse_geocode import ReverseGeocoder
+
+import numpy as np
+
+
+ROWS_PER_DIGIPIN = 20
+DATASET_SIZES = [10_000, 100_000, 1_000_000]
+LOOKUPS = 500
+LANDMARK_COUNTS = [10_000, 100_000, 1_000_000]
+GEOCODE_CELL_COUNTS = [100_000, 1_000_000, 3_000_000]
+GEOCODE_QUERIES = 5_000
+
+
+def make_synthetic_logs(total_rows: int):
+    """Build delivery and IoT rows spread over total_rows / ROWS_PER_DIGIPIN DIGIPINs"""
+    digipin_count = max(1, total_rows // ROWS_PER_DIGIPIN)
+    digipins = [f"BM{i:06d}-XX" for i in range(digipin_count)]
+    now = datetime.now()
+
+    grid = [
+        {"digipin": d, "lat": "10.5", "long": "76.2", "locality": "Bench Nagar",
+         "city": "Thrissur", "district": "Thrissur", "state": "Kerala", "pin": "680001"}
+        for d in digipins
+    ]
+    deliveries = []
+    for i in range(total_rows):
+        digipin = digipins[i % digipin_count]
+        day = now - timedelta(days=random.randint(0, 120))
+        deliveries.append({"digipin": digipin, "delivery_date": day.date().isoformat(), "delivery_count": "1"})
+    return digipins, grid, deliveries
+
+
+def build_stores(deliveries):
+    """Load the synthetic rows into columnar delivery and IoT stores"""
+    digipins = [d["digipin"] for d in deliveries]
+    dates = [d["delivery_date"] for d in deliveries]
+    count = len(deliveries)
+
+    delivery_store = ColumnarEvidenceStore.from_values(
+        digipins, dates, {"delivery_count": [1] * count},
+        "delivery_date", "D", DELIVERY_COLUMNS
+    )
+    iot_store = ColumnarEvidenceStore.from_values(
+        digipins, dates,
+        {"lat": [10.5] * count, "long": [76.2] * count, "signal_strength": [80] * count},
+        "timestamp", "s", IOT_COLUMNS
+    )
+    return delivery_store, iot_store
+
+
+def time_lookups(aggregator: EvidenceAggregator, digipins) -> float:
+    """Average warm latency (microseconds) of the DIGIPIN-keyed evidence providers"""
+    sample = random.sample(digipins, min(LOOKUPS, len(digipins)))
+    addresses = [{"digipin": d, "locality": "bench nagar", "city": "thrissur", "pin": "680001"} for d in sample]
+
+    # First touch seeds each DIGIPIN's rolling aggregates; time the steady state
+    for address in addresses:
+        aggregator.get_temporal_evidence(address)
+
+    start = time.perf_counter()
+    for address in addresses:
+        aggregator.get_temporal_evidence(address)
+        aggregator.get_iot_evidence(address)
+        aggregator.get_temporal_decay_evidence(address)
+    return (time.perf_counter() - start) / len(addresses) * 1e6
+
+
+def time_single_address_history(aggregator: EvidenceAggregator, history: int) -> float:
+    """Warm temporal scoring latency (microseconds) for one DIGIPIN with `history` deliveries"""
+    _, grid, deliveries = make_synthetic_logs(history)
+    for row in deliveries:
+        row["digipin"] = grid[0]["digipin"]
+    aggregator.digipin_data = grid[:1]
+    aggregator.deliveries, aggregator.iot_pings = build_stores(deliveries)
+    aggregator.build_indexes()
+    return time_lookups(aggregator, [grid[0]["digipin"]])
+
+
+def time_linear_scan(rows, digipins) -> float:
+    """Average latency (microseconds) of the old full-scan lookup, for reference"""
+    sample = random.sample(digipins, min(20, len(digipins)))
+    start = time.perf_counter()
+    for digipin in sample:
+        [r for r in rows if r.get('digipin') == digipin]
+    return (time.perf_counter() - start) / len(sample) * 1e6
+
+
+def time_landmark_queries(count: int):
+    """Grid build time (ms) and average radius query latency (microseconds) over `count` landmarks"""
+    rng = np.random.default_rng(count)
+    # Landmarks clustered around 200 synthetic towns across India
+    towns = np.column_stack([rng.uniform(8, 35, 200), rng.uniform(68, 97, 200)])
+    picks = towns[rng.integers(0, len(towns), count)]
+    lats = picks[:, 0] + rng.normal(0, 0.05, count)
+    lons = picks[:, 1] + rng.normal(0, 0.05, count)
+
+    start = time.perf_counter()
+    index = GridSpatialIndex.from_points(lats, lons, np.arange(count).astype(str))
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = picks[rng.integers(0, count, LOOKUPS)] + rng.normal(0, 0.05, (LOOKUPS, 2))
+    start = time.perf_counter()
+    for lat, lon in queries:
+        index.within(lat, lon, LANDMARK_RADIUS_M)
+    return build_ms, (time.perf_counter() - start) / LOOKUPS * 1e6
+
+
+def time_reverse_geocode(cell_count: int):
+    """Index build time (ms) and p50 / p99 reverse-geocode latency (microseconds) over `cell_count` known cells"""
+    rng = np.random.default_rng(cell_count)
+    towns = np.column_stack([rng.uniform(8, 35, 500), rng.uniform(68, 97, 500)])
+    picks = towns[rng.integers(0, len(towns), cell_count)]
+    lats = picks[:, 0] + rng.normal(0, 0.1, cell_count)
+    lons = picks[:, 1] + rng.normal(0, 0.1, cell_count)
+    cells = {f"C{i}": {"lat": lat, "long": lon} for i, (lat, lon) in enumerate(zip(lats, lons))}
+    pins = {f"{500000 + i}": {"lat": lat, "long": lon} for i, (lat, lon) in enumerate(towns)}
+
+    start = time.perf_counter()
+    geocoder = ReverseGeocoder(cells, pins)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = picks[rng.integers(0, cell_count, GEOCODE_QUERIES)] + rng.normal(0, 0.1, (GEOCODE_QUERIES, 2))
+    latencies = []
+    for lat, lon in queries:
+        start = time.perf_counter()
+        geocoder.reverse(lat, lon)
+        latencies.append(time.perf_counter() - start)
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    return build_ms, p50, p99
+
+
+STARTUP_SCENARIOS = {
+    "per-router engines (old)": "ScoringEngine(); ScoringEngine()",
+    "shared context": "evidence_context.warmup(); evidence_context.get_scoring_engine()",
+}
+
+STARTUP_PROBE = """
+import os, time
+import evidence_context
+from scoring_engine import ScoringEngine
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+before = rss_bytes()
+start = time.perf_counter()
+{setup}
+print(time.perf_counter() - start, rss_bytes() - before)
+"""
+
+
+def measure_startup():
+    """Evidence load time and RSS growth of each scenario, each in a fresh interpreter"""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for name, setup in STARTUP_SCENARIOS.items():
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE.format(setup=setup)],
+            cwd=backend_dir, capture_output=True, text=True, check=True
+        ).stdout.split()
+        results[name] = (float(output[-2]), int(output[-1]))
+    return results
+
+
+def main():
+    print("\n" + "="*70)
+    print(" Evidence Lookup Latency vs Dataset Size".center(70))
+    print("="*70 + "\n")
+
+    aggregator = EvidenceAggregator()
+
+    print(f"{'rows':>12} {'indexed (us/req)':>20} {'linear scan (us/req)':>24} {'bytes/row':>12}")
+    for size in DATASET_SIZES:
+        digipins, grid, deliveries = make_synthetic_logs(size)
+        aggregator.digipin_data = grid
+        aggregator.deliveries, aggregator.iot_pings = build_stores(deliveries)
+        aggregator.build_indexes()
+
+        indexed = time_lookups(aggregator, digipins)
+        linear = time_linear_scan(deliveries, digipins)
+        bytes_per_row = aggregator.deliveries.nbytes() / size
+        print(f"{size:>12,} {indexed:>20.1f} {linear:>24.1f} {bytes_per_row:>12.1f}")
+
+    print(f"\n{'deliveries at one address':>26} {'temporal scoring (us/req)':>28}")
+    for history in (10, 1_000, 100_000):
+        print(f"{history:>26,} {time_single_address_history(aggregator, history):>28.1f}")
+
+    print(f"\n{'landmarks':>12} {'grid build (ms)':>18} {f'within {LANDMARK_RADIUS_M:.0f} m (us/req)':>26}")
+    for count in LANDMARK_COUNTS:
+        build_ms, query_us = time_landmark_queries(count)
+        print(f"{count:>12,} {build_ms:>18.1f} {query_us:>26.1f}")
+
+    print(f"\n{'known cells':>12} {'index build (ms)':>18} {'reverse p50 (us)':>18} {'reverse p99 (us)':>18}")
+    for count in GEOCODE_CELL_COUNTS:
+        build_ms, p50, p99 = time_reverse_geocode(count)
+        print(f"{count:>12,} {build_ms:>18.1f} {p50:>18.1f} {p99:>18.1f}")
+
+    print(f"\n{'startup':<28} {'load (ms)':>12} {'RSS growth (MB)':>18}")
+    for name, (seconds, rss_growth) in measure_startup().items():
+        print(f"{name:<28} {seconds * 1000:>12.1f} {rss_growth / 2**20:>18.2f}")
+
+    print("\n" + "="*70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark batch scoring against the per-address calculate_acs loop
+Run this to check the throughput of calculate_acs_batch for bulk onboarding
+"""
+
+import sys
+import os
+import csv
+import random
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scoring_engine import ScoringEngine
+
+
+BATCH_SIZES = [1_000, 10_000, 50_000]
+ADDRESS_FIELDS = ('house_no', 'street', 'locality', 'city', 'district', 'state', 'pin', 'digipin')
+
+
+def make_addresses(engine: ScoringEngine, count: int):
+    """Sample ground truth addresses, varying the house number so most rows are distinct"""
+    path = os.path.join(engine.evidence_aggregator.data_dir, "ground_truth_test_set.csv")
+    with open(path, 'r', encoding='utf-8') as f:
+        pool = [{field: row[field] for field in ADDRESS_FIELDS} for row in csv.DictReader(f)]
+    rng = random.Random(19)
+    return [dict(rng.choice(pool), house_no=str(rng.randint(1, 500))) for _ in range(count)]
+
+
+def time_loop(engine: ScoringEngine, addresses) -> float:
+    start = time.perf_counter()
+    for address in addresses:
+        acs = engine.calculate_acs(address)[0]
+        engine.get_validation_level(acs)
+    return time.perf_counter() - start
+
+
+def time_batch(engine: ScoringEngine, addresses) -> float:
+    start = time.perf_counter()
+    engine.calculate_acs_batch(addresses)
+    return time.perf_counter() - start
+
+
+def main():
+    print("\n" + "="*70)
+    print(" Batch Scoring Throughput".center(70))
+    print("="*70 + "\n")
+
+    engine = ScoringEngine()
+
+    print(f"{'addresses':>12} {'loop (addr/s)':>16} {'batch (addr/s)':>16} {'speedup':>10}")
+    for size in BATCH_SIZES:
+        addresses = make_addresses(engine, size)
+        loop_seconds = time_loop(engine, addresses)
+        batch_seconds = time_batch(engine, addresses)
+        print(f"{size:>12,} {size / loop_seconds:>16,.0f} {size / batch_seconds:>16,.0f} "
+              f"{loop_seconds / batch_seconds:>9.1f}x")
+
+    print("\n" + "="*70)
+
+
+if __name__ == "__main__":
+    main()
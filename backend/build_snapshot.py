@@ -0,0 +1,83 @@
+"""
+Compile the CSVs in backend/data into a memory-mapped evidence snapshot
+Run this after changing any reference or evidence CSV; workers fall back
+to parsing the CSVs while the snapshot is missing or stale.
+
+Usage: python build_snapshot.py [output_path]
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from evidence_aggregator import EvidenceAggregator
+from utils.snapshot import DEFAULT_SNAPSHOT_PATH, EvidenceSnapshot, write_snapshot
+
+
+SOURCE_FILES = [
+    "mock_digipin_grid.csv",
+    "mock_delivery_logs.csv",
+    "mock_iot_pings.csv",
+    "pin_centroids.csv",
+    "landmarks.csv",
+    "postal_directory.csv",
+    "mock_crowd_validations.csv",
+    "mock_documentary_evidence.csv",
+    "street_segments.csv",
+    "locality_boundaries.csv",
+]
+
+
+def collect_snapshot_data(aggregator: EvidenceAggregator):
+    """Gather the arrays and reference tables every worker needs at startup"""
+    arrays = {}
+    tables = {
+        "digipin_grid": aggregator.digipin_data,
+        "pin_centroids": aggregator.geo_utils.pin_centroids,
+        "digipin_centers": aggregator.geo_utils.digipin_centers,
+        "digipin_pins": aggregator.geo_utils.declared_pins,
+        "landmarks_by_digipin": aggregator.linguistic_validator.landmarks_by_digipin,
+        "postal_directory": aggregator.postal_directory.offices_by_pin,
+        "crowd_validations": aggregator.crowd_store.rows,
+    }
+
+    for prefix, store in (("deliveries", aggregator.deliveries), ("iot_pings", aggregator.iot_pings)):
+        store_arrays, store_tables = store.to_snapshot(prefix)
+        arrays.update(store_arrays)
+        tables.update(store_tables)
+
+    for prefix, index in (("documents", aggregator.documents),
+                          ("street_segments", aggregator.geo_utils.street_segments),
+                          ("landmark_grid", aggregator.geo_utils.landmark_index),
+                          ("pin_digipin", aggregator.geo_utils.pin_digipin),
+                          ("localities", aggregator.geo_utils.locality_boundaries)):
+        index_arrays, index_tables = index.to_snapshot(prefix)
+        arrays.update(index_arrays)
+        tables.update(index_tables)
+
+    return arrays, tables
+
+
+def main():
+    output_path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("EVIDENCE_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+
+    start = time.perf_counter()
+    aggregator = EvidenceAggregator()
+    parse_seconds = time.perf_counter() - start
+
+    arrays, tables = collect_snapshot_data(aggregator)
+    write_snapshot(output_path, arrays, tables, aggregator.data_dir, SOURCE_FILES)
+
+    start = time.perf_counter()
+    EvidenceAggregator(snapshot=EvidenceSnapshot(output_path))
+    open_seconds = time.perf_counter() - start
+
+    print(f"[OK] Wrote {output_path} ({os.path.getsize(output_path):,} bytes)")
+    print(f"     CSV load: {parse_seconds * 1000:.1f} ms, snapshot load: {open_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Float, DateTime, Boolean, JSON, ForeignKey, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, deferred
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -8,8 +8,32 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./validation.db")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+
+def create_db_engine(url: str = DATABASE_URL, **kwargs):
+    """
+    Engine for url
+
+    SQLite connections use WAL, so readers never block the writer or each other, and wait up to
+    SQLITE_BUSY_TIMEOUT_MS for the write lock instead of failing with "database is locked".
+    """
+    if "sqlite" not in url:
+        return create_engine(url, **kwargs)
+
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    return engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -55,11 +79,19 @@ class ValidationRequest(Base):
     status = Column(String, default="queued")  # queued, processing, done, failed
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)  # Set by the job worker that claimed it; its updates check it
     
     address = relationship("Address", back_populates="validation_requests")
     evidence_signals = relationship("EvidenceSignal", back_populates="validation_request")
     result = relationship("ValidationResult", back_populates="validation_request", uselist=False)
 
+    __table_args__ = (
+        # Validation job workers claim the oldest queued request
+        Index("ix_validation_requests_status_created", "status", "created_at"),
+        # User history is keyset-paginated on (created_at, id) per requester
+        Index("ix_validation_requests_requester_created", "requester_id", "created_at", "id"),
+    )
+
 
 class EvidenceSignal(Base):
     __tablename__ = "evidence_signals"
@@ -74,6 +106,17 @@ class EvidenceSignal(Base):
     validation_request = relationship("ValidationRequest", back_populates="evidence_signals")
 
 
+class PackedEvidence(Base):
+    """All evidence components of one validation in a single row (EVIDENCE_STORAGE=packed)"""
+    __tablename__ = "packed_evidence"
+    
+    validation_request_id = Column(String, ForeignKey("validation_requests.id"), primary_key=True)
+    types = Column(String)  # Comma-separated component types, in evidence order
+    scores = Column(LargeBinary)  # One little-endian float64 per component
+    details = deferred(Column(LargeBinary))  # zlib-compressed JSON array; only read when asked for
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
+
 class ValidationResult(Base):
     __tablename__ = "validation_results"
     
@@ -146,6 +189,33 @@ def get_db():
         db.close()
 
 
-def init_db():
+def init_db(bind=None):
     """Initialize the database and create all tables"""
-    Base.metadata.create_all(bind=engine)
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    # create_all skips tables that already exist; add columns and indexes introduced since
+    if "claimed_at" not in {column["name"] for column in inspect(bind).get_columns("validation_requests")}:
+        with bind.begin() as connection:
+            connection.execute(text("ALTER TABLE validation_requests ADD COLUMN claimed_at DATETIME"))
+    for index in ValidationRequest.__table__.indexes:
+        index.create(bind=bind, checkfirst=True)
+    _ensure_unique_results(bind)
+
+
+def _ensure_unique_results(bind):
+    """One ValidationResult per request, also in tables created before the unique constraint"""
+    inspector = inspect(bind)
+    unique = [constraint["column_names"] for constraint in inspector.get_unique_constraints("validation_results")]
+    unique += [index["column_names"] for index in inspector.get_indexes("validation_results") if index["unique"]]
+    if ["validation_request_id"] in unique:
+        return
+    with bind.begin() as connection:
+        # Keep the first result stored for each request
+        connection.execute(text(
+            "DELETE FROM validation_results WHERE validation_request_id IS NOT NULL AND id NOT IN "
+            "(SELECT MIN(id) FROM validation_results GROUP BY validation_request_id)"
+        ))
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_validation_results_request "
+            "ON validation_results (validation_request_id)"
+        ))
@@ -1,31 +1,88 @@
+import asyncio
 import csv
 import os
-from typing import Dict, List, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from difflib import SequenceMatcher
 import json
-import requests
 from utils.geospatial import GeospatialUtils
 from utils.linguistic_patterns import LinguisticValidator
+from utils.evidence_store import ColumnarEvidenceStore
+from utils.rolling_aggregates import DeliveryAggregates
+from utils.iot_retention import IotPingRetention
+from utils.postal_client import PostalPinClient
+from utils.postal_directory import PostalDirectory
+from utils.crowd_store import CrowdValidationStore
+from utils.document_index import DocumentIndex
+from utils.reverse_geocode import ReverseGeocoder
+from utils.distance import PreparedCentre
+from utils.geofence import geofence_stats, geofence_score
+
+
+# Column layouts for the columnar evidence logs
+DELIVERY_COLUMNS = {"delivery_count": "int32"}
+IOT_COLUMNS = {"lat": "float64", "long": "float64", "signal_strength": "int16"}
+
+# Share of the documentary score each verified document type contributes
+DOC_TYPE_WEIGHTS = {
+    "property_tax": 40.0,
+    "aadhaar": 25.0,
+    "utility_bill": 20.0,
+    "voter_id": 15.0,
+}
+# Expired documents still count, at a reduced weight
+EXPIRED_DOC_FACTOR = 0.5
+
+# IoT score = recency blended with how well pings sit inside the DIGIPIN geofence
+IOT_GEOFENCE_WEIGHT = 0.4
+
+# Live postal API lookups only refresh PINs missing from the offline directory
+POSTAL_NETWORK_REFRESH = os.getenv("POSTAL_NETWORK_REFRESH", "false").lower() == "true"
 
 
 class EvidenceAggregator:
     """DHRUVAx Real-World Evidence Aggregation Layer"""
     
-    def __init__(self):
+    def __init__(self, snapshot=None):
         self.data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.snapshot = snapshot
         self.digipin_data = []
-        self.delivery_data = []
-        self.iot_data = []
+        
+        # Per-DIGIPIN indexes so providers never scan the full logs
+        self.digipin_index = {}
+        
+        # Columnar delivery / IoT logs sorted by DIGIPIN, timestamps pre-parsed
+        self.deliveries = ColumnarEvidenceStore.empty("delivery_date", "D", DELIVERY_COLUMNS)
+        self.iot_pings = ColumnarEvidenceStore.empty("timestamp", "s", IOT_COLUMNS)
+        
+        # Verified documents summarised per (DIGIPIN, PIN)
+        self.documents = DocumentIndex.from_records([], [], [], [], [])
+        
+        # Rolling per-DIGIPIN delivery windows / decay sums read by the temporal providers
+        self.delivery_aggregates = DeliveryAggregates(self.deliveries)
+        
+        # Bounded per-DIGIPIN IoT history (recent raw pings + daily summaries)
+        self.iot_retention = IotPingRetention(self.iot_pings)
         
         # Initialize utility modules
-        self.geo_utils = GeospatialUtils()
-        self.linguistic_validator = LinguisticValidator()
+        self.geo_utils = GeospatialUtils(snapshot)
+        self.linguistic_validator = LinguisticValidator(snapshot)
+        self.postal_directory = PostalDirectory(self.data_dir, snapshot)
+        self.crowd_store = CrowdValidationStore(self.data_dir, snapshot)
+        self.postal_client = PostalPinClient()
         
         self.load_mock_data()
     
     def load_mock_data(self):
-        """Load mock datasets from CSV files"""
+        """Load mock datasets from the compiled snapshot, or CSV files when there is none"""
+        if self.snapshot is not None:
+            self.digipin_data = self.snapshot.tables["digipin_grid"]
+            self.deliveries = ColumnarEvidenceStore.from_snapshot(self.snapshot, "deliveries", "delivery_date")
+            self.iot_pings = ColumnarEvidenceStore.from_snapshot(self.snapshot, "iot_pings", "timestamp")
+            self.documents = DocumentIndex.from_snapshot(self.snapshot, "documents")
+            self.build_indexes()
+            return
+        
         try:
             digipin_path = os.path.join(self.data_dir, "mock_digipin_grid.csv")
             if os.path.exists(digipin_path):
@@ -33,40 +90,73 @@ class EvidenceAggregator:
                     reader = csv.DictReader(f)
                     self.digipin_data = list(reader)
             
-            delivery_path = os.path.join(self.data_dir, "mock_delivery_logs.csv")
-            if os.path.exists(delivery_path):
-                with open(delivery_path, 'r') as f:
-                    reader = csv.DictReader(f)
-                    self.delivery_data = list(reader)
-            
-            iot_path = os.path.join(self.data_dir, "mock_iot_pings.csv")
-            if os.path.exists(iot_path):
-                with open(iot_path, 'r') as f:
-                    reader = csv.DictReader(f)
-                    self.iot_data = list(reader)
+            self.deliveries = ColumnarEvidenceStore.from_csv(
+                os.path.join(self.data_dir, "mock_delivery_logs.csv"),
+                "delivery_date", "D", DELIVERY_COLUMNS
+            )
+            self.iot_pings = ColumnarEvidenceStore.from_csv(
+                os.path.join(self.data_dir, "mock_iot_pings.csv"),
+                "timestamp", "s", IOT_COLUMNS
+            )
+            self.documents = DocumentIndex.from_csv(os.path.join(self.data_dir, "mock_documentary_evidence.csv"))
         except Exception as e:
             print(f"Warning: Could not load mock data: {e}")
+        
+        self.build_indexes()
+    
+    def build_indexes(self):
+        """Build per-DIGIPIN lookup structures over the loaded datasets"""
+        self.digipin_index = {}
+        for row in self.digipin_data:
+            # Keep the first grid row per DIGIPIN (matches the old linear scan)
+            self.digipin_index.setdefault(row.get('digipin'), row)
+        
+        # Coordinate -> nearest known cell / PIN (map picker)
+        self.reverse_geocoder = ReverseGeocoder(self.digipin_index, self.geo_utils.pin_centroids)
+        
+        self.delivery_aggregates = DeliveryAggregates(self.deliveries)
+        self.iot_retention = IotPingRetention(self.iot_pings)
+    
+    def append_deliveries(self, events: List[Dict[str, Any]]) -> None:
+        """Apply a batch of ingested delivery events ({digipin, delivery_date, delivery_count}) to the live indexes"""
+        self.delivery_aggregates.append_many(
+            [(event["digipin"], event["delivery_date"], event.get("delivery_count", 1)) for event in events],
+            datetime.now().date()
+        )
+    
+    def append_iot_pings(self, events: List[Dict[str, Any]]) -> None:
+        """Apply a batch of ingested IoT pings ({digipin, timestamp, ...}) to the live indexes"""
+        self.iot_retention.append_many(events)
+
+    async def prefetch_postal_data(self, pin: str) -> None:
+        """
+        Optionally refresh a PIN missing from the offline postal directory.
+        Awaited from request handlers so the upstream call never blocks the event loop.
+        """
+        if not POSTAL_NETWORK_REFRESH or pin in self.postal_directory:
+            return
+        if len(pin) == 6 and pin.isdigit():
+            result = await self.postal_client.lookup(pin)
+            if result.get("available"):
+                self.postal_directory.update(pin, result["offices"])
+
+    async def prefetch_postal_data_many(self, pins: Iterable[str]) -> None:
+        """prefetch_postal_data for several PINs at once, at most one per postal client connection in flight"""
+        limit = asyncio.Semaphore(self.postal_client.max_connections)
+
+        async def prefetch(pin: str):
+            async with limit:
+                await self.prefetch_postal_data(pin)
+
+        await asyncio.gather(*(prefetch(pin) for pin in set(pins)))
 
     def _fetch_real_pin_data(self, pin: str) -> Dict[str, Any]:
         """
-        Fetch real data from Open Government Data (OGD) API wrapper
-        Source: api.postalpincode.in
+        Real post office data for a PIN
+        Source: offline India Post directory (postal_directory.csv), optionally
+        refreshed from api.postalpincode.in by prefetch_postal_data
         """
-        try:
-            # Timeout set to 2s to not slow down the demo
-            response = requests.get(f"https://api.postalpincode.in/pincode/{pin}", timeout=5.0, headers={"User-Agent": "DigiTrust-AVP/1.0"})
-            if response.status_code == 200:
-                data = response.json()
-                if data and isinstance(data, list) and data[0]['Status'] == 'Success':
-                    return {
-                        "available": True,
-                        "offices": data[0]['PostOffice']
-                    }
-        except Exception as e:
-            # Fail silently for demo if offline/timeout
-            pass
-        
-        return {"available": False}
+        return self.postal_directory.lookup(pin) or {"available": False}
     
     def get_geo_evidence(self, address: Dict[str, str]) -> Tuple[float, Dict[str, Any]]:
         """
@@ -107,11 +197,7 @@ class EvidenceAggregator:
             }
 
         # Look up DIGIPIN in grid
-        grid_match = None
-        for row in self.digipin_data:
-            if row.get('digipin') == digipin:
-                grid_match = row
-                break
+        grid_match = self.digipin_index.get(digipin)
         
         if grid_match:
             grid_locality = str(grid_match.get('locality', '')).lower()
@@ -129,14 +215,10 @@ class EvidenceAggregator:
             real_data_verified = False
             
             if real_data["available"]:
-                # Check if our city/district appears in the real real post office data
-                for office in real_data["offices"]:
-                    if (city in office.get("District", "").lower() or 
-                        city in office.get("Division", "").lower() or
-                        city in office.get("Region", "").lower()):
-                        real_data_bonus = 10
-                        real_data_verified = True
-                        break
+                # Check if our city/district appears in the real post office data
+                if self.postal_directory.matches_place(pin, city):
+                    real_data_bonus = 10
+                    real_data_verified = True
             
             # Weighted combination
             # Base score from mock grid + Bonus from real API
@@ -171,7 +253,7 @@ class EvidenceAggregator:
         Temporal/Delivery history: Recent deliveries at this address
         Returns score 0-100 and details
         """
-        if not self.delivery_data:
+        if not len(self.delivery_aggregates):
             return 0.0, {"method": "no_data", "message": "No delivery logs"}
         
         digipin = address.get("digipin", "")
@@ -194,29 +276,14 @@ class EvidenceAggregator:
                 "most_recent": (datetime.now() - timedelta(days=45)).isoformat()
             }
         
-        # Find deliveries for this DIGIPIN
-        deliveries = [d for d in self.delivery_data if d.get('digipin') == digipin]
+        # Rolling aggregates for this DIGIPIN
+        stats = self.delivery_aggregates.stats(digipin, datetime.now().date())
         
-        if not deliveries:
+        if stats is None:
             return 0.0, {"method": "no_deliveries", "digipin": digipin}
         
-        # Count recent deliveries
-        now = datetime.now()
-        count_30 = 0
-        count_90 = 0
-        dates = []
-        
-        for delivery in deliveries:
-            try:
-                delivery_date = datetime.fromisoformat(delivery['delivery_date'])
-                dates.append(delivery_date)
-                days_ago = (now - delivery_date).days
-                if days_ago <= 30:
-                    count_30 += 1
-                if days_ago <= 90:
-                    count_90 += 1
-            except:
-                continue
+        count_30 = stats["window_counts"][30]
+        count_90 = stats["window_counts"][90]
         
         # Scoring
         if count_30 >= 3:
@@ -232,10 +299,10 @@ class EvidenceAggregator:
         
         details = {
             "method": "delivery_history",
-            "total_deliveries": len(deliveries),
+            "total_deliveries": stats["total"],
             "deliveries_30_days": count_30,
             "deliveries_90_days": count_90,
-            "most_recent": max(dates).isoformat() if dates else None
+            "most_recent": datetime.combine(stats["most_recent"], datetime.min.time()).isoformat()
         }
         
         return score, details
@@ -245,7 +312,7 @@ class EvidenceAggregator:
         IoT ping evidence: Recent device pings from this location
         Returns score 0-100 and details
         """
-        if not self.iot_data:
+        if not len(self.iot_retention):
             return 0.0, {"method": "no_data", "message": "No IoT ping logs"}
         
         digipin = address.get("digipin", "")
@@ -268,25 +335,14 @@ class EvidenceAggregator:
                 "ping_count": 5
             }
         
-        # Find pings for this DIGIPIN
-        pings = [p for p in self.iot_data if p.get('digipin') == digipin]
+        # Retained ping history for this DIGIPIN (loaded logs plus ingested pings)
+        summary = self.iot_retention.summary(digipin)
         
-        if not pings:
+        if summary is None:
             return 0.0, {"method": "no_pings", "digipin": digipin}
         
         # Check recency of last ping
-        ping_dates = []
-        for ping in pings:
-            try:
-                ping_date = datetime.fromisoformat(ping['last_ping'])
-                ping_dates.append(ping_date)
-            except:
-                continue
-        
-        if not ping_dates:
-            return 0.0, {"method": "no_valid_pings"}
-        
-        last_ping = max(ping_dates)
+        last_ping = summary["last_ping"]
         days_since_ping = (datetime.now() - last_ping).days
         
         if days_since_ping <= 7:
@@ -307,56 +363,68 @@ class EvidenceAggregator:
             "last_ping": last_ping.isoformat(),
             "days_since_ping": days_since_ping,
             "recency": recency,
-            "ping_count": len(pings)
+            "ping_count": summary["count"]
         }
         
+        # Geofence: are the retained pings actually at this DIGIPIN?
+        centre = self.geo_utils.get_digipin_center(digipin)
+        pings = self.iot_retention.recent_pings(digipin)
+        stats = None
+        if centre and pings is not None:
+            stats = geofence_stats(PreparedCentre(centre['lat'], centre['long']),
+                                   pings["lat"], pings["long"], pings["signal_strength"])
+        if stats is not None:
+            fence_score = geofence_score(stats)
+            score = (1 - IOT_GEOFENCE_WEIGHT) * score + IOT_GEOFENCE_WEIGHT * fence_score
+            details["geofence"] = {
+                "score": round(fence_score, 1),
+                "inside_fraction": round(stats["inside_fraction"], 3),
+                "spread_m": round(stats["spread_m"], 1),
+                "centroid_offset_m": round(stats["centroid_offset_m"], 1),
+                "weighted_centroid": {"lat": stats["centroid_lat"], "long": stats["centroid_long"]},
+                "pings_evaluated": stats["pings_with_position"]
+            }
+        
         return score, details
     
     def get_documentary_evidence(self, address: Dict[str, str]) -> Tuple[float, Dict[str, Any]]:
         """
-        Documentary match: Simulated property tax / KYC document check
+        Documentary match: Verified property tax / KYC documents for this DIGIPIN and PIN
         Returns score 0-100 and details
         """
-        # For demo: simple heuristic based on PIN and city
-        # In real system, this would query government databases
-        
+        digipin = address.get("digipin", "")
         pin = address.get("pin", "")
-        city = address.get("city", "").lower()
         
-        # Simulate: certain cities/PINs have documentary records
-        high_coverage_cities = ["thrissur", "delhi", "mumbai", "bangalore", "chennai", "hyderabad"]
+        documents = self.documents.summary(digipin, pin, datetime.now().date())
         
-        if city in high_coverage_cities and len(pin) == 6:
-            # Simulate 80% match for major cities
-            return 80.0, {
-                "method": "property_tax_match",
-                "matched": True,
-                "source": "mock_property_registry",
-                "city": city
-            }
-        elif len(pin) == 6:
-            # Partial match for other areas
-            return 40.0, {
-                "method": "partial_kyc_match",
-                "matched": False,
-                "message": "Limited documentary coverage"
-            }
-        else:
+        if not documents:
             return 0.0, {
                 "method": "no_match",
                 "matched": False
             }
+        
+        score = 0.0
+        for doc_type, doc in documents.items():
+            weight = DOC_TYPE_WEIGHTS.get(doc_type, 10.0)
+            score += weight * (EXPIRED_DOC_FACTOR if doc["expired"] else 1.0)
+        
+        details = {
+            "method": "document_registry",
+            "matched": True,
+            "source": "mock_documentary_evidence",
+            "current_documents": [t for t, doc in documents.items() if not doc["expired"]],
+            "expired_documents": [t for t, doc in documents.items() if doc["expired"]],
+            "documents": documents
+        }
+        
+        return min(score, 100.0), details
     
     def get_crowd_evidence(self, address: Dict[str, str]) -> Tuple[float, Dict[str, Any]]:
         """
-        Crowd/Community validation: Simulated community confirmations
+        Crowd/Community validation: Confirmations from community validators
         Returns score 0-100 and details
         """
-        # For demo: simulate based on locality name length and DIGIPIN
-        # In real system: query community validator confirmations
-        
         digipin = address.get("digipin", "")
-        locality = address.get("locality", "")
 
         # DEMO OVERRIDE
         if digipin == "BG-5600-38-IN":
@@ -366,26 +434,30 @@ class EvidenceAggregator:
                 "validators": ["postman", "kirana_store", "delivery_agent"]
             }
         
-        # Simple simulation: hash DIGIPIN to get consistent random behavior
-        hash_val = sum(ord(c) for c in digipin) % 100
-        
-        if hash_val < 30:
-            confirmations = 0
-            score = 0.0
-        elif hash_val < 60:
-            confirmations = 1
-            score = 40.0
-        elif hash_val < 85:
-            confirmations = 2
-            score = 70.0
+        # Precomputed per-DIGIPIN confirmation aggregates
+        stats = self.crowd_store.stats(digipin, datetime.now().date())
+        
+        if stats is None:
+            return 0.0, {"method": "crowd_validation", "confirmations": 0, "validators": []}
+        
+        confirmations = stats["total"]
+        if confirmations >= 3:
+            tier_score = 100.0
+        elif confirmations == 2:
+            tier_score = 70.0
         else:
-            confirmations = 3
-            score = 100.0
+            tier_score = 40.0
+        
+        # Scale the tier by how confident (recent) validators were
+        score = tier_score * stats["weighted_confidence"] / 100.0
         
         details = {
             "method": "crowd_validation",
             "confirmations": confirmations,
-            "validators": ["postman", "kirana_store", "neighbor"][:confirmations]
+            "validators": sorted(stats["by_type"], key=lambda t: -stats["by_type"][t]),
+            "by_validator_type": stats["by_type"],
+            "weighted_confidence": round(stats["weighted_confidence"], 1),
+            "last_confirmation": stats["last_confirmation"].isoformat()
         }
         
         return score, details
@@ -404,12 +476,13 @@ class EvidenceAggregator:
             "message": "No prior validation history"
         }
     
-    def get_geo_precision_evidence(self, address: Dict[str, str]) -> Tuple[float, Dict[str, Any]]:
+    def get_geo_precision_evidence(self, address: Dict[str, str], area: Optional[Tuple] = None) -> Tuple[float, Dict[str, Any]]:
         """
         Advanced geospatial precision scoring with 4-level hierarchy
-        Returns score 0-100 and details
+        Returns score 0-100 and details; `area` is an optional shared
+        GeospatialUtils.area_precision() result for this PIN/DIGIPIN/locality
         """
-        return self.geo_utils.calculate_geo_precision_score(address)
+        return self.geo_utils.calculate_geo_precision_score(address, area)
     
     def get_linguistic_evidence(self, address: Dict[str, str]) -> Tuple[float, Dict[str, Any]]:
         """
@@ -423,38 +496,18 @@ class EvidenceAggregator:
         Enhanced temporal evidence with decay function and fraud pattern detection
         Returns score 0-100 and details
         """
-        if not self.delivery_data:
+        if not len(self.delivery_aggregates):
             return 0.0, {"method": "no_data", "message": "No delivery logs"}
         
         digipin = address.get("digipin", "")
-        deliveries = [d for d in self.delivery_data if d.get('digipin') == digipin]
+        stats = self.delivery_aggregates.stats(digipin, datetime.now().date())
         
-        if not deliveries:
+        if stats is None:
             return 0.0, {"method": "no_deliveries", "digipin": digipin}
         
-        now = datetime.now()
-        delivery_dates = []
-        
-        for delivery in deliveries:
-            try:
-                delivery_date = datetime.fromisoformat(delivery['delivery_date'])
-                delivery_dates.append(delivery_date)
-            except:
-                continue
-        
-        if not delivery_dates:
-            return 0.0, {"method": "no_valid_deliveries"}
-        
-        # Sort by date
-        delivery_dates.sort(reverse=True)
-        
         # Calculate temporal decay score
-        score = 0
-        for delivery_date in delivery_dates:
-            age_days = (now - delivery_date).days
-            # Exponential decay: 0.9^age_days
-            decay_factor = 0.9 ** age_days
-            score += 20 * decay_factor
+        # Exponential decay: sum of 0.9^age_days, maintained incrementally
+        score = 20 * stats["decayed_sum"]
         
         score = min(100, score)
         
@@ -463,25 +516,25 @@ class EvidenceAggregator:
         suspicious_patterns = []
         
         # Check for too many deliveries in short time (fraud indicator)
-        recent_7_days = [d for d in delivery_dates if (now - d).days <= 7]
-        if len(recent_7_days) >= 10:
+        recent_7_days = stats["window_counts"][7]
+        if recent_7_days >= 10:
             fraud_score = -30
             suspicious_patterns.append("excessive_velocity_7d")
         
-        recent_1_day = [d for d in delivery_dates if (now - d).days <= 1]
-        if len(recent_1_day) >= 5:
+        recent_1_day = stats["window_counts"][1]
+        if recent_1_day >= 5:
             fraud_score = -40
             suspicious_patterns.append("suspicious_velocity_1d")
         
         details = {
             "method": "temporal_decay",
-            "total_deliveries": len(delivery_dates),
-            "most_recent": delivery_dates[0].isoformat() if delivery_dates else None,
+            "total_deliveries": stats["total"],
+            "most_recent": datetime.combine(stats["most_recent"], datetime.min.time()).isoformat(),
             "decay_score": round(score, 2),
             "fraud_adjustment": fraud_score,
             "suspicious_patterns": suspicious_patterns,
-            "velocity_7d": len(recent_7_days),
-            "velocity_1d": len(recent_1_day)
+            "velocity_7d": recent_7_days,
+            "velocity_1d": recent_1_day
         }
         
         final_score = max(0, score + fraud_score)
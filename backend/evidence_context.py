@@ -0,0 +1,89 @@
+"""
+Process-wide evidence context
+
+Every router shares one ScoringEngine (and with it one copy of the
+evidence datasets) per process. It is built lazily on first use, or
+eagerly by warmup() from main.startup_event. The live evidence ingestor
+feeds that same engine's aggregator, and the validation job pool scores
+queued (mode=async) validations with it. job_worker.py builds its engine
+the same way and calls refresh_journals() to follow evidence ingested and
+confirmations recorded by the API process.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from ingestion import EvidenceIngestor
+from scoring_engine import ScoringEngine
+from validation_jobs import ValidationJobPool
+
+
+_scoring_engine: Optional[ScoringEngine] = None
+_ingestor: Optional[EvidenceIngestor] = None
+_job_pool: Optional[ValidationJobPool] = None
+_init_lock = threading.Lock()
+
+
+def get_scoring_engine() -> ScoringEngine:
+    """FastAPI dependency returning the shared ScoringEngine"""
+    global _scoring_engine
+    if _scoring_engine is None:
+        with _init_lock:
+            if _scoring_engine is None:
+                _scoring_engine = ScoringEngine()
+    return _scoring_engine
+
+
+def get_ingestor() -> EvidenceIngestor:
+    """FastAPI dependency returning the shared ingestor (journal replayed, flusher running)"""
+    global _ingestor
+    if _ingestor is None:
+        engine = get_scoring_engine()
+        with _init_lock:
+            if _ingestor is None:
+                ingestor = EvidenceIngestor(engine.evidence_aggregator)
+                ingestor.replay_journal()
+                ingestor.start()
+                _ingestor = ingestor
+    return _ingestor
+
+
+def refresh_journals() -> int:
+    """Apply evidence journalled by other processes since the last call; returns entries applied"""
+    engine = get_scoring_engine()
+    return get_ingestor().replay_journal() + engine.evidence_aggregator.crowd_store.replay_journal()
+
+
+def get_job_pool() -> ValidationJobPool:
+    """FastAPI dependency returning the shared validation job pool (workers run once start_job_pool is awaited)"""
+    global _job_pool
+    if _job_pool is None:
+        engine = get_scoring_engine()
+        with _init_lock:
+            if _job_pool is None:
+                _job_pool = ValidationJobPool(engine)
+    return _job_pool
+
+
+async def start_job_pool():
+    """Start the validation job workers on the running event loop"""
+    await get_job_pool().start()
+
+
+def warmup() -> float:
+    """Load the evidence datasets now instead of on the first request; returns seconds taken"""
+    start = time.perf_counter()
+    get_scoring_engine()
+    get_ingestor()
+    return time.perf_counter() - start
+
+
+async def shutdown():
+    """Stop job workers, flush buffered evidence and release network resources held by the shared context"""
+    if _job_pool is not None:
+        await _job_pool.stop()
+    if _ingestor is not None:
+        _ingestor.stop()
+    if _scoring_engine is not None:
+        await _scoring_engine.evidence_aggregator.postal_client.aclose()
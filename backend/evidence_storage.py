@@ -0,0 +1,118 @@
+"""
+Evidence storage
+
+A validation produces one evidence component per signal type. In "rows"
+mode (the default) each component is an EvidenceSignal row. In "packed"
+mode (EVIDENCE_STORAGE=packed) a validation's evidence is one
+PackedEvidence row: the component types, a struct-packed vector of scores,
+and every component's details as one zlib-compressed JSON array in a
+deferred column. Readers go through load_evidence(), which only fetches
+and inflates details when they are asked for. In rows mode it reads
+EvidenceSignal rows alone; in packed mode it reads the PackedEvidence row
+and falls back to EvidenceSignal rows only for validations stored before
+the switch.
+"""
+
+import json
+import os
+import struct
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, undefer
+
+from database import EvidenceSignal, PackedEvidence
+
+
+EVIDENCE_STORAGE = os.getenv("EVIDENCE_STORAGE", "rows")  # rows | packed
+
+# Details are written once and read rarely; favour write speed over the last few bytes
+DETAILS_COMPRESSION_LEVEL = 1
+
+
+def pack_scores(scores: List[float]) -> bytes:
+    return struct.pack(f"<{len(scores)}d", *scores)
+
+
+def unpack_scores(blob: bytes) -> Tuple[float, ...]:
+    return struct.unpack(f"<{len(blob) // 8}d", blob)
+
+
+def pack_details(details: List[Dict[str, Any]]) -> bytes:
+    return zlib.compress(json.dumps(details, separators=(",", ":")).encode("utf-8"), DETAILS_COMPRESSION_LEVEL)
+
+
+def unpack_details(blob: bytes) -> List[Dict[str, Any]]:
+    return json.loads(zlib.decompress(blob))
+
+
+def _packed_row(validation_id: str, evidence: List[Dict[str, Any]], timestamp: datetime) -> Dict[str, Any]:
+    return {
+        "validation_request_id": validation_id,
+        "types": ",".join(ev["type"] for ev in evidence),
+        "scores": pack_scores([ev["score"] for ev in evidence]),
+        "details": pack_details([ev["details"] for ev in evidence]),
+        "timestamp": timestamp,
+    }
+
+
+def store_evidence(db: Session, evidence_by_request: Iterable[Tuple[str, List[Dict[str, Any]]]],
+                   timestamp: datetime, storage: Optional[str] = None):
+    """Bulk insert the evidence of one or more validations (no commit)"""
+    if (storage or EVIDENCE_STORAGE) == "packed":
+        model = PackedEvidence
+        rows = [_packed_row(validation_id, evidence, timestamp) for validation_id, evidence in evidence_by_request]
+    else:
+        model = EvidenceSignal
+        rows = [{"validation_request_id": validation_id, "type": ev["type"], "score": ev["score"],
+                 "details_json": ev["details"], "timestamp": timestamp}
+                for validation_id, evidence in evidence_by_request for ev in evidence]
+    if rows:
+        db.execute(insert(model), rows)
+
+
+def load_evidence(db: Session, validation_id: str, include_details: bool = True,
+                  storage: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    [{type, score, details, timestamp}] for a validation, in evidence order
+
+    details is None unless include_details; the details blob (or
+    details_json column) is then never read from the database.
+    """
+    if (storage or EVIDENCE_STORAGE) == "packed":
+        query = db.query(PackedEvidence).filter(PackedEvidence.validation_request_id == validation_id)
+        packed = (query.options(undefer(PackedEvidence.details)) if include_details else query).first()
+        if packed is not None:
+            types = packed.types.split(",") if packed.types else []
+            details = unpack_details(packed.details) if include_details else [None] * len(types)
+            return [{"type": t, "score": score, "details": d, "timestamp": packed.timestamp}
+                    for t, score, d in zip(types, unpack_scores(packed.scores), details)]
+
+    # One EvidenceSignal row per component
+    columns = [EvidenceSignal.type, EvidenceSignal.score, EvidenceSignal.timestamp]
+    if include_details:
+        columns.append(EvidenceSignal.details_json)
+    rows = db.query(*columns).filter(
+        EvidenceSignal.validation_request_id == validation_id
+    ).order_by(EvidenceSignal.id).all()
+    return [{"type": row.type, "score": row.score, "details": row.details_json if include_details else None,
+             "timestamp": row.timestamp} for row in rows]
+
+
+def update_evidence(db: Session, validation_id: str, evidence: List[Dict[str, Any]], storage: Optional[str] = None):
+    """Overwrite the scores and details of a validation's stored evidence, where load_evidence reads it (no commit)"""
+    if (storage or EVIDENCE_STORAGE) == "packed":
+        packed = db.query(PackedEvidence).filter(PackedEvidence.validation_request_id == validation_id).first()
+        if packed is not None:
+            packed.scores = pack_scores([ev["score"] for ev in evidence])
+            packed.details = pack_details([ev["details"] for ev in evidence])
+            return
+
+    signals = db.query(EvidenceSignal).filter(
+        EvidenceSignal.validation_request_id == validation_id
+    ).order_by(EvidenceSignal.id).all()
+    for signal, ev in zip(signals, evidence):
+        signal.score = ev["score"]
+        signal.details_json = ev["details"]
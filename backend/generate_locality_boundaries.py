@@ -0,0 +1,55 @@
+"""
+Generate mock locality boundary polygons
+One irregular polygon per (locality, PIN) around the DIGIPIN grid centres
+and the verified ground truth coordinates, written to
+data/locality_boundaries.csv as 'lat long' vertices separated by ';'
+"""
+
+import csv
+import math
+import random
+
+random.seed(18)
+
+VERTICES = 10
+MIN_RADIUS_M, MAX_RADIUS_M = 350, 800
+
+# (locality, pin) -> list of (lat, long) observed inside it
+points = {}
+
+with open('data/mock_digipin_grid.csv', 'r', encoding='utf-8') as f:
+    for row in csv.DictReader(f):
+        points.setdefault((row['locality'], row['pin']), []).append((float(row['lat']), float(row['long'])))
+
+with open('data/ground_truth_test_set.csv', 'r', encoding='utf-8') as f:
+    for row in csv.DictReader(f):
+        try:
+            point = (float(row['verified_lat']), float(row['verified_long']))
+        except ValueError:
+            continue
+        points.setdefault((row['locality'], row['pin']), []).append(point)
+
+rows = []
+for (locality, pin), coords in sorted(points.items()):
+    lat = sum(c[0] for c in coords) / len(coords)
+    lon = sum(c[1] for c in coords) / len(coords)
+    # Always reach the farthest observed point so every source point lies inside
+    reach = max(math.hypot((c[0] - lat) * 111320, (c[1] - lon) * 111320 * math.cos(math.radians(lat)))
+                for c in coords)
+
+    vertices = []
+    for k in range(VERTICES):
+        angle = 2 * math.pi * k / VERTICES
+        radius = max(random.uniform(MIN_RADIUS_M, MAX_RADIUS_M), reach * 1.5 + 100)
+        vertices.append((
+            lat + radius * math.sin(angle) / 111320,
+            lon + radius * math.cos(angle) / (111320 * math.cos(math.radians(lat))),
+        ))
+    rows.append([locality, pin, ';'.join(f"{a:.6f} {o:.6f}" for a, o in vertices)])
+
+with open('data/locality_boundaries.csv', 'w', newline='', encoding='utf-8') as f:
+    writer = csv.writer(f)
+    writer.writerow(['locality', 'pin', 'vertices'])
+    writer.writerows(rows)
+
+print(f"Generated {len(rows)} locality boundaries")
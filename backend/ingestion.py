@@ -0,0 +1,241 @@
+"""
+Live evidence ingestion
+
+Delivery events and IoT pings posted to /api/ingest are queued in a bounded
+buffer and applied by a background flusher in batches: each batch is first
+appended to a journal CSV in the data directory (fsync'd), then applied to
+the shared EvidenceAggregator with one lock acquisition per batch. Request
+handlers only touch the buffer, so ingestion never takes the evidence locks
+per event. Journals are replayed on startup so ingested evidence survives
+restarts, and a process that only scores (job_worker.py) keeps replaying
+them to pick up evidence ingested by the API after it started.
+"""
+
+import csv
+import io
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from evidence_aggregator import EvidenceAggregator
+
+
+# Tunables
+INGEST_BUFFER_CAPACITY = int(os.getenv("INGEST_BUFFER_CAPACITY", "50000"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+INGEST_FLUSH_INTERVAL = float(os.getenv("INGEST_FLUSH_INTERVAL", "1.0"))
+
+# kind -> (journal file, columns)
+JOURNALS = {
+    "delivery": ("ingested_deliveries.csv", ["digipin", "delivery_date", "delivery_count"]),
+    "iot": ("ingested_iot_pings.csv", ["digipin", "timestamp", "lat", "long", "signal_strength"]),
+}
+
+
+class IngestionBufferFull(Exception):
+    """Raised when a submission does not fit in the ingestion buffer"""
+    pass
+
+
+class EvidenceIngestor:
+    """Bounded buffer + background batch flusher feeding an EvidenceAggregator"""
+
+    def __init__(self, aggregator: EvidenceAggregator, journal_dir: str = None,
+                 capacity: int = INGEST_BUFFER_CAPACITY, batch_size: int = INGEST_BATCH_SIZE,
+                 flush_interval: float = INGEST_FLUSH_INTERVAL):
+        self.aggregator = aggregator
+        self.journal_dir = journal_dir or aggregator.data_dir
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._buffer: deque = deque()
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._journal_offsets: Dict[str, int] = {}  # kind -> bytes of the journal already replayed
+
+        self.stats = {"accepted": 0, "rejected": 0, "flushed": 0, "batches": 0, "replayed": 0, "last_flush": None}
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def submit(self, kind: str, events: List[Dict[str, Any]]) -> int:
+        """
+        Queue events of one kind ("delivery" or "iot"); all or nothing
+
+        Raises IngestionBufferFull if the batch does not fit. Returns the
+        number of events now buffered.
+        """
+        if kind not in JOURNALS:
+            raise ValueError(f"Unknown event kind: {kind}")
+        events = [_normalize(kind, event) for event in events]
+
+        with self._buffer_lock:
+            if len(self._buffer) + len(events) > self.capacity:
+                self.stats["rejected"] += len(events)
+                raise IngestionBufferFull(f"Ingestion buffer full ({len(self._buffer)}/{self.capacity})")
+            self._buffer.extend((kind, event) for event in events)
+            self.stats["accepted"] += len(events)
+            buffered = len(self._buffer)
+
+        if buffered >= self.batch_size:
+            self._wakeup.set()
+        return buffered
+
+    def flush(self) -> int:
+        """Drain the buffer now (journal, then apply); returns events flushed"""
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                with self._buffer_lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    break
+                by_kind = _group_by_kind(batch)
+                self._write_journal(by_kind)
+                self._apply(by_kind)
+                flushed += len(batch)
+                self.stats["batches"] += 1
+
+            if flushed:
+                self.stats["flushed"] += flushed
+                self.stats["last_flush"] = datetime.now().isoformat()
+        return flushed
+
+    def replay_journal(self) -> int:
+        """
+        Apply journalled events not replayed yet; returns events replayed
+
+        The first call replays every journal; later calls only apply rows
+        appended since (by this or another process), so a read-only
+        consumer can call it periodically. A process that also submits
+        events must replay only once, as its own flushes are applied
+        directly.
+        """
+        replayed = 0
+        for kind, (filename, columns) in JOURNALS.items():
+            path = os.path.join(self.journal_dir, filename)
+            if not os.path.exists(path):
+                continue
+            start = self._journal_offsets.get(kind, 0)
+            with open(path, 'rb') as f:
+                f.seek(start)
+                data = f.read()
+            # Leave a partially written last line for the next call
+            data = data[:data.rfind(b"\n") + 1]
+            if not data:
+                continue
+            self._journal_offsets[kind] = start + len(data)
+
+            lines = io.StringIO(data.decode('utf-8'), newline='')
+            events = []
+            for row in csv.DictReader(lines, fieldnames=None if start == 0 else columns):
+                try:
+                    events.append(_normalize(kind, row))
+                except (KeyError, TypeError, ValueError):
+                    continue  # Torn line after a crash
+            self._apply({kind: events})
+            replayed += len(events)
+        self.stats["replayed"] += replayed
+        return replayed
+
+    def start(self):
+        """Start the background flusher thread"""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="evidence-ingestor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and flush whatever is still buffered"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Warning: ingestion flush failed: {e}")
+                time.sleep(self.flush_interval)
+
+    def _write_journal(self, by_kind: Dict[str, List[Dict[str, Any]]]):
+        for kind, events in by_kind.items():
+            filename, columns = JOURNALS[kind]
+            path = os.path.join(self.journal_dir, filename)
+            is_new = not os.path.exists(path)
+            with open(path, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+                if is_new:
+                    writer.writeheader()
+                writer.writerows(_journal_row(event) for event in events)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _apply(self, by_kind: Dict[str, List[Dict[str, Any]]]):
+        if by_kind.get("delivery"):
+            self.aggregator.append_deliveries(by_kind["delivery"])
+        if by_kind.get("iot"):
+            self.aggregator.append_iot_pings(by_kind["iot"])
+
+
+def _group_by_kind(batch: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    by_kind: Dict[str, List[Dict[str, Any]]] = {}
+    for kind, event in batch:
+        by_kind.setdefault(kind, []).append(event)
+    return by_kind
+
+
+def _normalize(kind: str, event: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce an event (pydantic dict or journal row) to the types the aggregator expects"""
+    if kind == "delivery":
+        day = event["delivery_date"]
+        if isinstance(day, str):
+            day = datetime.fromisoformat(day).date()
+        elif isinstance(day, datetime):
+            day = day.date()
+        return {
+            "digipin": event["digipin"],
+            "delivery_date": day,
+            "delivery_count": int(event.get("delivery_count") or 1),
+        }
+
+    timestamp = event["timestamp"]
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is not None:
+        # Evidence logs use naive local time
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return {
+        "digipin": event["digipin"],
+        "timestamp": timestamp,
+        "lat": _optional(float, event.get("lat")),
+        "long": _optional(float, event.get("long")),
+        "signal_strength": _optional(int, event.get("signal_strength")),
+    }
+
+
+def _optional(cast, value):
+    return None if value in (None, "") else cast(value)
+
+
+def _journal_row(event: Dict[str, Any]) -> Dict[str, Any]:
+    row = dict(event)
+    if "timestamp" in row:
+        row["timestamp"] = row["timestamp"].isoformat(sep=" ")
+    else:
+        row["delivery_date"] = row["delivery_date"].isoformat()
+    return row
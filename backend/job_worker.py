@@ -0,0 +1,74 @@
+"""
+Standalone validation job worker
+Processes /api/validate?mode=async jobs from the shared database in its own
+process. Run the API with VALIDATION_WORKERS=0 to leave every job to it, or
+alongside the in-process workers to add capacity; claims never overlap.
+The scoring engine comes from evidence_context like the API's, and the
+delivery/IoT and confirmation journals the API writes are re-read every
+JOURNAL_REFRESH_INTERVAL seconds, so both score against the same evidence.
+
+Usage: python job_worker.py [workers] [--once]
+  --once  drain the queue and exit instead of waiting for new jobs
+"""
+
+import sys
+import os
+import asyncio
+import signal
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import evidence_context
+from database import init_db
+from utils.concurrency import run_blocking
+from validation_jobs import VALIDATION_WORKERS, ValidationJobPool
+
+
+JOURNAL_REFRESH_INTERVAL = float(os.getenv("JOURNAL_REFRESH_INTERVAL", "5.0"))
+
+
+async def refresh_journals(stopped: asyncio.Event):
+    """Re-read the evidence journals until stopped"""
+    while not stopped.is_set():
+        try:
+            await asyncio.wait_for(stopped.wait(), JOURNAL_REFRESH_INTERVAL)
+        except asyncio.TimeoutError:
+            try:
+                await run_blocking(evidence_context.refresh_journals)
+            except Exception as e:
+                print(f"Warning: journal refresh failed: {e}")
+
+
+async def run(workers: int, once: bool):
+    engine = await run_blocking(evidence_context.get_scoring_engine)
+    await run_blocking(evidence_context.get_ingestor)  # Replays the ingestion journals
+    pool = ValidationJobPool(engine, workers=workers)
+    try:
+        if once:
+            print(f"[OK] Processed {await pool.drain()} validation jobs")
+            return
+
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stopped.set)
+
+        await pool.start()
+        print(f"[OK] Validation job worker running ({workers} workers); Ctrl+C to stop")
+        await refresh_journals(stopped)
+        await pool.stop()
+        print(f"[OK] Stopped: {pool.stats}")
+    finally:
+        await evidence_context.shutdown()
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--once"]
+    workers = int(args[0]) if args else max(VALIDATION_WORKERS, 1)
+    init_db()
+    asyncio.run(run(workers, once="--once" in sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    main()
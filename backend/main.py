@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from database import init_db
 from routers import validation, admin
+import evidence_context
+from utils.concurrency import configure_thread_pool
 import uvicorn
 
 # Initialize FastAPI app
@@ -21,23 +23,36 @@ app.add_middleware(
 )
 
 # Include routers
-from routers import auth, validation, admin, audit, developers
+from routers import auth, validation, admin, audit, developers, ingest, geocode
 
 app.include_router(auth.router)
 app.include_router(validation.router)
 app.include_router(admin.router)
 app.include_router(audit.router)
 app.include_router(developers.router)
+app.include_router(ingest.router)
+app.include_router(geocode.router)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup"""
+    """Initialize database and load evidence datasets on startup"""
+    print(f"[OK] Blocking work thread pool: {configure_thread_pool()} threads")
     init_db()
     print("[OK] Database initialized")
+    load_seconds = evidence_context.warmup()
+    print(f"[OK] Evidence context loaded in {load_seconds * 1000:.0f} ms")
+    await evidence_context.start_job_pool()
+    print(f"[OK] Validation job workers started ({evidence_context.get_job_pool().workers})")
     print("[OK] DigiTrust-AVP Backend is running")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared evidence context resources"""
+    await evidence_context.shutdown()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API info"""
@@ -48,6 +63,8 @@ async def root():
         "status": "running",
         "endpoints": {
             "validation": "/api/validate",
+            "validation_batch": "/api/validate/batch",
+            "validation_async": "/api/validate?mode=async",
             "result": "/api/result/{request_id}",
             "token": "/api/token/{request_id}",
             "history": "/api/history/{user_id}",
@@ -55,7 +72,10 @@ async def root():
             "admin_queue": "/api/admin/queue",
             "admin_confirm": "/api/admin/confirm",
             "admin_review": "/api/admin/review/{request_id}",
-            "admin_revoke": "/api/admin/revoke/{token_id}"
+            "admin_revoke": "/api/admin/revoke/{token_id}",
+            "ingest_deliveries": "/api/ingest/deliveries",
+            "ingest_iot": "/api/ingest/iot",
+            "reverse_geocode": "/api/geocode/reverse"
         },
         "docs": "/docs"
     }
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 
 
 class AddressInput(BaseModel):
@@ -25,6 +25,21 @@ class ValidationRequestInput(BaseModel):
     consent: ConsentInput
 
 
+class ValidationJobStatus(BaseModel):
+    """Progress of a validation without a result yet (mode=async)"""
+    request_id: str
+    status: str  # queued, processing, failed
+    queue_position: Optional[int] = None  # Queued jobs ahead of this one
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class BatchValidationItem(BaseModel):
+    address: AddressInput
+    consent: ConsentInput
+    reference: Optional[str] = None  # Caller's own id, echoed back on the result line
+
+
 class EvidenceComponent(BaseModel):
     type: str  # geo, temporal, iot, doc, crowd, history, geo_precision, linguistic, etc.
     score: float
@@ -63,6 +78,18 @@ class ValidationResultOutput(BaseModel):
     category_avg_comparison: Optional[CategoryComparison] = None
 
 
+class BatchValidationResultLine(ValidationResultOutput):
+    """One NDJSON line of /api/validate/batch output"""
+    index: int
+    reference: Optional[str] = None
+
+
+class BatchValidationErrorLine(BaseModel):
+    index: int
+    reference: Optional[str] = None
+    error: str
+
+
 class AdminConfirmInput(BaseModel):
     request_id: str
     admin_id: str
@@ -103,3 +130,35 @@ class QueueItem(BaseModel):
     acs: Optional[float]
     vl: Optional[str]
     created_at: datetime
+
+
+class DeliveryEventInput(BaseModel):
+    digipin: str
+    delivery_date: date
+    delivery_count: int = 1
+
+
+class IotPingInput(BaseModel):
+    digipin: str
+    timestamp: datetime
+    lat: Optional[float] = None
+    long: Optional[float] = None
+    signal_strength: Optional[int] = None
+
+
+class IngestionAck(BaseModel):
+    accepted: int
+    buffered: int
+
+
+class GeoPointInput(BaseModel):
+    lat: float
+    long: float
+
+
+class ReverseGeocodeOutput(BaseModel):
+    lat: float
+    long: float
+    digipin: Optional[str] = None  # Official DIGIPIN of the point, if inside India's bounding box
+    nearest_cell: Optional[Dict[str, Any]] = None
+    nearest_pin: Optional[Dict[str, Any]] = None
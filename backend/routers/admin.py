@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from database import get_db, ValidationRequest, ValidationResult, Token, EvidenceSignal, Address, AuditLog
+from database import get_db, ValidationRequest, ValidationResult, Token, Address, AuditLog
 from models import AdminConfirmInput, DashboardKPI, QueueItem
 from scoring_engine import ScoringEngine
+from evidence_context import get_scoring_engine
+from evidence_storage import load_evidence, update_evidence
 from token_service import TokenService
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
-scoring_engine = ScoringEngine()
 token_service = TokenService()
 
 
 @router.get("/dashboard", response_model=DashboardKPI)
-async def get_dashboard_kpis(db: Session = Depends(get_db)):
+def get_dashboard_kpis(db: Session = Depends(get_db)):
     """Get admin dashboard KPIs"""
     
     # Total validations
@@ -51,7 +52,7 @@ async def get_dashboard_kpis(db: Session = Depends(get_db)):
 
 
 @router.get("/queue")
-async def get_validation_queue(db: Session = Depends(get_db), limit: int = 50):
+def get_validation_queue(db: Session = Depends(get_db), limit: int = 50):
     """Get validation queue for admin review"""
     
     # Get recent validations
@@ -81,7 +82,11 @@ async def get_validation_queue(db: Session = Depends(get_db), limit: int = 50):
 
 
 @router.post("/confirm")
-async def admin_confirm_validation(confirm: AdminConfirmInput, db: Session = Depends(get_db)):
+def admin_confirm_validation(
+    confirm: AdminConfirmInput,
+    db: Session = Depends(get_db),
+    scoring_engine: ScoringEngine = Depends(get_scoring_engine)
+):
     """
     Admin confirms/overrides a validation
     Simulates postman confirmation or human review
@@ -106,20 +111,15 @@ async def admin_confirm_validation(confirm: AdminConfirmInput, db: Session = Dep
     # Get address
     address = db.query(Address).filter(Address.id == validation_req.address_id).first()
     
-    # Get evidence signals
-    evidence_signals = db.query(EvidenceSignal).filter(
-        EvidenceSignal.validation_request_id == confirm.request_id
-    ).all()
-    
-    # Convert to dict format for scoring engine
+    # Get evidence in dict format for scoring engine
     evidence = [
         {
-            "type": ev.type,
-            "score": ev.score,
-            "weight": scoring_engine.weights.get(ev.type, 0.0),
-            "details": ev.details_json
+            "type": ev["type"],
+            "score": ev["score"],
+            "weight": scoring_engine.weights.get(ev["type"], 0.0),
+            "details": ev["details"]
         }
-        for ev in evidence_signals
+        for ev in load_evidence(db, confirm.request_id)
     ]
     
     current_acs = result.acs
@@ -144,10 +144,8 @@ async def admin_confirm_validation(confirm: AdminConfirmInput, db: Session = Dep
         )
         new_vl = scoring_engine.get_validation_level(new_acs)
         
-        # Update evidence signals in DB
-        for ev_db, ev_new in zip(evidence_signals, updated_evidence):
-            ev_db.score = ev_new["score"]
-            ev_db.details_json = ev_new["details"]
+        # Update stored evidence
+        update_evidence(db, confirm.request_id, updated_evidence)
     
     # Override VL if specified
     if confirm.mark_vl:
@@ -184,6 +182,12 @@ async def admin_confirm_validation(confirm: AdminConfirmInput, db: Session = Dep
     
     db.commit()
     
+    if confirm.postman_confirmed:
+        # Count the confirmation towards future crowd evidence for this DIGIPIN (once per request, journalled)
+        scoring_engine.evidence_aggregator.crowd_store.confirm(
+            confirm.request_id, address.digipin, "postman", datetime.utcnow().date(), 100.0
+        )
+    
     # Audit log
     audit = AuditLog(
         action="admin_confirmation",
@@ -212,7 +216,7 @@ async def admin_confirm_validation(confirm: AdminConfirmInput, db: Session = Dep
 
 
 @router.post("/revoke/{token_id}")
-async def revoke_token(token_id: int, admin_id: str, reason: str, db: Session = Depends(get_db)):
+def revoke_token(token_id: int, admin_id: str, reason: str, db: Session = Depends(get_db)):
     """Revoke a validation token"""
     
     token = db.query(Token).filter(Token.id == token_id).first()
@@ -239,8 +243,8 @@ async def revoke_token(token_id: int, admin_id: str, reason: str, db: Session =
 
 
 @router.get("/review/{request_id}")
-async def get_validation_details(request_id: str, db: Session = Depends(get_db)):
-    """Get full validation details for admin review"""
+def get_validation_details(request_id: str, include_details: bool = True, db: Session = Depends(get_db)):
+    """Get full validation details for admin review (include_details=false omits evidence details)"""
     
     validation_req = db.query(ValidationRequest).filter(ValidationRequest.id == request_id).first()
     if not validation_req:
@@ -248,7 +252,7 @@ async def get_validation_details(request_id: str, db: Session = Depends(get_db))
     
     result = db.query(ValidationResult).filter(ValidationResult.validation_request_id == request_id).first()
     address = db.query(Address).filter(Address.id == validation_req.address_id).first()
-    evidence = db.query(EvidenceSignal).filter(EvidenceSignal.validation_request_id == request_id).all()
+    evidence = load_evidence(db, request_id, include_details)
     
     # Get audit logs
     audits = db.query(AuditLog).filter(
@@ -279,10 +283,10 @@ async def get_validation_details(request_id: str, db: Session = Depends(get_db))
         } if result else None,
         "evidence": [
             {
-                "type": ev.type,
-                "score": ev.score,
-                "details": ev.details_json,
-                "timestamp": ev.timestamp.isoformat()
+                "type": ev["type"],
+                "score": ev["score"],
+                "details": ev["details"],
+                "timestamp": ev["timestamp"].isoformat()
             }
             for ev in evidence
         ],
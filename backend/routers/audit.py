@@ -22,7 +22,7 @@ class AuditLogSchema(BaseModel):
         orm_mode = True
 
 @router.get("/logs", response_model=List[AuditLogSchema])
-async def get_my_audit_logs(
+def get_my_audit_logs(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
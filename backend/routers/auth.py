@@ -44,7 +44,7 @@ DEMO_USERS = {
 }
 
 @router.post("/login", response_model=LoginResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+def login(request: LoginRequest, db: Session = Depends(get_db)):
     """
     Login endpoint.
     For hackathon:
@@ -107,7 +107,7 @@ class RegisterRequest(BaseModel):
     password: str
 
 @router.post("/register", response_model=LoginResponse)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+def register(request: RegisterRequest, db: Session = Depends(get_db)):
     """
     Register endpoint.
     Creates a new user with the provided details.
@@ -148,7 +148,7 @@ class ForgotPasswordRequest(BaseModel):
     email: str
 
 @router.post("/forgot-password")
-async def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db)):
     """
     Sends a real password reset email using Gmail SMTP.
     """
@@ -223,7 +223,7 @@ class ResetPasswordRequest(BaseModel):
     new_password: str
 
 @router.post("/reset-password")
-async def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)):
+def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)):
     """
     Finalizes password reset.
     For this demo, we verify the user exists and simply return success.
@@ -255,7 +255,7 @@ def login_github():
     return {"url": f"https://github.com/login/oauth/authorize?client_id={client_id}&redirect_uri={redirect_uri}&scope=user:email"}
 
 @router.get("/callback/github")
-async def callback_github(code: str, db: Session = Depends(get_db)):
+def callback_github(code: str, db: Session = Depends(get_db)):
     try:
         # 1. Exchange Code for Token
         import requests
@@ -326,7 +326,7 @@ class GoogleLoginRequest(BaseModel):
     picture: str | None = None
 
 @router.post("/login/google", response_model=LoginResponse)
-async def google_login(req: GoogleLoginRequest, db: Session = Depends(get_db)):
+def google_login(req: GoogleLoginRequest, db: Session = Depends(get_db)):
     """
     Exchanges a Google Client Token for an Internal DigiTrust JWT.
     """
@@ -364,7 +364,7 @@ async def google_login(req: GoogleLoginRequest, db: Session = Depends(get_db)):
     return {"url": f"https://discord.com/api/oauth2/authorize?client_id={client_id}&redirect_uri={redirect_uri}&response_type=code&scope=identify%20email"}
 
 @router.get("/callback/discord")
-async def callback_discord(code: str, db: Session = Depends(get_db)):
+def callback_discord(code: str, db: Session = Depends(get_db)):
     try:
         import requests
         client_id = os.getenv("DISCORD_CLIENT_ID")
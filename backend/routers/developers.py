@@ -18,7 +18,7 @@ class ApiKeyResponse(BaseModel):
     is_active: bool
 
 @router.post("/generate-key", response_model=ApiKeyResponse)
-async def generate_api_key(
+def generate_api_key(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -48,7 +48,7 @@ async def generate_api_key(
     }
 
 @router.get("/my-key", response_model=ApiKeyResponse | None)
-async def get_my_key(
+def get_my_key(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+from models import GeoPointInput, ReverseGeocodeOutput
+from scoring_engine import ScoringEngine
+from evidence_context import get_scoring_engine
+from utils.auth import get_current_user_id
+
+router = APIRouter(prefix="/api/geocode", tags=["geocode"])
+
+MAX_BATCH_POINTS = 10_000
+
+
+@router.get("/reverse", response_model=ReverseGeocodeOutput)
+async def reverse_geocode(
+    lat: float = Query(..., ge=-90, le=90),
+    long: float = Query(..., ge=-180, le=180),
+    user_id: str = Depends(get_current_user_id),
+    scoring_engine: ScoringEngine = Depends(get_scoring_engine)
+):
+    """Official DIGIPIN, nearest known DIGIPIN cell and nearest PIN for a map point"""
+    return scoring_engine.evidence_aggregator.reverse_geocoder.reverse(lat, long)
+
+
+@router.post("/reverse/batch", response_model=List[ReverseGeocodeOutput])
+async def reverse_geocode_batch(
+    points: List[GeoPointInput],
+    user_id: str = Depends(get_current_user_id),
+    scoring_engine: ScoringEngine = Depends(get_scoring_engine)
+):
+    """Reverse-geocode up to MAX_BATCH_POINTS points; results are in input order"""
+    if len(points) > MAX_BATCH_POINTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_POINTS} points per batch")
+    return scoring_engine.evidence_aggregator.reverse_geocoder.reverse_batch([(p.lat, p.long) for p in points])
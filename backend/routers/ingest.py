@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import ValidationError
+from models import DeliveryEventInput, IotPingInput, IngestionAck
+from evidence_context import get_ingestor
+from ingestion import EvidenceIngestor, IngestionBufferFull
+from utils.auth import get_partner_id
+from utils.ndjson import parse_json_or_ndjson
+
+router = APIRouter(prefix="/api/ingest", tags=["ingestion"])
+
+
+async def _read_events(request: Request, model) -> list:
+    """Parse a JSON array / NDJSON body into validated event dicts"""
+    try:
+        items = parse_json_or_ndjson(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    events = []
+    for index, item in enumerate(items):
+        try:
+            events.append(model(**item).dict())
+        except (ValidationError, TypeError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid event at index {index}: {e}")
+    return events
+
+
+def _submit(ingestor: EvidenceIngestor, kind: str, events: list) -> IngestionAck:
+    try:
+        buffered = ingestor.submit(kind, events)
+    except IngestionBufferFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return IngestionAck(accepted=len(events), buffered=buffered)
+
+
+@router.post("/deliveries", response_model=IngestionAck, status_code=202)
+async def ingest_deliveries(
+    request: Request,
+    partner_id: str = Depends(get_partner_id),
+    ingestor: EvidenceIngestor = Depends(get_ingestor)
+):
+    """
+    Ingest delivery events ({digipin, delivery_date, delivery_count})
+    
+    Partner-only (X-API-Key). Accepts a JSON array or NDJSON. Events are
+    buffered and become visible to scoring after the next flush (about a
+    second).
+    """
+    return _submit(ingestor, "delivery", await _read_events(request, DeliveryEventInput))
+
+
+@router.post("/iot", response_model=IngestionAck, status_code=202)
+async def ingest_iot_pings(
+    request: Request,
+    partner_id: str = Depends(get_partner_id),
+    ingestor: EvidenceIngestor = Depends(get_ingestor)
+):
+    """
+    Ingest IoT pings ({digipin, timestamp, lat, long, signal_strength})
+    
+    Partner-only (X-API-Key). Accepts a JSON array or NDJSON.
+    """
+    return _submit(ingestor, "iot", await _read_events(request, IotPingInput))
+
+
+@router.get("/stats")
+async def ingestion_stats(
+    partner_id: str = Depends(get_partner_id),
+    ingestor: EvidenceIngestor = Depends(get_ingestor)
+):
+    """Buffer depth and flush counters (partner-only, X-API-Key)"""
+    return {**ingestor.stats, "buffered": len(ingestor), "capacity": ingestor.capacity}
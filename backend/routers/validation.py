@@ -1,27 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db, ValidationRequest, Address, User, EvidenceSignal, ValidationResult, Token, AuditLog
-from models import ValidationRequestInput, ValidationResultOutput, ValidationHistoryItem, EvidenceComponent
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager
+from database import get_db, SessionLocal, ValidationRequest, Address, User, ValidationResult, Token, AuditLog
+from models import (ValidationRequestInput, ValidationResultOutput, ValidationHistoryItem, EvidenceComponent,
+                    BatchValidationItem, BatchValidationResultLine, BatchValidationErrorLine, ValidationJobStatus)
 from scoring_engine import ScoringEngine
+from evidence_context import get_scoring_engine, get_job_pool
+from evidence_storage import load_evidence, store_evidence
 from token_service import TokenService
 from utils.auth import get_current_user_id
+from utils.concurrency import run_blocking
+from utils.ndjson import NDJSON_MEDIA_TYPE, parse_json_or_ndjson
+from validation_jobs import (TOKEN_MIN_ACS, ValidationJobPool, ValidationQueueFull, persist_validation,
+                             queue_position, score_address)
+from typing import Dict, List, Optional, Tuple
+import base64
 import uuid
 from datetime import datetime
 import hashlib
 
 router = APIRouter(prefix="/api", tags=["validation"])
 
-scoring_engine = ScoringEngine()
 token_service = TokenService()
 
+# /api/validate/batch: addresses per request, and per scored / committed / streamed chunk
+MAX_BATCH_ADDRESSES = 10_000
+BATCH_CHUNK_SIZE = 500
+
 
 def hash_pii(value: str) -> str:
     """Hash PII data for privacy"""
     return hashlib.sha256(value.encode()).hexdigest() if value else None
 
 
-@router.post("/validate", response_model=ValidationResultOutput)
-async def validate_address(request: ValidationRequestInput, user_id: str = Depends(get_current_user_id), db: Session = Depends(get_db)):
+@router.post("/validate", response_model=ValidationResultOutput,
+             responses={202: {"model": ValidationJobStatus, "description": "Queued (mode=async)"}})
+async def validate_address(
+    request: ValidationRequestInput,
+    mode: str = Query("sync", pattern="^(sync|async)$"),
+    user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+    scoring_engine: ScoringEngine = Depends(get_scoring_engine),
+    job_pool: ValidationJobPool = Depends(get_job_pool)
+):
     """
     Submit an Address Validation Request (AVR)
     
@@ -32,145 +57,271 @@ async def validate_address(request: ValidationRequestInput, user_id: str = Depen
     4. Stores evidence signals
     5. Returns ACS, VL, evidence, and suggestions
     6. Issues token if ACS >= VL2 threshold
+    
+    With mode=async, steps 3-6 are left to the validation job workers: the
+    request is queued and 202 is returned with its id; poll
+    /api/result/{request_id} until it is done.
     """
     
     # [SECURITY FIX] Override request user_id with authentic token user_id
     request.user_id = user_id
 
-    # Create or get user
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        user = User(id=user_id, created_at=datetime.utcnow())
-        db.add(user)
+    # Database and scoring work runs in one hop on the blocking thread pool; only the postal prefetch is awaited
+    validation_id = f"vr_{uuid.uuid4().hex[:12]}"
+    if mode == "async":
+        response = await run_blocking(_queue_validation, db, job_pool, request, validation_id)
+        job_pool.notify()
+        return response
+
+    await scoring_engine.evidence_aggregator.prefetch_postal_data(request.address.pin)
+    return await run_blocking(_validate_now, db, scoring_engine, request, validation_id)
+
+
+def _queue_validation(db: Session, job_pool: ValidationJobPool, request: ValidationRequestInput,
+                      validation_id: str) -> JSONResponse:
+    try:
+        job_pool.check_capacity(db)
+    except ValidationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    validation_request = _create_validation_request(db, request, validation_id, status="queued")
+    db.commit()
+    return _job_status_response(db, validation_request)
+
+
+def _validate_now(db: Session, scoring_engine: ScoringEngine, request: ValidationRequestInput,
+                  validation_id: str) -> ValidationResultOutput:
+    # Score before any write so the write lock isn't held during scoring; the request rows and the
+    # scoring outcome are then committed together by persist_validation
+    address_data = request.address.dict()
+    
+    # Run scoring engine
+    try:
+        scored = score_address(db, scoring_engine, address_data)
+        validation_request = _create_validation_request(db, request, validation_id, status="processing")
+        return _result_output(ValidationResultOutput, validation_id,
+                              **persist_validation(db, validation_request, address_data, scored))
+        
+    except Exception as e:
+        # Keep a record of the failed request
+        db.rollback()
+        _create_validation_request(db, request, validation_id, status="failed")
+        db.commit()
+        raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
+
+
+def _get_or_create_user(db: Session, user_id: str):
+    """Add the user if new; must be the first write of the transaction"""
+    if db.query(User).filter(User.id == user_id).first():
+        return
+    db.add(User(id=user_id, created_at=datetime.utcnow()))
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()  # A concurrent request created it first
+
+
+def _ensure_user(db: Session, user_id: str):
+    _get_or_create_user(db, user_id)
+    db.commit()
+
+
+def _create_validation_request(db: Session, request: ValidationRequestInput, validation_id: str,
+                               status: str) -> ValidationRequest:
+    """Add the user (if new), address and validation request to the session; the caller commits"""
+    _get_or_create_user(db, request.user_id)
     
     # Create address
     address_id = f"addr_{uuid.uuid4().hex[:12]}"
-    address_data = request.address.dict()
-    
     new_address = Address(
         id=address_id,
         user_id=request.user_id,
-        **address_data,
+        **request.address.dict(),
         created_at=datetime.utcnow()
     )
     db.add(new_address)
     
     # Create validation request
-    validation_id = f"vr_{uuid.uuid4().hex[:12]}"
     validation_request = ValidationRequest(
         id=validation_id,
         address_id=address_id,
         requester_id=request.user_id,
         consent_json=request.consent.dict(),
-        status="processing",
+        status=status,
         created_at=datetime.utcnow()
     )
     db.add(validation_request)
-    db.commit()
+    return validation_request
+
+
+def _job_status_response(db: Session, validation_request: ValidationRequest) -> JSONResponse:
+    """Progress of a validation that has no result yet: 202 while queued/processing, 200 once failed"""
+    status = ValidationJobStatus(
+        request_id=validation_request.id,
+        status=validation_request.status,
+        queue_position=queue_position(db, validation_request) if validation_request.status == "queued" else None,
+        created_at=validation_request.created_at,
+        updated_at=validation_request.updated_at
+    )
+    return JSONResponse(
+        status_code=200 if validation_request.status == "failed" else 202,
+        content=jsonable_encoder(status),
+        headers={"Location": f"/api/result/{validation_request.id}"}
+    )
+
+
+def _result_output(model, validation_id: str, acs: float, vl: str, reason_codes, suggestions, evidence,
+                   advanced_metrics: dict, token_id, **extra):
+    """Build a ValidationResultOutput (or subclass) from scoring engine output"""
+    return model(
+        request_id=validation_id,
+        acs=acs,
+        vl=vl,
+        reason_codes=reason_codes,
+        suggestions=suggestions,
+        evidence=[
+            EvidenceComponent(type=ev["type"], score=ev["score"], weight=ev["weight"], details=ev["details"])
+            for ev in evidence
+        ],
+        token_available=token_id is not None,
+        token_id=token_id,
+        fraud_risk=advanced_metrics.get('fraud_risk'),
+        position_confidence_meters=advanced_metrics.get('position_confidence_meters'),
+        escalation_path=advanced_metrics.get('escalation_path'),
+        address_fingerprint=advanced_metrics.get('address_fingerprint'),
+        category_avg_comparison=advanced_metrics.get('category_avg_comparison'),
+        **extra
+    )
+
+
+@router.post("/validate/batch")
+async def validate_address_batch(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    scoring_engine: ScoringEngine = Depends(get_scoring_engine)
+):
+    """
+    Validate up to MAX_BATCH_ADDRESSES addresses in one request
     
-    # Run scoring engine
+    Accepts a JSON array or NDJSON of {address, consent, reference?}.
+    Addresses are scored BATCH_CHUNK_SIZE at a time through
+    calculate_acs_batch, each chunk is written with bulk inserts in one
+    transaction, and its result lines are streamed back as NDJSON as soon
+    as it commits. Lines are in input order and carry the item's index and
+    reference; invalid items get an error line instead of a result.
+    """
     try:
-        acs, evidence, reason_codes, suggestions, advanced_metrics = scoring_engine.calculate_acs(address_data, db)
-        vl = scoring_engine.get_validation_level(acs)
-        
-        # Store evidence signals
-        for ev in evidence:
-            signal = EvidenceSignal(
-                validation_request_id=validation_id,
-                type=ev["type"],
-                score=ev["score"],
-                details_json=ev["details"],
-                timestamp=datetime.utcnow()
-            )
-            db.add(signal)
-        
-        # Store result
-        result = ValidationResult(
-            validation_request_id=validation_id,
-            acs=acs,
-            vl=vl,
-            reason_codes=reason_codes,
-            suggestions=suggestions,
-            created_at=datetime.utcnow()
-        )
-        db.add(result)
-        
-        # Issue token if ACS is high enough (VL2 or VL3)
-        token_available = False
-        token_id = None
-        
-        if acs >= 65:  # VL2 threshold
-            jwt_token, expires_at = token_service.create_validation_token(
-                validation_id, address_data, acs, vl, request.user_id
-            )
-            qr_data = token_service.create_qr_data(jwt_token, validation_id)
-            
-            token = Token(
-                validation_request_id=validation_id,
-                jwt=jwt_token,
-                issued_at=datetime.utcnow(),
-                expires_at=expires_at,
-                revoked=False
-            )
-            db.add(token)
-            db.commit()
-            
-            token_id = token.id
-            token_available = True
-            
-            # Update result with token_id
-            result.token_id = token_id
-        
-        # Update status
-        validation_request.status = "done"
-        db.commit()
-        
-        # Audit log
-        audit = AuditLog(
-            action="validation_completed",
-            user_id=request.user_id,
-            details_json={"validation_id": validation_id, "acs": acs, "vl": vl},
-            timestamp=datetime.utcnow()
-        )
-        db.add(audit)
-        db.commit()
-        
-        # Build response
-        evidence_output = [
-            EvidenceComponent(
-                type=ev["type"],
-                score=ev["score"],
-                weight=ev["weight"],
-                details=ev["details"]
-            )
-            for ev in evidence
-        ]
-        
-        return ValidationResultOutput(
-            request_id=validation_id,
-            acs=acs,
-            vl=vl,
-            reason_codes=reason_codes,
-            suggestions=suggestions,
-            evidence=evidence_output,
-            token_available=token_available,
-            token_id=token_id,
-            fraud_risk=advanced_metrics.get('fraud_risk'),
-            position_confidence_meters=advanced_metrics.get('position_confidence_meters'),
-            escalation_path=advanced_metrics.get('escalation_path'),
-            address_fingerprint=advanced_metrics.get('address_fingerprint'),
-            category_avg_comparison=advanced_metrics.get('category_avg_comparison')
-        )
-        
-    except Exception as e:
-        validation_request.status = "failed"
+        items = parse_json_or_ndjson(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(items) > MAX_BATCH_ADDRESSES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_ADDRESSES} addresses per batch")
+
+    async def result_lines():
+        db = SessionLocal()
+        try:
+            await run_blocking(_ensure_user, db, user_id)
+
+            for start in range(0, len(items), BATCH_CHUNK_SIZE):
+                valid, lines = _parse_batch_items(items[start:start + BATCH_CHUNK_SIZE], start)
+                if valid:
+                    await scoring_engine.evidence_aggregator.prefetch_postal_data_many(
+                        item.address.pin for _, item in valid
+                    )
+                    try:
+                        lines.update(await run_blocking(_validate_chunk, db, scoring_engine, user_id, valid))
+                    except Exception as e:
+                        # _validate_chunk has already rolled back
+                        lines.update({index: BatchValidationErrorLine(
+                            index=index, reference=item.reference, error=f"Validation failed: {str(e)}"
+                        ).json() for index, item in valid})
+                yield "".join(lines[index] + "\n" for index in sorted(lines))
+        finally:
+            db.close()
+
+    return StreamingResponse(result_lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _parse_batch_items(items: list, start: int) -> Tuple[List[Tuple[int, BatchValidationItem]], Dict[int, str]]:
+    """Split raw items into (index, BatchValidationItem) pairs and error lines keyed by index"""
+    valid, errors = [], {}
+    for index, item in enumerate(items, start=start):
+        try:
+            valid.append((index, BatchValidationItem(**item)))
+        except (ValidationError, TypeError) as e:
+            reference = item.get("reference") if isinstance(item, dict) else None
+            errors[index] = BatchValidationErrorLine(
+                index=index, reference=reference if isinstance(reference, str) else None,
+                error=f"Invalid item: {e}"
+            ).json()
+    return valid, errors
+
+
+def _validate_chunk(db: Session, scoring_engine: ScoringEngine, user_id: str,
+                    items: List[Tuple[int, BatchValidationItem]]) -> Dict[int, str]:
+    """Score one chunk, persist it with bulk inserts and one commit, and return result lines keyed by index"""
+    now = datetime.utcnow()
+    address_data = [item.address.dict() for _, item in items]
+    try:
+        results = scoring_engine.calculate_acs_batch(address_data, db)
+    finally:
+        db.rollback()  # End any read transaction the scoring opened before the writes
+
+    validation_ids = [f"vr_{uuid.uuid4().hex[:12]}" for _ in items]
+    addresses, requests, tokens, audits = [], [], [], []
+    for (_, item), address, result, validation_id in zip(items, address_data, results, validation_ids):
+        address_id = f"addr_{uuid.uuid4().hex[:12]}"
+        acs, vl = result["acs"], result["validation_level"]
+        addresses.append({"id": address_id, "user_id": user_id, **address, "created_at": now})
+        requests.append({"id": validation_id, "address_id": address_id, "requester_id": user_id,
+                         "consent_json": item.consent.dict(), "status": "done", "created_at": now})
+        if acs >= TOKEN_MIN_ACS:
+            jwt_token, expires_at = token_service.create_validation_token(validation_id, address, acs, vl, user_id)
+            tokens.append({"validation_request_id": validation_id, "jwt": jwt_token, "issued_at": now,
+                           "expires_at": expires_at, "revoked": False})
+        audits.append({"action": "validation_completed", "user_id": user_id, "timestamp": now,
+                       "details_json": {"validation_id": validation_id, "acs": acs, "vl": vl}})
+
+    try:
+        db.execute(insert(Address), addresses)
+        db.execute(insert(ValidationRequest), requests)
+        store_evidence(db, zip(validation_ids, (result["evidence"] for result in results)), now)
+        token_ids = {}
+        if tokens:
+            token_ids = dict(db.execute(
+                insert(Token).returning(Token.validation_request_id, Token.id, sort_by_parameter_order=True), tokens
+            ).all())
+        db.execute(insert(ValidationResult), [
+            {"validation_request_id": validation_id, "acs": result["acs"], "vl": result["validation_level"],
+             "reason_codes": result["reason_codes"], "suggestions": result["suggestions"],
+             "token_id": token_ids.get(validation_id), "created_at": now}
+            for validation_id, result in zip(validation_ids, results)
+        ])
+        db.execute(insert(AuditLog), audits)
         db.commit()
-        raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        index: _result_output(
+            BatchValidationResultLine, validation_id, result["acs"], result["validation_level"],
+            result["reason_codes"], result["suggestions"], result["evidence"], result["advanced_metrics"],
+            token_ids.get(validation_id), index=index, reference=item.reference
+        ).json()
+        for (index, item), validation_id, result in zip(items, validation_ids, results)
+    }
 
 
-@router.get("/result/{request_id}", response_model=ValidationResultOutput)
-async def get_validation_result(request_id: str, db: Session = Depends(get_db)):
-    """Get validation result by request ID"""
+@router.get("/result/{request_id}", response_model=ValidationResultOutput,
+            responses={202: {"model": ValidationJobStatus, "description": "Still queued or processing"},
+                       200: {"description": "The result, or a ValidationJobStatus with status \"failed\""}})
+def get_validation_result(request_id: str, include_details: bool = True, db: Session = Depends(get_db)):
+    """
+    Get validation result by request ID; 202 with job progress while it is queued or processing,
+    200 with status "failed" if it failed
+    
+    include_details=false leaves evidence details empty, which skips reading and decoding them.
+    """
     
     validation_request = db.query(ValidationRequest).filter(ValidationRequest.id == request_id).first()
     if not validation_request:
@@ -178,18 +329,19 @@ async def get_validation_result(request_id: str, db: Session = Depends(get_db)):
     
     result = db.query(ValidationResult).filter(ValidationResult.validation_request_id == request_id).first()
     if not result:
+        if validation_request.status in ("queued", "processing", "failed"):
+            return _job_status_response(db, validation_request)
         raise HTTPException(status_code=404, detail="Result not found")
     
     # Get evidence
-    evidence_signals = db.query(EvidenceSignal).filter(EvidenceSignal.validation_request_id == request_id).all()
     evidence_output = [
         EvidenceComponent(
-            type=ev.type,
-            score=ev.score,
+            type=ev["type"],
+            score=ev["score"],
             weight=0.0,  # Will be filled from scoring engine weights
-            details=ev.details_json
+            details=ev["details"] or {}
         )
-        for ev in evidence_signals
+        for ev in load_evidence(db, request_id, include_details)
     ]
     
     # Check token availability
@@ -209,7 +361,7 @@ async def get_validation_result(request_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/token/{request_id}")
-async def get_token(request_id: str, db: Session = Depends(get_db)):
+def get_token(request_id: str, db: Session = Depends(get_db)):
     """Download signed validation token"""
     
     result = db.query(ValidationResult).filter(ValidationResult.validation_request_id == request_id).first()
@@ -236,43 +388,74 @@ async def get_token(request_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/history")
-async def get_user_history(user_id: str = Depends(get_current_user_id), db: Session = Depends(get_db)):
-    """Get user's validation history"""
+def get_user_history(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Get user's validation history, newest first
+    
+    One joined query per page regardless of its size. Pages are keyed on
+    (created_at, id): pass the returned next_cursor to get the next page;
+    it is null on the last page.
+    """
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return {"history": []}
+    query = db.query(ValidationRequest).join(ValidationRequest.result).join(ValidationRequest.address).outerjoin(
+        ValidationResult.token
+    ).options(
+        contains_eager(ValidationRequest.result).contains_eager(ValidationResult.token),
+        contains_eager(ValidationRequest.address)
+    ).filter(ValidationRequest.requester_id == user_id)
     
-    # Get all validation requests for this user
-    validations = db.query(ValidationRequest).filter(
-        ValidationRequest.requester_id == user_id
-    ).order_by(ValidationRequest.created_at.desc()).limit(20).all()
+    if cursor:
+        created_at, request_id = _decode_history_cursor(cursor)
+        query = query.filter(or_(
+            ValidationRequest.created_at < created_at,
+            and_(ValidationRequest.created_at == created_at, ValidationRequest.id < request_id)
+        ))
+    
+    # One extra row tells whether there is a next page
+    validations = query.order_by(
+        ValidationRequest.created_at.desc(), ValidationRequest.id.desc()
+    ).limit(limit + 1).all()
+    page = validations[:limit]
     
     history = []
-    for val_req in validations:
-        result = db.query(ValidationResult).filter(ValidationResult.validation_request_id == val_req.id).first()
-        address = db.query(Address).filter(Address.id == val_req.address_id).first()
-        
-        if result and address:
-            token = db.query(Token).filter(Token.id == result.token_id).first() if result.token_id else None
-            token_available = token is not None and not token.revoked
-            
-            history.append({
-                "request_id": val_req.id,
-                "address": {
-                    "house_no": address.house_no,
-                    "street": address.street,
-                    "locality": address.locality,
-                    "city": address.city,
-                    "district": address.district,
-                    "state": address.state,
-                    "pin": address.pin,
-                    "digipin": address.digipin
-                },
-                "acs": result.acs,
-                "vl": result.vl,
-                "created_at": val_req.created_at.isoformat(),
-                "token_available": token_available
-            })
+    for val_req in page:
+        result, address, token = val_req.result, val_req.address, val_req.result.token
+        history.append({
+            "request_id": val_req.id,
+            "address": {
+                "house_no": address.house_no,
+                "street": address.street,
+                "locality": address.locality,
+                "city": address.city,
+                "district": address.district,
+                "state": address.state,
+                "pin": address.pin,
+                "digipin": address.digipin
+            },
+            "acs": result.acs,
+            "vl": result.vl,
+            "created_at": val_req.created_at.isoformat(),
+            "token_available": token is not None and not token.revoked
+        })
     
-    return {"history": history}
+    next_cursor = None
+    if len(validations) > limit:
+        next_cursor = _encode_history_cursor(page[-1].created_at, page[-1].id)
+    return {"history": history, "next_cursor": next_cursor}
+
+
+def _encode_history_cursor(created_at: datetime, request_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{request_id}".encode()).decode()
+
+
+def _decode_history_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, request_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), request_id
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
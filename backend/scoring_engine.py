@@ -1,7 +1,9 @@
 import os
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 from dotenv import load_dotenv
 from evidence_aggregator import EvidenceAggregator
+from utils.snapshot import open_snapshot
 
 load_dotenv()
 
@@ -20,6 +22,16 @@ VL1_THRESHOLD = float(os.getenv("ACS_VL1_THRESHOLD", 42))    # Was 40, now stric
 VL2_THRESHOLD = float(os.getenv("ACS_VL2_THRESHOLD", 68))    # Was 65, now stricter  
 VL3_THRESHOLD = float(os.getenv("ACS_VL3_THRESHOLD", 87))    # Was 85, now stricter for high confidence
 
+# The ten ACS components and their weights, in the order calculate_acs sums them
+ACS_COMPONENTS = [
+    ("geo", 0.206), ("geo_precision", 0.047), ("temporal", 0.168), ("temporal_decay", 0.047),
+    ("iot", 0.131), ("doc", 0.168), ("crowd", 0.093), ("linguistic", 0.047),
+    ("cross_corpus", 0.047), ("history", 0.047),
+]
+
+# Cities whose category average is the urban one (see _get_category_average)
+URBAN_CITIES = ['thrissur', 'delhi', 'mumbai', 'bangalore', 'chennai']
+
 
 class ScoringEngine:
     """
@@ -31,7 +43,8 @@ class ScoringEngine:
     """
     
     def __init__(self):
-        self.evidence_aggregator = EvidenceAggregator()
+        data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.evidence_aggregator = EvidenceAggregator(snapshot=open_snapshot(data_dir))
         self.weights = {
             "geo": GEO_WEIGHT,
             "temporal": TEMPORAL_WEIGHT,
@@ -139,60 +152,204 @@ class ScoringEngine:
         )
         
         # DEMO OVERRIDE: Force Scores
-        digipin = address.get("digipin")
+        override = self._demo_override(address.get("digipin"), {ev["type"]: ev["details"] for ev in evidence})
+        if override is not None:
+            acs, evidence, reason_codes, suggestions = override
+
+        return acs, evidence, reason_codes, suggestions, advanced_metrics
+    
+    def calculate_acs_batch(self, addresses: List[Dict[str, str]], db=None) -> List[Dict[str, Any]]:
+        """
+        Score many addresses at once; same results as calculate_acs, in input order
         
+        Evidence is fetched once per group of addresses that share its inputs
+        (DIGIPIN for delivery/IoT/crowd, DIGIPIN+PIN for documents, and so on),
+        then the weighted ACS, cross-corpus agreement, validation levels and
+        advanced metrics are computed as array operations over the batch.
+        
+        Returns one dict per address with acs, validation_level, evidence,
+        reason_codes, suggestions and advanced_metrics.
+        """
+        n = len(addresses)
+        if n == 0:
+            return []
+        agg = self.evidence_aggregator
+        
+        # Per-group evidence: each lookup runs once per distinct key
+        by_digipin, by_doc_key, by_geo_key, by_area_key, by_text_key = {}, {}, {}, {}, {}
+        details = {name: [None] * n for name, _ in ACS_COMPONENTS}
+        scores = np.zeros((len(ACS_COMPONENTS), n))
+        column = {name: i for i, (name, _) in enumerate(ACS_COMPONENTS)}
+        
+        for i, address in enumerate(addresses):
+            digipin, pin = address.get("digipin", ""), address.get("pin", "")
+            if digipin not in by_digipin:
+                by_digipin[digipin] = {
+                    "temporal": agg.get_temporal_evidence(address),
+                    "temporal_decay": agg.get_temporal_decay_evidence(address),
+                    "iot": agg.get_iot_evidence(address),
+                    "crowd": agg.get_crowd_evidence(address),
+                }
+            doc_key = (digipin, pin)
+            if doc_key not in by_doc_key:
+                by_doc_key[doc_key] = agg.get_documentary_evidence(address)
+            geo_key = (digipin, pin, address.get("locality", "").lower(), address.get("city", "").lower())
+            if geo_key not in by_geo_key:
+                by_geo_key[geo_key] = agg.get_geo_evidence(address)
+            # Geo precision: only the house-number level is per address
+            area_key = (pin, digipin, address.get("locality", ""))
+            if area_key not in by_area_key:
+                by_area_key[area_key] = agg.geo_utils.area_precision(*area_key)
+            text_key = (agg.linguistic_validator.normalize_address(address), digipin)
+            if text_key not in by_text_key:
+                by_text_key[text_key] = agg.get_linguistic_evidence(address)
+            
+            found = dict(by_digipin[digipin])
+            found["doc"] = by_doc_key[doc_key]
+            found["geo"] = by_geo_key[geo_key]
+            found["geo_precision"] = agg.get_geo_precision_evidence(address, by_area_key[area_key])
+            found["linguistic"] = by_text_key[text_key]
+            found["history"] = agg.get_history_evidence(address, db)
+            for name, (score, detail) in found.items():
+                scores[column[name], i] = score
+                details[name][i] = detail
+        
+        # Cross-corpus agreement over the five base signals
+        base = [scores[column[name]] for name in ("geo", "temporal", "iot", "doc", "crowd")]
+        avg_score = (base[0] + base[1] + base[2] + base[3] + base[4]) / 5
+        variance = sum((b - avg_score) ** 2 for b in base) / 5
+        std_dev = variance ** 0.5
+        high_confidence = sum((b >= 70).astype(np.int64) for b in base)
+        agreement = np.maximum(0, 100 - std_dev * 2.5)
+        agreement = np.where(high_confidence >= 4, np.minimum(100, agreement + 20),
+                             np.where(high_confidence >= 3, np.minimum(100, agreement + 10), agreement))
+        agreement = np.array([round(a, 2) for a in agreement.tolist()])
+        scores[column["cross_corpus"]] = agreement
+        base_rows = np.array(base).T.tolist()
+        for i, (avg, std, score, high, row) in enumerate(zip(avg_score.tolist(), std_dev.tolist(), agreement.tolist(),
+                                                             high_confidence.tolist(), base_rows)):
+            details["cross_corpus"][i] = {
+                "method": "cross_corpus_validation",
+                "average_score": round(avg, 2),
+                "std_deviation": round(std, 2),
+                "agreement_score": score,
+                "high_confidence_sources": high,
+                "score_distribution": dict(zip(("geo", "temporal", "iot", "doc", "crowd"), row))
+            }
+        
+        # Weighted ACS, summed in the same order as calculate_acs so results match exactly
+        acs = np.zeros(n)
+        for row, (_, weight) in enumerate(ACS_COMPONENTS):
+            acs = acs + scores[row] * weight
+        acs = np.array([round(a, 2) for a in acs.tolist()])
+        
+        advanced = self._calculate_advanced_metrics_batch(addresses, acs, details)
+        
+        names = [name for name, _ in ACS_COMPONENTS]
+        results = []
+        for i, (address, row_scores, row_acs) in enumerate(zip(addresses, scores.T.tolist(), acs.tolist())):
+            row = dict(zip(names, row_scores))
+            # Shallow copies: callers (e.g. admin confirmation) update evidence details in place
+            row_details = {name: dict(details[name][i]) for name, _ in ACS_COMPONENTS}
+            evidence = [
+                {"type": name, "score": round(row[name], 2), "weight": weight, "details": row_details[name]}
+                for name, weight in ACS_COMPONENTS
+            ]
+            
+            reason_codes = self._generate_reason_codes(
+                row_acs, row["geo"], row_details["geo"], row["temporal"], row_details["temporal"],
+                row["iot"], row_details["iot"], row["doc"], row_details["doc"], row["crowd"], row_details["crowd"]
+            )
+            if row["geo_precision"] >= 80:
+                reason_codes.append("geo_precision_high")
+            if row["linguistic"] >= 70:
+                reason_codes.append("cultural_patterns_matched")
+            if row_details["temporal_decay"].get('suspicious_patterns'):
+                reason_codes.extend(row_details["temporal_decay"]['suspicious_patterns'])
+            if row["cross_corpus"] >= 80:
+                reason_codes.append("evidence_strong_agreement")
+            
+            suggestions = self._generate_suggestions(
+                row["geo"], row_details["geo"], row["temporal"], row["iot"], row["doc"], row["crowd"], address
+            )
+            if row["linguistic"] < 50:
+                suggestions.append("Include nearby landmarks (temple, school, shop) in your address")
+            
+            final_acs = row_acs
+            override = self._demo_override(address.get("digipin"), row_details)
+            if override is not None:
+                final_acs, evidence, reason_codes, suggestions = override
+            
+            results.append({
+                "acs": final_acs,
+                "evidence": evidence,
+                "reason_codes": reason_codes,
+                "suggestions": suggestions,
+                "advanced_metrics": advanced[i],
+            })
+        
+        levels = self.get_validation_levels([r["acs"] for r in results])
+        for result, level in zip(results, levels.tolist()):
+            result["validation_level"] = level
+        return results
+    
+    def _demo_override(self, digipin: str, details: Dict[str, Dict]) -> Optional[Tuple[float, List[Dict], List[str], List[str]]]:
+        """Forced (acs, evidence, reason_codes, suggestions) for the demo DIGIPINs, else None"""
         if digipin == "BG-5600-38-IN": # High
             acs = 95.0
             evidence = [
-                {"type": "geo", "score": 100.0, "weight": 0.206, "details": geo_details},
-                {"type": "geo_precision", "score": 100.0, "weight": 0.047, "details": geo_precision_details},
-                {"type": "temporal", "score": 100.0, "weight": 0.168, "details": temporal_details},
-                {"type": "temporal_decay", "score": 90.0, "weight": 0.047, "details": temporal_decay_details},
-                {"type": "iot", "score": 100.0, "weight": 0.131, "details": iot_details},
-                {"type": "doc", "score": 90.0, "weight": 0.168, "details": doc_details},
-                {"type": "crowd", "score": 100.0, "weight": 0.093, "details": crowd_details},
-                {"type": "linguistic", "score": 100.0, "weight": 0.047, "details": linguistic_details},
-                {"type": "cross_corpus", "score": 100.0, "weight": 0.047, "details": cross_corpus_details},
-                {"type": "history", "score": 80.0, "weight": 0.047, "details": history_details}
+                {"type": "geo", "score": 100.0, "weight": 0.206, "details": details["geo"]},
+                {"type": "geo_precision", "score": 100.0, "weight": 0.047, "details": details["geo_precision"]},
+                {"type": "temporal", "score": 100.0, "weight": 0.168, "details": details["temporal"]},
+                {"type": "temporal_decay", "score": 90.0, "weight": 0.047, "details": details["temporal_decay"]},
+                {"type": "iot", "score": 100.0, "weight": 0.131, "details": details["iot"]},
+                {"type": "doc", "score": 90.0, "weight": 0.168, "details": details["doc"]},
+                {"type": "crowd", "score": 100.0, "weight": 0.093, "details": details["crowd"]},
+                {"type": "linguistic", "score": 100.0, "weight": 0.047, "details": details["linguistic"]},
+                {"type": "cross_corpus", "score": 100.0, "weight": 0.047, "details": details["cross_corpus"]},
+                {"type": "history", "score": 80.0, "weight": 0.047, "details": details["history"]}
             ]
             reason_codes = ["geo_exact_match", "delivery_history_found", "iot_ping_active", "community_validated", "evidence_strong_agreement"]
             suggestions = ["Address is fully verified and trusted."]
-            
-        elif digipin == "ND-2013-01-S4": # Medium
+            return acs, evidence, reason_codes, suggestions
+
+        if digipin == "ND-2013-01-S4": # Medium
             acs = 72.0
             evidence = [
-                {"type": "geo", "score": 80.0, "weight": 0.206, "details": geo_details},
-                {"type": "geo_precision", "score": 70.0, "weight": 0.047, "details": geo_precision_details},
-                {"type": "temporal", "score": 60.0, "weight": 0.168, "details": temporal_details},
-                {"type": "temporal_decay", "score": 50.0, "weight": 0.047, "details": temporal_decay_details},
-                {"type": "iot", "score": 40.0, "weight": 0.131, "details": iot_details},
-                {"type": "doc", "score": 50.0, "weight": 0.168, "details": doc_details},
-                {"type": "crowd", "score": 40.0, "weight": 0.093, "details": crowd_details},
-                {"type": "linguistic", "score": 80.0, "weight": 0.047, "details": linguistic_details},
-                {"type": "cross_corpus", "score": 60.0, "weight": 0.047, "details": cross_corpus_details},
-                {"type": "history", "score": 0.0, "weight": 0.047, "details": history_details}
+                {"type": "geo", "score": 80.0, "weight": 0.206, "details": details["geo"]},
+                {"type": "geo_precision", "score": 70.0, "weight": 0.047, "details": details["geo_precision"]},
+                {"type": "temporal", "score": 60.0, "weight": 0.168, "details": details["temporal"]},
+                {"type": "temporal_decay", "score": 50.0, "weight": 0.047, "details": details["temporal_decay"]},
+                {"type": "iot", "score": 40.0, "weight": 0.131, "details": details["iot"]},
+                {"type": "doc", "score": 50.0, "weight": 0.168, "details": details["doc"]},
+                {"type": "crowd", "score": 40.0, "weight": 0.093, "details": details["crowd"]},
+                {"type": "linguistic", "score": 80.0, "weight": 0.047, "details": details["linguistic"]},
+                {"type": "cross_corpus", "score": 60.0, "weight": 0.047, "details": details["cross_corpus"]},
+                {"type": "history", "score": 0.0, "weight": 0.047, "details": details["history"]}
             ]
             reason_codes = ["geo_partial_match", "limited_delivery_history", "iot_ping_old"]
             suggestions = ["Request a test delivery to improve score", "Verify exact location pin"]
+            return acs, evidence, reason_codes, suggestions
 
-        elif digipin == "MP-4500-01-XX": # Low
+        if digipin == "MP-4500-01-XX": # Low
             acs = 25.0
             evidence = [
-                {"type": "geo", "score": 40.0, "weight": 0.206, "details": geo_details},
-                {"type": "geo_precision", "score": 30.0, "weight": 0.047, "details": geo_precision_details},
-                {"type": "temporal", "score": 0.0, "weight": 0.168, "details": temporal_details},
-                {"type": "temporal_decay", "score": 0.0, "weight": 0.047, "details": temporal_decay_details},
-                {"type": "iot", "score": 0.0, "weight": 0.131, "details": iot_details},
-                {"type": "doc", "score": 0.0, "weight": 0.168, "details": doc_details},
-                {"type": "crowd", "score": 0.0, "weight": 0.093, "details": crowd_details},
-                {"type": "linguistic", "score": 40.0, "weight": 0.047, "details": linguistic_details},
-                {"type": "cross_corpus", "score": 20.0, "weight": 0.047, "details": cross_corpus_details},
-                {"type": "history", "score": 0.0, "weight": 0.047, "details": history_details}
+                {"type": "geo", "score": 40.0, "weight": 0.206, "details": details["geo"]},
+                {"type": "geo_precision", "score": 30.0, "weight": 0.047, "details": details["geo_precision"]},
+                {"type": "temporal", "score": 0.0, "weight": 0.168, "details": details["temporal"]},
+                {"type": "temporal_decay", "score": 0.0, "weight": 0.047, "details": details["temporal_decay"]},
+                {"type": "iot", "score": 0.0, "weight": 0.131, "details": details["iot"]},
+                {"type": "doc", "score": 0.0, "weight": 0.168, "details": details["doc"]},
+                {"type": "crowd", "score": 0.0, "weight": 0.093, "details": details["crowd"]},
+                {"type": "linguistic", "score": 40.0, "weight": 0.047, "details": details["linguistic"]},
+                {"type": "cross_corpus", "score": 20.0, "weight": 0.047, "details": details["cross_corpus"]},
+                {"type": "history", "score": 0.0, "weight": 0.047, "details": details["history"]}
             ]
             reason_codes = ["geo_mismatch", "no_delivery_history", "no_iot_signal"]
             suggestions = ["Complete KYC verification", "Address appears incomplete"]
+            return acs, evidence, reason_codes, suggestions
 
-        return acs, evidence, reason_codes, suggestions, advanced_metrics
+        return None
     
     def get_validation_level(self, acs: float) -> str:
         """Map ACS to Validation Level (VL0-VL3)"""
@@ -205,6 +362,14 @@ class ScoringEngine:
         else:
             return "VL0"
     
+    def get_validation_levels(self, acs_values) -> np.ndarray:
+        """Vectorized get_validation_level over an array of ACS values"""
+        acs_values = np.asarray(acs_values, dtype=np.float64)
+        return np.select(
+            [acs_values >= VL3_THRESHOLD, acs_values >= VL2_THRESHOLD, acs_values >= VL1_THRESHOLD],
+            ["VL3", "VL2", "VL1"], default="VL0"
+        )
+    
     def _generate_reason_codes(
         self, acs, geo_score, geo_details, temporal_score, temporal_details,
         iot_score, iot_details, doc_score, doc_details, crowd_score, crowd_details
@@ -350,6 +515,68 @@ class ScoringEngine:
             'category_avg_comparison': category_avg
         }
     
+    def _calculate_advanced_metrics_batch(
+        self, addresses: List[Dict[str, str]], acs: np.ndarray, details: Dict[str, List[Dict]]
+    ) -> List[Dict]:
+        """_calculate_advanced_metrics for a whole batch, with the numeric rules as array operations"""
+        from utils.fingerprint import generate_fingerprint
+        
+        # Fraud risk
+        patterns = [d.get('suspicious_patterns', []) for d in details["temporal_decay"]]
+        pattern_count = np.array([len(p) for p in patterns])
+        risk_percentage = np.minimum(100, np.select(
+            [pattern_count > 0, acs < 40, acs < 65],
+            [60.0 + pattern_count * 20.0, 30.0, 10.0], default=2.0
+        ))
+        risk_level = np.select([pattern_count > 0, acs < 40], ['high', 'medium'], default='low')
+        
+        # Position confidence: PIN-DIGIPIN distance scaled by an ACS band multiplier
+        distance = np.array([
+            np.nan if d.get('pin_digipin_distance_km') is None else d['pin_digipin_distance_km']
+            for d in details["geo_precision"]
+        ])
+        multiplier = np.select([acs >= 85, acs >= 65, acs >= 40], [0.5, 1.0, 2.0], default=3.0)
+        base_confidence = np.trunc(np.nan_to_num(distance) * 200)
+        position = np.clip(np.trunc(base_confidence * multiplier), 20, 1000)
+        position = np.where(np.isnan(distance), 500, position).astype(np.int64)
+        
+        # Escalation path
+        escalation = np.select(
+            [risk_percentage >= 60, acs >= 85, acs >= 65, acs >= 40],
+            ['fraud_queue', 'auto_token', 'iot_check', 'crowd_validation'], default='postman_queue'
+        )
+        
+        # Category comparison
+        urban = np.array([a.get('city', '').lower() in URBAN_CITIES for a in addresses])
+        average = np.where(urban, 78.5, 62.3)
+        z_score = (acs - average) / 15
+        percentile = np.select(
+            [z_score >= 2, z_score >= 1.5, z_score >= 1, z_score >= 0.5, z_score >= 0, z_score >= -0.5, z_score >= -1],
+            [98, 93, 84, 69, 50, 31, 16], default=5
+        )
+        difference = (acs - average).tolist()
+        
+        return [
+            {
+                'fraud_risk': {
+                    'risk_percentage': float(risk_percentage[i]),
+                    'risk_level': str(risk_level[i]),
+                    'suspicious_patterns': patterns[i],
+                    'velocity_score': details["temporal_decay"][i].get('fraud_adjustment', 0)
+                },
+                'position_confidence_meters': int(position[i]),
+                'escalation_path': str(escalation[i]),
+                'address_fingerprint': generate_fingerprint(address),
+                'category_avg_comparison': {
+                    'category': 'Urban' if urban[i] else 'Suburban/Rural',
+                    'average_acs': float(average[i]),
+                    'difference': round(difference[i], 2),
+                    'percentile': int(percentile[i])
+                }
+            }
+            for i, address in enumerate(addresses)
+        ]
+    
     def _assess_fraud_risk(self, temporal_decay_details: Dict, acs: float) -> Dict:
         """Assess fraud risk based on suspicious patterns and low ACS"""
         suspicious_patterns = temporal_decay_details.get('suspicious_patterns', [])
@@ -417,9 +644,7 @@ class ScoringEngine:
     def _get_category_average(self, city: str, current_acs: float) -> Dict:
         """Get category average for comparison (simulated)"""
         # Simulated averages by city type
-        urban_cities = ['thrissur', 'delhi', 'mumbai', 'bangalore', 'chennai']
-        
-        if city.lower() in urban_cities:
+        if city.lower() in URBAN_CITIES:
             category = 'Urban'
             avg_acs = 78.5
         else:
@@ -0,0 +1,56 @@
+"""
+Tests for the DIGIPIN codec
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pytest
+
+from utils import digipin
+from utils.geospatial import GeospatialUtils
+
+
+def test_known_code_round_trip():
+    # Dak Bhawan, New Delhi (India Post reference example)
+    assert digipin.encode(28.622788, 77.213033) == "39J-49L-L8T4"
+    box = digipin.bounds("39J-49L-L8T4")
+    assert box["min_lat"] <= 28.622788 <= box["max_lat"]
+    assert box["min_lon"] <= 77.213033 <= box["max_lon"]
+    assert digipin.decode("39j49ll8t4") == digipin.decode("39J-49L-L8T4")
+
+
+def test_batch_matches_scalar():
+    rng = np.random.default_rng(5)
+    lats = rng.uniform(digipin.MIN_LAT, digipin.MAX_LAT, 500)
+    lons = rng.uniform(digipin.MIN_LON, digipin.MAX_LON, 500)
+
+    codes = digipin.encode_batch(lats, lons)
+    assert [digipin.encode(a, b) for a, b in zip(lats, lons)] == codes.tolist()
+
+    centre_lats, centre_lons = digipin.decode_batch(codes)
+    assert [digipin.decode(c) for c in codes] == list(zip(centre_lats, centre_lons))
+    assert np.all(np.abs(centre_lats - lats) < 4e-5) and np.all(np.abs(centre_lons - lons) < 4e-5)
+    assert (digipin.encode_batch(centre_lats, centre_lons) == codes).all()
+
+
+def test_invalid_codes_and_points():
+    assert digipin.is_valid_digipin("39J-49L-L8T4")
+    assert not digipin.is_valid_digipin("KP01-AB12-CD")
+    assert not digipin.is_valid_digipin("")
+    with pytest.raises(ValueError):
+        digipin.decode("KP01-AB12-CD")
+    with pytest.raises(ValueError):
+        digipin.encode(51.5, -0.1)
+
+
+def test_geo_utils_decodes_official_codes_and_falls_back_to_grid():
+    geo = GeospatialUtils()
+    lat, lon = digipin.decode("39J-49L-L8T4")
+    assert geo.get_digipin_center("39J-49L-L8T4") == {"lat": lat, "long": lon}
+    assert geo.get_digipin_center("AB12-CD34-EF") == {"lat": 10.5276, "long": 76.2144}
+    assert geo.get_digipin_center("unknown") is None
@@ -0,0 +1,375 @@
+"""
+Tests for the columnar evidence store and the compiled evidence snapshot
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from evidence_aggregator import EvidenceAggregator
+from build_snapshot import collect_snapshot_data, SOURCE_FILES
+from utils.evidence_store import ColumnarEvidenceStore
+from utils.rolling_aggregates import DeliveryAggregates, WINDOWS
+from utils.iot_retention import IotPingRetention
+from utils.crowd_store import CrowdValidationStore
+from utils.document_index import DocumentIndex
+from utils.street_index import StreetSegmentIndex
+from utils.spatial_index import GridSpatialIndex
+from utils.distance import PreparedCentre, haversine_km, haversine_pairwise_km
+from utils.geofence import GEOFENCE_RADIUS_M, geofence_stats
+from utils.geospatial import GeospatialUtils
+from utils.reverse_geocode import ReverseGeocoder
+from utils.polygon_index import PolygonIndex, points_in_polygon
+from utils.pin_digipin_table import PIN_REGION_RADIUS_KM, TABLE_RADIUS_KM
+from utils import digipin as digipin_codec
+from utils.snapshot import EvidenceSnapshot, write_snapshot, open_snapshot
+
+
+SAMPLE_ADDRESS = {
+    'house_no': '12/345', 'street': 'MG Road', 'locality': 'Swaraj Round', 'city': 'Thrissur',
+    'district': 'Thrissur', 'state': 'Kerala', 'pin': '680001', 'digipin': 'KP01-AB12-CD'
+}
+
+
+def test_columnar_store_slices_sorted_by_digipin_and_time():
+    store = ColumnarEvidenceStore.from_values(
+        ["B", "A", "B", "A"],
+        ["2025-01-03", "2025-01-02", "2025-01-01", "not-a-date"],
+        {"delivery_count": [1, 2, 3, 4]},
+        "delivery_date", "D", {"delivery_count": "int32"}
+    )
+
+    assert len(store) == 3  # malformed date dropped at load
+    rows = store.lookup("B")
+    assert list(rows["delivery_date"].astype(str)) == ["2025-01-01", "2025-01-03"]
+    assert list(rows["delivery_count"]) == [3, 1]
+    assert store.lookup("missing") is None
+
+
+def test_snapshot_round_trip_matches_csv_scoring(tmp_path):
+    from_csv = EvidenceAggregator()
+    arrays, tables = collect_snapshot_data(from_csv)
+    path = str(tmp_path / "evidence.snapshot")
+    write_snapshot(path, arrays, tables, from_csv.data_dir, SOURCE_FILES)
+
+    snapshot = open_snapshot(from_csv.data_dir, path)
+    assert snapshot is not None
+    from_snapshot = EvidenceAggregator(snapshot=snapshot)
+
+    assert np.array_equal(from_snapshot.deliveries.keys, from_csv.deliveries.keys)
+    for provider in ("get_geo_evidence", "get_temporal_evidence", "get_iot_evidence", "get_temporal_decay_evidence",
+                     "get_geo_precision_evidence", "get_linguistic_evidence", "get_crowd_evidence",
+                     "get_documentary_evidence"):
+        assert getattr(from_snapshot, provider)(SAMPLE_ADDRESS) == getattr(from_csv, provider)(SAMPLE_ADDRESS)
+
+
+def test_stale_snapshot_is_ignored(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "source.csv").write_text("digipin\n")
+    path = str(tmp_path / "evidence.snapshot")
+    write_snapshot(path, {"values": np.arange(3)}, {}, str(data_dir), ["source.csv"])
+
+    assert list(EvidenceSnapshot(path).array("values")) == [0, 1, 2]
+    assert open_snapshot(str(data_dir), path) is not None
+
+    (data_dir / "source.csv").write_text("digipin\nKP01-AB12-CD\n")
+    assert open_snapshot(str(data_dir), path) is None
+
+
+def test_rolling_aggregates_match_full_recompute():
+    random.seed(7)
+    start = date(2025, 1, 1)
+    seed_days = [start - timedelta(days=random.randint(0, 200)) for _ in range(50)]
+    store = ColumnarEvidenceStore.from_values(
+        ["KP01-AB12-CD"] * len(seed_days), [d.isoformat() for d in seed_days], {},
+        "delivery_date", "D", {}
+    )
+    aggregates = DeliveryAggregates(store)
+    all_days = list(seed_days)
+
+    today = start
+    for step in range(120):
+        today += timedelta(days=random.choice([0, 1, 1, 2, 5]) if step != 60 else 150)
+        if random.random() < 0.6:
+            day = today - timedelta(days=random.randint(0, 3))
+            aggregates.append("KP01-AB12-CD", day, today)
+            all_days.append(day)
+
+        stats = aggregates.stats("KP01-AB12-CD", today)
+        ages = [(today - d).days for d in all_days]
+        assert stats["total"] == len(all_days)
+        assert stats["most_recent"] == max(all_days)
+        assert stats["window_counts"] == {w: sum(a <= w for a in ages) for w in WINDOWS}
+        assert np.isclose(stats["decayed_sum"], sum(0.9 ** a for a in ages))
+
+    assert aggregates.stats("missing", today) is None
+
+
+def test_iot_retention_keeps_raw_tail_and_daily_summaries():
+    start = datetime(2025, 1, 1)
+    seed = [start + timedelta(hours=6 * i) for i in range(40)]  # 10 days, 4 pings a day
+    store = ColumnarEvidenceStore.from_values(
+        ["KP01-AB12-CD"] * len(seed), [t.isoformat() for t in seed],
+        {"lat": [10.0 + i for i in range(40)], "long": [76.0] * 40, "signal_strength": [50] * 40},
+        "timestamp", "s", {"lat": "float64", "long": "float64", "signal_strength": "int16"}
+    )
+    retention = IotPingRetention(store, capacity=8, max_days=5)
+
+    summary = retention.summary("KP01-AB12-CD")
+    assert summary["count"] == 40 and summary["last_ping"] == seed[-1] and summary["raw_pings"] == 8
+    days = retention.daily_summaries("KP01-AB12-CD")
+    assert [d["date"] for d in days] == ["2025-01-04", "2025-01-05", "2025-01-06", "2025-01-07", "2025-01-08"]
+    assert days[0] == {"date": "2025-01-04", "count": 4, "mean_lat": 23.5, "mean_long": 76.0, "mean_signal_strength": 50.0}
+    assert not retention._histories  # Reads do not cache a history
+
+    later = [start + timedelta(days=20, hours=i) for i in range(30)]
+    retention.append_many([{"digipin": "KP01-AB12-CD", "timestamp": t, "lat": None, "signal_strength": 70} for t in later])
+
+    summary = retention.summary("KP01-AB12-CD")
+    assert summary["count"] == 70 and summary["last_ping"] == later[-1]
+    raw = retention.recent_pings("KP01-AB12-CD")
+    assert list(raw["timestamp"]) == [np.datetime64(t, 's') for t in later[-8:]]
+    days = retention.daily_summaries("KP01-AB12-CD")
+    assert len(days) == 5 and days[-1]["date"] == "2025-01-21" and days[-1]["mean_lat"] is None
+    assert retention.summary("missing") is None
+
+
+def test_crowd_store_aggregates_and_incremental_add(tmp_path):
+    (tmp_path / "mock_crowd_validations.csv").write_text(
+        "digipin,validator_type,validation_date,confidence_score\n"
+        "KP01-AB12-CD,postman,2025-01-01,80\n"
+        "KP01-AB12-CD,resident,2025-06-30,60\n"
+        "KP01-AB12-CD,resident,bad-date,60\n"
+    )
+    store = CrowdValidationStore(str(tmp_path))
+
+    stats = store.stats("KP01-AB12-CD", date(2025, 6, 30))
+    assert stats["total"] == 2 and stats["by_type"] == {"postman": 1, "resident": 1}
+    assert stats["last_confirmation"] == date(2025, 6, 30)
+    # The older postman confirmation is one half-life (180 days) old
+    assert np.isclose(stats["weighted_confidence"], (0.5 * 80 + 60) / 1.5)
+
+    store.add("KP01-AB12-CD", "postman", date(2025, 12, 27), 100)
+    stats = store.stats("KP01-AB12-CD", date(2025, 12, 27))
+    assert stats["by_type"]["postman"] == 2 and stats["last_confirmation"] == date(2025, 12, 27)
+    assert np.isclose(stats["weighted_confidence"], (0.25 * 80 + 0.5 * 60 + 100) / 1.75)
+    assert store.stats("missing", date(2025, 12, 27)) is None
+
+
+def test_crowd_confidence_decays_while_no_new_confirmations_arrive(tmp_path):
+    store = CrowdValidationStore(str(tmp_path))
+    store.add("KP01-AB12-CD", "postman", date(2025, 1, 1), 90)
+    store.add("KP01-AB12-EF", "postman", date(2025, 6, 30), 90)
+
+    today = date(2025, 6, 30)
+    fresh = store.stats("KP01-AB12-EF", today)["weighted_confidence"]
+    old = store.stats("KP01-AB12-CD", today)["weighted_confidence"]
+    assert np.isclose(fresh, 90) and np.isclose(old, 45)
+    # Reading later ages both
+    assert np.isclose(store.stats("KP01-AB12-EF", date(2025, 12, 27))["weighted_confidence"], 45)
+
+
+def test_crowd_confirmations_are_journalled_once_per_request(tmp_path):
+    store = CrowdValidationStore(str(tmp_path))
+    assert store.confirm("vr_1", "KP01-AB12-CD", "postman", date(2025, 6, 1), 100)
+    assert not store.confirm("vr_1", "KP01-AB12-CD", "postman", date(2025, 6, 2), 100)
+    assert store.confirm("vr_2", "KP01-AB12-CD", "postman", date(2025, 6, 3), 100)
+    with open(store.journal_path, "a") as f:
+        f.write("vr_3,KP01-AB12-CD,postman,2025-")  # Torn write from a crash
+
+    restarted = CrowdValidationStore(str(tmp_path))
+    stats = restarted.stats("KP01-AB12-CD", date(2025, 6, 3))
+    assert stats["total"] == 2 and stats["last_confirmation"] == date(2025, 6, 3)
+    assert not restarted.confirm("vr_2", "KP01-AB12-CD", "postman", date(2025, 6, 4), 100)
+
+
+def test_document_index_summaries_and_expiry():
+    index = DocumentIndex.from_records(
+        ["KP01-AB12-CD", "KP01-AB12-CD", "KP01-AB12-CD", "KP01-AB12-CD", "KP01-AB12-CD"],
+        ["680001", "680001", "680001", "680001", "680002"],
+        ["utility_bill", "utility_bill", "aadhaar", "voter_id", "aadhaar"],
+        ["verified", "verified", "verified", "rejected", "verified"],
+        ["2024-01-01", "2025-06-01", "2020-01-01", "2025-01-01", "NaT"],
+    )
+
+    documents = index.summary("KP01-AB12-CD", "680001", date(2026, 1, 1))
+    assert set(documents) == {"utility_bill", "aadhaar"}
+    assert documents["utility_bill"] == {"verified_date": "2025-06-01", "age_days": 214, "count": 2, "expired": False}
+    assert documents["aadhaar"]["expired"] is False
+    assert index.summary("KP01-AB12-CD", "680001", date(2031, 1, 1))["aadhaar"]["expired"] is True
+    assert index.summary("KP01-AB12-CD", "680002", date(2026, 1, 1)) is None
+
+    n = 70000  # Past uint16
+    busy = DocumentIndex.from_records(["KP01-AB12-CD"] * n, ["680001"] * n, ["utility_bill"] * n,
+                                      ["verified"] * n, ["2025-06-01"] * n)
+    assert busy.summary("KP01-AB12-CD", "680001", date(2026, 1, 1))["utility_bill"]["count"] == n
+
+
+def test_street_segment_index_interval_lookup():
+    index = StreetSegmentIndex.from_records(
+        ["KP01-AB12-CD"] * 4 + ["KP02-XY23-EF"],
+        ["MG Road", "M.G. Rd", "MG Road", "Station Road", "MG Road"],
+        [1, 51, 10, 1, 200],
+        [50, 100, 200, 25, 300],
+        ["north", "north", "south", "east", "west"],
+    )
+
+    assert index.find("KP01-AB12-CD", "mg road", 48) == {"house_min": 10, "house_max": 200, "side": "south"}
+    assert index.find("KP01-AB12-CD", "MG Road", 5) == {"house_min": 1, "house_max": 50, "side": "north"}
+    assert index.find("KP01-AB12-CD", "MG Road", 150)["side"] == "south"
+    assert index.find("KP01-AB12-CD", "MG Road", 250) is None  # KP02's segment must not leak in
+    assert index.find("KP01-AB12-CD", "Station Road", 30) is None
+    assert index.find("KP01-AB12-CD", "Temple Street", 5) is None and not index.has_street("KP01-AB12-CD", "Temple Street")
+
+
+def test_street_segment_index_matches_brute_force():
+    rng = np.random.default_rng(5)
+    starts = rng.integers(1, 900, 400)
+    ends = starts + rng.integers(0, 120, 400)
+    streets = rng.choice(["MG Road", "Station Road"], 400).tolist()
+    index = StreetSegmentIndex.from_records(["KP01-AB12-CD"] * 400, streets, starts.tolist(), ends.tolist(),
+                                            [str(i) for i in range(400)])
+
+    for street in ("MG Road", "Station Road"):
+        on_street = [i for i in range(400) if streets[i] == street]
+        for house in range(0, 1050, 7):
+            covering = [i for i in on_street if starts[i] <= house <= ends[i]]
+            found = index.find("KP01-AB12-CD", street, house)
+            if not covering:
+                assert found is None
+            else:
+                # Nearest covering segment starting at or below the house number
+                assert found["house_min"] == max(starts[i] for i in covering)
+                assert starts[int(found["side"])] <= house <= ends[int(found["side"])]
+
+
+def test_grid_spatial_index_matches_brute_force():
+    rng = np.random.default_rng(3)
+    lats = 10.5 + rng.normal(0, 0.02, 2000)
+    lons = 76.2 + rng.normal(0, 0.02, 2000)
+    index = GridSpatialIndex.from_points(lats, lons, [str(i) for i in range(2000)])
+
+    for lat, lon, radius in ((10.5, 76.2, 500), (10.52, 76.19, 1500), (10.4, 76.0, 300)):
+        distances = haversine_km(lat, lon, lats, lons) * 1000
+        expected = sorted(np.flatnonzero(distances <= radius).astype(str).tolist())
+        hits = index.within(lat, lon, radius)
+        assert sorted(label for label, _ in hits) == expected
+        assert [d for _, d in hits] == sorted(d for _, d in hits)
+
+
+def test_reverse_geocoder_nearest_cell_and_pin():
+    rng = np.random.default_rng(11)
+    lats = 10.5 + rng.normal(0, 0.05, 3000)
+    lons = 76.2 + rng.normal(0, 0.05, 3000)
+    cells = {f"C{i}": {"lat": str(a), "long": str(o), "pin": "680001"} for i, (a, o) in enumerate(zip(lats, lons))}
+    geocoder = ReverseGeocoder(cells, {"680001": {"lat": 10.52, "long": 76.21, "district": "Thrissur"}})
+
+    points = [(10.5, 76.2), (10.61, 76.33), (28.6, 77.2), (51.5, -0.1)]
+    results = geocoder.reverse_batch(points)
+    assert results[:3] == [geocoder.reverse(lat, lon) for lat, lon in points[:3]]
+    for (lat, lon), result in zip(points[:2], results):
+        distances = haversine_km(lat, lon, lats, lons) * 1000
+        assert result["nearest_cell"]["digipin"] == f"C{int(np.argmin(distances))}"
+        assert result["nearest_pin"]["pin"] == "680001"
+        assert result["digipin"] == digipin_codec.encode(lat, lon)
+    assert results[2]["nearest_cell"] is None and results[2]["nearest_pin"] is None
+    assert results[3] == {"lat": 51.5, "long": -0.1, "digipin": None, "nearest_cell": None, "nearest_pin": None}
+
+
+def test_distance_kernels_and_geofence_stats():
+    rng = np.random.default_rng(9)
+    lats = 28.6228 + rng.normal(0, 0.0003, 2000)
+    lons = 77.2130 + rng.normal(0, 0.0003, 2000)
+    centre = PreparedCentre(28.6228, 77.2130)
+
+    scalar = GeospatialUtils().haversine
+    expected = np.array([scalar(28.6228, 77.2130, a, o) for a, o in zip(lats, lons)])
+    assert np.allclose(centre.distances_km(lats, lons), expected)
+    assert np.allclose(haversine_pairwise_km(np.full(2000, 28.6228), np.full(2000, 77.2130), lats, lons), expected)
+
+    signals = np.full(2000, 80.0)
+    signals[:10] = np.nan
+    lats[-100:] += 0.01  # ~1.1 km away, weak signal
+    signals[-100:] = 5.0
+    stats = geofence_stats(centre, lats, lons, signals)
+    assert stats["pings_with_position"] == 2000
+    assert np.isclose(stats["inside_fraction"], np.mean(expected[:-100] * 1000 <= GEOFENCE_RADIUS_M) * 0.95)
+    # Weak far-away pings barely pull the weighted centroid
+    assert stats["centroid_offset_m"] < 20
+    assert geofence_stats(centre, np.array([np.nan]), np.array([np.nan]), np.array([50.0])) is None
+
+
+def test_pin_digipin_table_matches_haversine_and_updates_incrementally():
+    geo = GeospatialUtils()
+    table = geo.pin_digipin
+    assert len(table) > 0
+
+    for digipin, pin in list(geo.declared_pins.items()):
+        center, centroid = geo.get_digipin_center(digipin), geo.get_pin_centroid(pin)
+        if not (center and centroid):
+            continue
+        distance, in_region = table.lookup(pin, digipin)
+        assert in_region
+        assert np.isclose(distance, geo.haversine(centroid['lat'], centroid['long'], center['lat'], center['long']),
+                          atol=1e-4)
+
+    # Moving a PIN centroid only rewrites that PIN's rows
+    digipin = next(d for d in geo.declared_pins if geo.get_digipin_center(d))
+    center = geo.get_digipin_center(digipin)
+    geo.update_pin_centroid('999999', {'lat': center['lat'] + 0.01, 'long': center['long'],
+                                       'district': 'X', 'state': 'Y'})
+    distance, in_region = table.lookup('999999', digipin)
+    assert 1.0 < distance < 1.3
+    assert in_region is (geo.declared_pins[digipin] == '999999')
+    geo.update_pin_centroid('999999', {'lat': center['lat'] + 1.0, 'long': center['long'],
+                                       'district': 'X', 'state': 'Y'})
+    assert table.lookup('999999', digipin) is None  # now beyond TABLE_RADIUS_KM
+    assert geo.calculate_pin_digipin_distance('999999', digipin) > TABLE_RADIUS_KM
+
+    # A new DIGIPIN with no declared PIN is in-region by distance
+    pin, centroid = next(iter(geo.pin_centroids.items()))
+    geo.update_digipin_center('NEW1-CODE-01', {'lat': centroid['lat'], 'long': centroid['long'] + 0.02})
+    distance, in_region = geo.pin_digipin_consistency(pin, 'NEW1-CODE-01')
+    assert in_region is (distance <= PIN_REGION_RADIUS_KM)
+
+    # The overlay is folded into the arrays written to the snapshot
+    arrays, _ = table.to_snapshot("pin_digipin")
+    keys = arrays["pin_digipin.keys"].tolist()
+    assert keys == sorted(keys)
+    assert f"NEW1-CODE-01|{pin}" in keys
+    assert f"{digipin}|999999" not in keys
+
+
+def test_polygon_index_matches_brute_force_ray_cast():
+    rng = np.random.default_rng(18)
+    angles = np.linspace(0, 2 * np.pi, 9, endpoint=False)
+    rings = []
+    for _ in range(3000):  # Enough polygons for a multi-level tree
+        lat, lon, radius = rng.uniform(8, 30), rng.uniform(70, 90), rng.uniform(0.05, 0.3)
+        wobble = rng.uniform(0.6, 1.0, len(angles))
+        rings.append(np.column_stack([lat + radius * wobble * np.sin(angles), lon + radius * wobble * np.cos(angles)]))
+    index = PolygonIndex.from_polygons([f"L{i}" for i in range(len(rings))], ["1"] * len(rings), rings)
+    assert len(index.level_boxes) > 1
+
+    boxes = np.array([[r[:, 0].min(), r[:, 1].min(), r[:, 0].max(), r[:, 1].max()] for r in rings])
+    points = [(rng.uniform(8, 30), rng.uniform(70, 90)) for _ in range(200)]
+    points += [(ring[:, 0].mean(), ring[:, 1].mean()) for ring in rings[:100]]
+    for lat, lon in points:
+        in_box = np.flatnonzero((boxes[:, 0] <= lat) & (lat <= boxes[:, 2]) & (boxes[:, 1] <= lon) & (lon <= boxes[:, 3]))
+        expected = sorted(f"L{i}" for i in in_box if points_in_polygon(lat, lon, rings[i][:, 0], rings[i][:, 1]))
+        assert sorted(b["locality"] for b in index.localities_at(lat, lon)) == expected
+
+    # Concave ring: the notch is outside
+    notched = [(0, 0), (0, 4), (4, 4), (4, 3), (1, 3), (1, 1), (4, 1), (4, 0)]
+    small = PolygonIndex.from_polygons(["C"], ["1"], [notched])
+    assert small.containing(0.5, 2) == [0]
+    assert small.containing(2, 2) == []
+    assert small.has_locality("c") and not small.has_locality("D")
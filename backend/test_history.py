@@ -0,0 +1,81 @@
+"""
+Tests for /api/history: keyset pagination on (created_at, id) with one query per page
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import Base, Token
+from routers import validation
+from utils.auth import get_current_user_id
+
+ADDRESS = {"house_no": "12", "street": "MG Road", "locality": "Indiranagar", "city": "Bangalore",
+           "district": "Bangalore Urban", "state": "Karnataka", "pin": "560038", "digipin": "BG-5600-38-IN"}
+CONSENT = {"purpose": "kyc", "validity_days": 365}
+
+
+def test_history_pages_with_constant_queries(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'history.db')}",
+                               connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        monkeypatch.setattr(validation, "SessionLocal", Session)
+
+        current_user = {"id": "heavy_user"}
+        app = FastAPI()
+        app.include_router(validation.router)
+        app.dependency_overrides[get_current_user_id] = lambda: current_user["id"]
+        app.dependency_overrides[database.get_db] = lambda: Session()
+        client = TestClient(app)
+
+        # One batch chunk shares a created_at, so ties are broken on id
+        items = [{"address": dict(ADDRESS, house_no=str(i)), "consent": CONSENT} for i in range(45)]
+        assert client.post("/api/validate/batch", json=items).status_code == 200
+        request = {"user_id": "ignored", "address": ADDRESS, "consent": CONSENT}
+        newest = [client.post("/api/validate", json=request).json()["request_id"] for _ in range(2)]
+        current_user["id"] = "other_user"
+        client.post("/api/validate", json=request)
+        current_user["id"] = "heavy_user"
+
+        db = Session()
+        try:
+            revoked = db.query(Token).filter(Token.validation_request_id == newest[-1]).one()
+            revoked.revoked = True
+            db.commit()
+        finally:
+            db.close()
+
+        statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        pages, cursor = [], None
+        while True:
+            statements.clear()
+            page = client.get("/api/history", params={"limit": 20, **({"cursor": cursor} if cursor else {})}).json()
+            assert len(statements) == 1
+            pages.append(page["history"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert [len(page) for page in pages] == [20, 20, 7]
+        history = [item for page in pages for item in page]
+        keys = [(item["created_at"], item["request_id"]) for item in history]
+        assert keys == sorted(keys, reverse=True) and len(set(keys)) == 47
+        assert [item["request_id"] for item in history[:2]] == newest[::-1]
+        assert history[0]["token_available"] is False and history[1]["token_available"] is True
+
+        assert client.get("/api/history", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,132 @@
+"""
+Tests for live evidence ingestion
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import Base, ApiKey
+from evidence_aggregator import EvidenceAggregator
+from evidence_context import get_ingestor
+from ingestion import EvidenceIngestor, IngestionBufferFull
+from routers import ingest
+from utils.auth import create_access_token
+from utils.ndjson import parse_json_or_ndjson
+
+
+NEW_DIGIPIN = {'digipin': 'ZZ99-ZZ99-ZZ', 'pin': '680001', 'city': 'Thrissur'}
+
+
+def test_flushed_events_reach_scoring_and_survive_restart(tmp_path):
+    aggregator = EvidenceAggregator()
+    ingestor = EvidenceIngestor(aggregator, journal_dir=str(tmp_path), batch_size=2)
+    assert aggregator.get_temporal_evidence(NEW_DIGIPIN)[1]["method"] == "no_deliveries"
+
+    now = datetime.now()
+    ingestor.submit("delivery", [{"digipin": "ZZ99-ZZ99-ZZ", "delivery_date": (now - timedelta(days=d)).date()}
+                                 for d in (0, 3, 45)])
+    ingestor.submit("iot", [{"digipin": "ZZ99-ZZ99-ZZ", "timestamp": now.isoformat(), "lat": 10.5, "long": 76.2}])
+    assert ingestor.flush() == 4
+
+    score, details = aggregator.get_temporal_evidence(NEW_DIGIPIN)
+    assert details["deliveries_30_days"] == 2 and details["deliveries_90_days"] == 3 and score > 0
+    score, details = aggregator.get_iot_evidence(NEW_DIGIPIN)
+    assert details["ping_count"] == 1 and details["recency"] == "very_recent"
+
+    restarted = EvidenceAggregator()
+    assert EvidenceIngestor(restarted, journal_dir=str(tmp_path)).replay_journal() == 4
+    assert restarted.get_temporal_evidence(NEW_DIGIPIN) == aggregator.get_temporal_evidence(NEW_DIGIPIN)
+
+
+def test_delivery_count_is_carried_into_window_counts(tmp_path):
+    aggregator = EvidenceAggregator()
+    ingestor = EvidenceIngestor(aggregator, journal_dir=str(tmp_path))
+    today = datetime.now().date()
+    ingestor.submit("delivery", [
+        {"digipin": "ZZ98-ZZ98-ZZ", "delivery_date": today, "delivery_count": 5},
+        {"digipin": "ZZ98-ZZ98-ZZ", "delivery_date": today - timedelta(days=40), "delivery_count": 2},
+    ])
+    assert ingestor.flush() == 2
+
+    stats = aggregator.delivery_aggregates.stats("ZZ98-ZZ98-ZZ", today)
+    assert stats["total"] == 7
+    assert stats["window_counts"][30] == 5 and stats["window_counts"][90] == 7
+
+    restarted = EvidenceAggregator()
+    EvidenceIngestor(restarted, journal_dir=str(tmp_path)).replay_journal()
+    assert restarted.delivery_aggregates.stats("ZZ98-ZZ98-ZZ", today)["window_counts"] == stats["window_counts"]
+
+
+def test_replay_follows_journal_written_by_another_process(tmp_path):
+    writer = EvidenceIngestor(EvidenceAggregator(), journal_dir=str(tmp_path))
+    follower_aggregator = EvidenceAggregator()
+    follower = EvidenceIngestor(follower_aggregator, journal_dir=str(tmp_path))
+    today = datetime.now().date()
+
+    writer.submit("delivery", [{"digipin": "ZZ97-ZZ97-ZZ", "delivery_date": today, "delivery_count": 2}])
+    writer.flush()
+    assert follower.replay_journal() == 1
+
+    writer.submit("delivery", [{"digipin": "ZZ97-ZZ97-ZZ", "delivery_date": today, "delivery_count": 3}])
+    writer.flush()
+    with open(tmp_path / "ingested_deliveries.csv", "a", encoding="utf-8") as f:
+        f.write("ZZ97-ZZ97-ZZ,2025-")  # Still being written
+    assert follower.replay_journal() == 1
+    assert follower.replay_journal() == 0
+    assert follower_aggregator.delivery_aggregates.stats("ZZ97-ZZ97-ZZ", today)["total"] == 5
+
+
+def test_full_buffer_rejects_whole_batch(tmp_path):
+    ingestor = EvidenceIngestor(EvidenceAggregator(), journal_dir=str(tmp_path), capacity=2)
+    event = {"digipin": "ZZ99-ZZ99-ZZ", "delivery_date": "2025-01-01"}
+
+    ingestor.submit("delivery", [event])
+    with pytest.raises(IngestionBufferFull):
+        ingestor.submit("delivery", [event, event])
+    assert len(ingestor) == 1 and ingestor.stats["rejected"] == 2
+
+
+def test_parse_json_or_ndjson():
+    assert parse_json_or_ndjson(b'{"a": 1}\n\n{"a": 2}\n', "application/x-ndjson") == [{"a": 1}, {"a": 2}]
+    assert parse_json_or_ndjson(b'[{"a": 1}]', "application/json") == [{"a": 1}]
+    assert parse_json_or_ndjson(b'{"a": 1}') == [{"a": 1}]
+    with pytest.raises(ValueError, match="line 2"):
+        parse_json_or_ndjson(b'{"a": 1}\n{oops', "application/x-ndjson")
+
+
+def test_ingest_endpoints_require_partner_api_key(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    db.add_all([ApiKey(user_id="partner", key="sk_live_active"),
+                ApiKey(user_id="partner", key="sk_live_revoked", is_active=False)])
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+    app.include_router(ingest.router)
+    app.dependency_overrides[database.get_db] = lambda: Session()
+    app.dependency_overrides[get_ingestor] = lambda: EvidenceIngestor(EvidenceAggregator(), journal_dir=str(tmp_path))
+    client = TestClient(app)
+    event = [{"digipin": "ZZ99-ZZ99-ZZ", "delivery_date": "2026-01-01"}]
+
+    user_token = {"Authorization": f"Bearer {create_access_token({'sub': 'someone'})}"}
+    assert client.post("/api/ingest/deliveries", json=event, headers=user_token).status_code == 401
+    assert client.get("/api/ingest/stats", headers={"X-API-Key": "sk_live_revoked"}).status_code == 401
+    assert client.post("/api/ingest/iot", json=[], headers={"X-API-Key": "sk_live_wrong"}).status_code == 401
+
+    accepted = client.post("/api/ingest/deliveries", json=event, headers={"X-API-Key": "sk_live_active"})
+    assert accepted.status_code == 202 and accepted.json()["accepted"] == 1
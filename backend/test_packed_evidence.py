@@ -0,0 +1,101 @@
+"""
+Tests for packed evidence storage: one row per validation, lazy details, legacy fallback
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import database
+import evidence_storage
+from database import Base, EvidenceSignal, PackedEvidence
+from evidence_storage import load_evidence, store_evidence, update_evidence
+from routers import validation
+from utils.auth import get_current_user_id
+
+ADDRESS = {"house_no": "12", "street": "MG Road", "locality": "Indiranagar", "city": "Bangalore",
+           "district": "Bangalore Urban", "state": "Karnataka", "pin": "560038", "digipin": "BG-5600-38-IN"}
+REQUEST = {"user_id": "ignored", "address": ADDRESS, "consent": {"purpose": "kyc", "validity_days": 365}}
+EVIDENCE = [{"type": "geo", "score": 81.25, "details": {"match": True, "nearest": ["a", 1.5]}},
+            {"type": "iot", "score": 0.0, "details": {}}]
+
+
+def make_session(tmp):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'evidence.db')}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def test_packed_results_match_validation_response(monkeypatch):
+    monkeypatch.setattr(evidence_storage, "EVIDENCE_STORAGE", "packed")
+    with tempfile.TemporaryDirectory() as tmp:
+        Session = make_session(tmp)
+        app = FastAPI()
+        app.include_router(validation.router)
+        app.dependency_overrides[get_current_user_id] = lambda: "packed_user"
+        app.dependency_overrides[database.get_db] = lambda: Session()
+        client = TestClient(app)
+
+        response = client.post("/api/validate", json=REQUEST).json()
+        request_id = response["request_id"]
+        db = Session()
+        try:
+            assert db.query(PackedEvidence).count() == 1
+            assert db.query(EvidenceSignal).count() == 0
+        finally:
+            db.close()
+
+        stored = client.get(f"/api/result/{request_id}").json()
+        assert [(e["type"], e["score"], e["details"]) for e in stored["evidence"]] == \
+               [(e["type"], e["score"], e["details"]) for e in response["evidence"]]
+
+        summary = client.get(f"/api/result/{request_id}?include_details=false").json()
+        assert [(e["type"], e["score"]) for e in summary["evidence"]] == \
+               [(e["type"], e["score"]) for e in response["evidence"]]
+        assert all(e["details"] == {} for e in summary["evidence"])
+
+
+def test_load_and_update_both_layouts():
+    with tempfile.TemporaryDirectory() as tmp:
+        Session = make_session(tmp)
+        db = Session()
+        queries = []
+        event.listen(Session.kw["bind"], "before_cursor_execute", lambda *args: queries.append(args[2]))
+        try:
+            now = datetime(2026, 1, 1)
+            store_evidence(db, [("vr_rows", EVIDENCE)], now, storage="rows")
+            store_evidence(db, [("vr_packed", EVIDENCE)], now, storage="packed")
+            db.commit()
+
+            # Packed mode falls back to rows stored before the switch; rows mode never looks at packed_evidence
+            for validation_id, storage in (("vr_rows", "packed"), ("vr_packed", "packed"), ("vr_rows", "rows")):
+                loaded = load_evidence(db, validation_id, storage=storage)
+                assert [(e["type"], e["score"], e["details"], e["timestamp"]) for e in loaded] == \
+                       [(e["type"], e["score"], e["details"], now) for e in EVIDENCE]
+                assert [e["details"] for e in load_evidence(db, validation_id, False, storage)] == [None, None]
+
+                updated = [dict(EVIDENCE[0], score=95.0, details={"admin_confirmed": True}), EVIDENCE[1]]
+                update_evidence(db, validation_id, updated, storage=storage)
+                db.commit()
+                assert [(e["score"], e["details"]) for e in load_evidence(db, validation_id, storage=storage)] == \
+                       [(95.0, {"admin_confirmed": True}), (0.0, {})]
+                updated[0] = EVIDENCE[0]
+                update_evidence(db, validation_id, updated, storage=storage)
+                db.commit()
+
+            queries.clear()
+            assert load_evidence(db, "vr_packed", storage="rows") == []
+            assert load_evidence(db, "vr_missing", storage="packed") == []
+            assert len(queries) == 3 and "packed_evidence" not in queries[0]
+        finally:
+            db.close()
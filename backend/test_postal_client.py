@@ -0,0 +1,231 @@
+"""
+Tests for the async postal PIN client against a local stand-in HTTP server
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import evidence_aggregator
+from evidence_aggregator import EvidenceAggregator
+from utils.postal_client import PostalPinClient, CircuitBreaker
+
+
+KNOWN_PINS = {
+    "680001": [{"Name": "Thrissur H.O", "District": "Thrissur", "Division": "Thrissur", "Region": "Kochi"}],
+}
+
+
+class StandInPostalServer:
+    """Serves /pincode/{pin} like api.postalpincode.in, with a configurable delay and failure mode"""
+
+    def __init__(self):
+        self.hits = 0
+        self.delay = 0.0
+        self.fail = False
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits += 1
+                time.sleep(server.delay)
+                if server.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                pin = self.path.rsplit("/", 1)[-1]
+                if pin in KNOWN_PINS:
+                    body = [{"Status": "Success", "PostOffice": KNOWN_PINS[pin]}]
+                else:
+                    body = [{"Status": "Error", "PostOffice": None}]
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def upstream():
+    server = StandInPostalServer()
+    yield server
+    server.close()
+
+
+def run_with_client(client, coro_fn):
+    async def runner():
+        try:
+            return await coro_fn()
+        finally:
+            await client.aclose()
+    return asyncio.run(runner())
+
+
+def test_lookup_is_cached(upstream):
+    client = PostalPinClient(base_url=upstream.url)
+
+    async def scenario():
+        first = await client.lookup("680001")
+        second = await client.lookup("680001")
+        return first, second
+
+    first, second = run_with_client(client, scenario)
+    assert first["available"] and first["offices"][0]["District"] == "Thrissur"
+    assert second == first
+    assert client.get_cached("680001") == first
+    assert upstream.hits == 1
+
+
+def test_concurrent_lookups_share_one_request(upstream):
+    upstream.delay = 0.2
+    client = PostalPinClient(base_url=upstream.url)
+
+    async def scenario():
+        return await asyncio.gather(*(client.lookup("680001") for _ in range(10)))
+
+    results = run_with_client(client, scenario)
+    assert all(r["available"] for r in results)
+    assert upstream.hits == 1
+
+
+def test_unknown_pin_is_negatively_cached(upstream):
+    client = PostalPinClient(base_url=upstream.url)
+
+    async def scenario():
+        await client.lookup("999999")
+        return await client.lookup("999999")
+
+    assert run_with_client(client, scenario) == {"available": False}
+    assert upstream.hits == 1
+
+
+def test_circuit_opens_after_failures(upstream):
+    upstream.fail = True
+    client = PostalPinClient(base_url=upstream.url, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60))
+
+    async def scenario():
+        return [await client.lookup(f"68000{i}") for i in range(6)]
+
+    results = run_with_client(client, scenario)
+    assert upstream.hits == 3
+    assert client.breaker.state == "open"
+    assert results[-1] == {"available": False, "circuit_open": True}
+
+
+def test_half_open_trial_closes_circuit(upstream):
+    upstream.fail = True
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    client = PostalPinClient(base_url=upstream.url, breaker=breaker)
+
+    async def scenario():
+        await client.lookup("680001")
+        assert breaker.state == "open"
+        await asyncio.sleep(0.06)
+        upstream.fail = False
+        return await client.lookup("680001")
+
+    assert run_with_client(client, scenario)["available"]
+    assert breaker.state == "closed"
+
+
+def test_cancelled_caller_does_not_cancel_shared_lookup(upstream):
+    upstream.delay = 0.2
+    client = PostalPinClient(base_url=upstream.url)
+
+    async def scenario():
+        first = asyncio.create_task(client.lookup("680001"))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(client.lookup("680001"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    result, first_cancelled = run_with_client(client, scenario)
+    assert first_cancelled and result["available"]
+    assert upstream.hits == 1
+
+
+def test_cancelled_trial_does_not_wedge_half_open_circuit(upstream):
+    upstream.fail = True
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    client = PostalPinClient(base_url=upstream.url, breaker=breaker)
+
+    async def scenario():
+        await client.lookup("680001")
+        await asyncio.sleep(0.06)
+        upstream.fail, upstream.delay = False, 0.2
+        trial = asyncio.create_task(client.lookup("680001"))
+        await asyncio.sleep(0.05)
+        client._in_flight["680001"].cancel()  # e.g. the loop shutting down mid-trial
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert breaker.state == "open"
+        await asyncio.sleep(0.06)
+        upstream.delay = 0.0
+        return await client.lookup("680001")
+
+    assert run_with_client(client, scenario)["available"]
+    assert breaker.state == "closed"
+
+
+def test_slow_upstream_does_not_block_event_loop(upstream):
+    upstream.delay = 0.5
+    client = PostalPinClient(base_url=upstream.url, timeout=0.1)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        started = time.perf_counter()
+        result, _ = await asyncio.gather(client.lookup("680001"), ticker())
+        return result, ticks, time.perf_counter() - started
+
+    result, ticks, elapsed = run_with_client(client, scenario)
+    assert result == {"available": False}  # timed out, not cached
+    assert client.get_cached("680001") is None
+    assert ticks == 5
+    assert elapsed < 0.4
+
+
+def test_prefetch_many_runs_pins_concurrently_within_connection_limit(upstream, monkeypatch):
+    upstream.delay = 0.2
+    monkeypatch.setattr(evidence_aggregator, "POSTAL_NETWORK_REFRESH", True)
+    aggregator = EvidenceAggregator()
+    client = aggregator.postal_client = PostalPinClient(base_url=upstream.url, max_connections=2)
+    pins = ["999991", "999992", "999993", "999994", "999991"]
+    assert not any(pin in aggregator.postal_directory for pin in pins)
+
+    async def scenario():
+        started = time.perf_counter()
+        await aggregator.prefetch_postal_data_many(pins)
+        return time.perf_counter() - started
+
+    elapsed = run_with_client(client, scenario)
+    assert upstream.hits == 4
+    assert 0.35 < elapsed < 0.75  # two rounds of two, not four in a row
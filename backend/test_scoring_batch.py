@@ -0,0 +1,57 @@
+"""
+Tests for batch scoring: calculate_acs_batch must match calculate_acs address by address
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import csv
+
+from scoring_engine import ScoringEngine
+
+DEMO_DIGIPINS = {"BG-5600-38-IN", "ND-2013-01-S4", "MP-4500-01-XX"}
+ADDRESS_FIELDS = ('house_no', 'street', 'locality', 'city', 'district', 'state', 'pin', 'digipin')
+
+
+def load_addresses():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ground_truth_test_set.csv")
+    with open(path, 'r', encoding='utf-8') as f:
+        addresses = [{field: row[field] for field in ADDRESS_FIELDS} for row in csv.DictReader(f)]
+    # Repeats and demo DIGIPINs exercise grouping and the demo overrides
+    demo = [dict(addresses[0], digipin=d) for d in sorted(DEMO_DIGIPINS)]
+    grid = dict(addresses[0], digipin="AB12-CD34-EF", pin="680123", locality="Sector 2")
+    return addresses + addresses[:20] + demo + [grid, dict(grid, house_no="999")]
+
+
+def test_batch_matches_per_address_scoring():
+    engine = ScoringEngine()
+    addresses = load_addresses()
+
+    batch = engine.calculate_acs_batch(addresses)
+    assert len(batch) == len(addresses)
+
+    for address, result in zip(addresses, batch):
+        acs, evidence, reason_codes, suggestions, advanced_metrics = engine.calculate_acs(address)
+        assert result["acs"] == acs
+        assert result["validation_level"] == engine.get_validation_level(acs)
+        assert result["reason_codes"] == reason_codes
+        assert result["suggestions"] == suggestions
+        assert result["advanced_metrics"] == advanced_metrics
+        assert [(e["type"], e["score"], e["weight"]) for e in result["evidence"]] == \
+               [(e["type"], e["score"], e["weight"]) for e in evidence]
+        if address["digipin"] not in DEMO_DIGIPINS:  # Demo details carry datetime.now()
+            assert [e["details"] for e in result["evidence"]] == [e["details"] for e in evidence]
+
+
+def test_batch_evidence_details_are_independent():
+    engine = ScoringEngine()
+    address = load_addresses()[0]
+    first, second = engine.calculate_acs_batch([address, address])
+
+    # Admin confirmation updates crowd details in place; that must not leak across results
+    first["evidence"][6]["details"]["boosted"] = True
+    assert "boosted" not in second["evidence"][6]["details"]
+    assert engine.calculate_acs_batch([]) == []
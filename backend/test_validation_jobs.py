@@ -0,0 +1,264 @@
+"""
+Tests for async validation jobs: 202 + polling, exclusive claims, failure status
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import tempfile
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import Base, create_db_engine, init_db, ValidationRequest, ValidationResult, EvidenceSignal, Token, AuditLog
+from evidence_context import get_scoring_engine, get_job_pool
+from routers import developers, validation
+from utils.auth import create_access_token, get_current_user_id
+from utils.concurrency import configure_thread_pool
+from validation_jobs import ValidationJobPool, claim_next_job, requeue_stale_jobs
+
+ADDRESS = {"house_no": "12", "street": "MG Road", "locality": "Indiranagar", "city": "Bangalore",
+           "district": "Bangalore Urban", "state": "Karnataka", "pin": "560038", "digipin": "BG-5600-38-IN"}
+REQUEST = {"user_id": "ignored", "address": ADDRESS, "consent": {"purpose": "kyc", "validity_days": 365}}
+
+
+def make_client(db_path, capacity=100):
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    pool = ValidationJobPool(get_scoring_engine(), session_factory=Session, workers=0, capacity=capacity)
+
+    app = FastAPI()
+    app.include_router(validation.router)
+    app.dependency_overrides[get_current_user_id] = lambda: "job_user"
+    app.dependency_overrides[database.get_db] = lambda: Session()
+    app.dependency_overrides[get_job_pool] = lambda: pool
+    return TestClient(app), Session, pool
+
+
+def test_async_validation_is_queued_then_scored():
+    with tempfile.TemporaryDirectory() as tmp:
+        client, Session, pool = make_client(os.path.join(tmp, "jobs.db"))
+
+        queued = [client.post("/api/validate?mode=async", json=REQUEST) for _ in range(3)]
+        assert [r.status_code for r in queued] == [202, 202, 202]
+        ids = [r.json()["request_id"] for r in queued]
+        assert queued[0].headers["location"] == f"/api/result/{ids[0]}"
+
+        progress = client.get(f"/api/result/{ids[2]}")
+        assert progress.status_code == 202
+        assert progress.json()["status"] == "queued"
+        assert progress.json()["queue_position"] == 2
+
+        assert asyncio.run(pool.drain()) == 3
+        assert pool.stats["completed"] == 3
+
+        sync = client.post("/api/validate", json=REQUEST).json()
+        for request_id in ids:
+            result = client.get(f"/api/result/{request_id}")
+            assert result.status_code == 200
+            assert result.json()["acs"] == sync["acs"]
+            assert result.json()["token_available"] == sync["token_available"]
+
+
+def test_claims_are_exclusive_and_failures_are_reported(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        client, Session, pool = make_client(os.path.join(tmp, "jobs.db"), capacity=2)
+        ids = [client.post("/api/validate?mode=async", json=REQUEST).json()["request_id"] for _ in range(2)]
+        assert client.post("/api/validate?mode=async", json=REQUEST).status_code == 503
+
+        first, second = Session(), Session()
+        try:
+            claimed = [claim_next_job(first), claim_next_job(second), claim_next_job(first)]
+        finally:
+            first.close()
+            second.close()
+        assert [claim and claim[0] for claim in claimed] == [ids[0], ids[1], None]
+        assert client.get(f"/api/result/{ids[0]}").json()["status"] == "processing"
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("evidence unavailable")
+        monkeypatch.setattr(pool.scoring_engine, "calculate_acs", broken)
+        asyncio.run(pool.process(*claimed[0]))
+
+        failed = client.get(f"/api/result/{ids[0]}")
+        assert failed.status_code == 200 and failed.json()["status"] == "failed"
+        db = Session()
+        try:
+            assert db.query(AuditLog).filter(AuditLog.action == "validation_failed").count() == 1
+            assert db.query(ValidationRequest).filter(ValidationRequest.status == "processing").count() == 1
+        finally:
+            db.close()
+
+
+def test_running_pool_requeues_stale_jobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        client, Session, _ = make_client(os.path.join(tmp, "jobs.db"))
+        request_id = client.post("/api/validate?mode=async", json=REQUEST).json()["request_id"]
+        # Claimed by a worker that then died
+        db = Session()
+        try:
+            assert claim_next_job(db)[0] == request_id
+        finally:
+            db.close()
+
+        pool = ValidationJobPool(get_scoring_engine(), session_factory=Session, workers=1, poll_interval=0.05,
+                                 job_timeout=0.2, sweep_interval=0.1)
+
+        async def scenario():
+            await pool.start()  # Too early for the job to count as stale
+            assert pool.stats["requeued"] == 0
+            try:
+                for _ in range(100):
+                    if pool.stats["completed"]:
+                        break
+                    await asyncio.sleep(0.05)
+            finally:
+                await pool.stop()
+
+        asyncio.run(scenario())
+        assert pool.stats["requeued"] == 1 and pool.stats["completed"] == 1
+        assert client.get(f"/api/result/{request_id}").status_code == 200
+
+
+def test_requeued_slow_job_is_stored_once(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        client, Session, pool = make_client(os.path.join(tmp, "jobs.db"))
+        request_id = client.post("/api/validate?mode=async", json=REQUEST).json()["request_id"]
+        db = Session()
+        try:
+            slow = claim_next_job(db)
+            # The sweep takes the slow worker's job back and another worker claims it
+            assert requeue_stale_jobs(db, timeout=-1) == 1
+            fast = claim_next_job(db)
+        finally:
+            db.close()
+
+        asyncio.run(pool.process(*fast))
+        asyncio.run(pool.process(*slow))
+        monkeypatch.setattr(pool.scoring_engine, "calculate_acs", lambda *args: 1 / 0)
+        asyncio.run(pool.process(*fast))  # A late failure does not flip the stored result
+        assert pool.stats == {"completed": 1, "failed": 0, "requeued": 0, "superseded": 2}
+
+        db = Session()
+        try:
+            assert db.query(ValidationResult).filter(ValidationResult.validation_request_id == request_id).count() == 1
+            assert db.query(ValidationRequest).filter(ValidationRequest.id == request_id).one().status == "done"
+        finally:
+            db.close()
+        assert client.get(f"/api/result/{request_id}").status_code == 200
+
+
+def test_init_db_makes_existing_results_unique():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'legacy.db')}")
+        with engine.begin() as conn:
+            # validation_results as created before the unique constraint
+            conn.execute(text("CREATE TABLE validation_results (id INTEGER PRIMARY KEY, validation_request_id VARCHAR, "
+                              "acs FLOAT, vl VARCHAR, reason_codes JSON, suggestions JSON, token_id INTEGER, "
+                              "created_at DATETIME)"))
+            conn.execute(text("INSERT INTO validation_results (id, validation_request_id, acs) "
+                              "VALUES (1, 'vr_a', 70), (2, 'vr_a', 71), (3, 'vr_b', 40)"))
+
+        init_db(engine)
+        init_db(engine)
+        with engine.begin() as conn:
+            assert conn.execute(text("SELECT id FROM validation_results ORDER BY id")).scalars().all() == [1, 3]
+        assert "claimed_at" in {c["name"] for c in inspect(engine).get_columns("validation_requests")}
+        with pytest.raises(IntegrityError), engine.begin() as conn:
+            conn.execute(text("INSERT INTO validation_results (validation_request_id) VALUES ('vr_b')"))
+
+
+def test_sync_validation_commits_once(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        client, Session, pool = make_client(os.path.join(tmp, "jobs.db"))
+        commits = []
+        event.listen(Session.kw["bind"], "commit", lambda conn: commits.append(1))
+
+        response = client.post("/api/validate", json=REQUEST).json()
+        assert len(commits) == 1
+        db = Session()
+        try:
+            assert db.query(EvidenceSignal).filter(
+                EvidenceSignal.validation_request_id == response["request_id"]).count() == len(response["evidence"])
+            result = db.query(ValidationResult).filter(
+                ValidationResult.validation_request_id == response["request_id"]).one()
+            assert result.token_id == response["token_id"] is not None
+            assert db.query(Token).filter(Token.id == result.token_id).one().validation_request_id == \
+                response["request_id"]
+        finally:
+            db.close()
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("evidence unavailable")
+        monkeypatch.setattr(pool.scoring_engine, "calculate_acs", broken)
+        assert client.post("/api/validate", json=REQUEST).status_code == 500
+        db = Session()
+        try:
+            failed = db.query(ValidationRequest).filter(ValidationRequest.status == "failed").one()
+            assert db.query(EvidenceSignal).filter(EvidenceSignal.validation_request_id == failed.id).count() == 0
+        finally:
+            db.close()
+
+
+def test_job_pool_and_handlers_run_concurrently():
+    async def scenario(app, pool):
+        configure_thread_pool(2)  # Fewer threads than concurrent requests: all but two wait for a thread
+        await pool.start()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses = await asyncio.gather(
+                    *(client.post("/api/validate?mode=async", json=REQUEST) for _ in range(8)),
+                    *(client.post("/api/validate", json=REQUEST) for _ in range(8))
+                )
+                assert [r.status_code for r in responses] == [202] * 8 + [200] * 8
+                ids = [r.json()["request_id"] for r in responses[:8]]
+                for _ in range(100):
+                    results = await asyncio.gather(*(client.get(f"/api/result/{i}") for i in ids))
+                    if all(r.status_code == 200 for r in results):
+                        break
+                    await asyncio.sleep(0.05)
+                assert [r.status_code for r in results] == [200] * 8
+
+                # Sync handler + sync DB dependency, no key yet: the response is None
+                headers = {"Authorization": f"Bearer {create_access_token({'sub': 'job_user'})}"}
+                keys = await asyncio.gather(*(client.get("/api/developers/my-key", headers=headers) for _ in range(6)))
+                assert [r.status_code for r in keys] == [200] * 6
+        finally:
+            await pool.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The production SQLite engine (WAL, busy timeout); pool exhaustion fails fast instead of hanging
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'jobs.db')}", pool_timeout=3)
+        Base.metadata.create_all(bind=engine)
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        pool = ValidationJobPool(get_scoring_engine(), session_factory=Session, workers=4, poll_interval=0.05)
+
+        def get_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app = FastAPI()
+        app.include_router(validation.router)
+        app.include_router(developers.router)
+        app.dependency_overrides[get_current_user_id] = lambda: "job_user"
+        app.dependency_overrides[database.get_db] = get_db
+        app.dependency_overrides[get_job_pool] = lambda: pool
+        asyncio.run(scenario(app, pool))
+        assert pool.stats == {"completed": 8, "failed": 0, "requeued": 0, "superseded": 0}
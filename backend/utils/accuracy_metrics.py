@@ -9,6 +9,8 @@ except:
     HAS_SKLEARN = False
 import math
 
+from utils.distance import haversine_pairwise_km
+
 
 class AccuracyMetrics:
     """
@@ -230,14 +232,14 @@ class AccuracyMetrics:
         
         errors_by_vl = {'VL0': [], 'VL1': [], 'VL2': [], 'VL3': []}
         
-        for pred in predictions:
-            test_id = pred['test_id']
-            if test_id in gt_dict:
-                gt = gt_dict[test_id]
-                distance = self.haversine_distance(
-                    gt['lat'], gt['long'],
-                    pred['predicted_lat'], pred['predicted_long']
-                )
+        matched = [(gt_dict[pred['test_id']], pred) for pred in predictions if pred['test_id'] in gt_dict]
+        if matched:
+            # One vectorized pass over all prediction errors
+            distances = haversine_pairwise_km(
+                [gt['lat'] for gt, _ in matched], [gt['long'] for gt, _ in matched],
+                [pred['predicted_lat'] for _, pred in matched], [pred['predicted_long'] for _, pred in matched]
+            ) * 1000.0
+            for (gt, _), distance in zip(matched, distances.tolist()):
                 errors_by_vl[gt['vl']].append(distance)
         
         results = {}
@@ -3,11 +3,11 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from dotenv import load_dotenv
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session # Added: Import Session
-from database import get_db, User # Added: Import get_db and User
+from database import get_db, User, ApiKey # Added: Import get_db and User
 
 load_dotenv()
 
@@ -18,6 +18,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto") # Moved: Defined earlier
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login") # Moved: Defined earlier
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -44,7 +45,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None): # M
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)): # Added: New function
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)): # Added: New function
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -90,3 +91,14 @@ def verify_token(token: str = Depends(oauth2_scheme)):
 def get_current_user_id(user_id: str = Depends(verify_token)) -> str:
     """Dependency to get the current authenticated user ID"""
     return user_id
+
+def get_partner_id(api_key: Optional[str] = Depends(api_key_header), db: Session = Depends(get_db)) -> str:
+    """Dependency for partner-only endpoints: owner of the active API key in X-API-Key"""
+    if not api_key:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing X-API-Key header",
+                            headers={"WWW-Authenticate": "ApiKey"})
+    owner = db.query(ApiKey.user_id).filter(ApiKey.key == api_key, ApiKey.is_active == True).first()
+    if owner is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or inactive API key",
+                            headers={"WWW-Authenticate": "ApiKey"})
+    return owner.user_id
@@ -0,0 +1,34 @@
+"""
+Thread pool for blocking work
+
+Synchronous SQLAlchemy sessions, bcrypt, requests and smtplib must not run
+on the event loop. Route handlers that only do blocking work are plain
+`def` functions, which FastAPI runs on AnyIO's worker threads; async
+handlers that also await something hand their blocking sections to
+run_blocking(), which uses the same threads. BLOCKING_THREADS sizes that
+pool for the process; configure_thread_pool() applies it from
+main.startup_event (the limit belongs to the running event loop).
+"""
+
+import functools
+import os
+from typing import Callable, TypeVar
+
+import anyio.to_thread
+
+
+# Worker threads shared by sync handlers, sync dependencies and run_blocking()
+BLOCKING_THREADS = int(os.getenv("BLOCKING_THREADS", "40"))
+
+T = TypeVar("T")
+
+
+def configure_thread_pool(size: int = BLOCKING_THREADS) -> int:
+    """Size the running event loop's worker thread pool; returns the size"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
+    return size
+
+
+async def run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run fn(*args, **kwargs) on a worker thread and await its result"""
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs))
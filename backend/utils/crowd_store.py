@@ -0,0 +1,170 @@
+import csv
+import os
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+
+# Recency weighting: a confirmation's confidence counts half as much every 180 days
+CONFIDENCE_HALF_LIFE_DAYS = 180.0
+
+# Confirmations recorded at runtime (admin postman confirmations), appended and fsync'd like the ingestion journals
+CONFIRMATION_JOURNAL = "confirmed_crowd_validations.csv"
+CONFIRMATION_COLUMNS = ["request_id", "digipin", "validator_type", "validation_date", "confidence_score"]
+
+
+class CrowdAggregate:
+    """
+    Precomputed crowd confirmations for one DIGIPIN
+
+    The recency-weighted confidence is kept as weighted sums relative to the
+    newest confirmation day (`reference_day`), so their ratio is the
+    recency-weighted mean. weighted_confidence() then decays that mean by
+    the age of the newest confirmation, so stale confirmations score lower.
+    """
+
+    __slots__ = ("total", "by_type", "last_day", "reference_day", "weighted_confidence_sum", "weight_sum")
+
+    def __init__(self):
+        self.total = 0
+        self.by_type: Dict[str, int] = {}
+        self.last_day: Optional[int] = None
+        self.reference_day: Optional[int] = None
+        self.weighted_confidence_sum = 0.0
+        self.weight_sum = 0.0
+
+    def add(self, validator_type: str, day: int, confidence: float):
+        """Record one confirmation on `day` (ordinal)"""
+        self.total += 1
+        self.by_type[validator_type] = self.by_type.get(validator_type, 0) + 1
+
+        if self.reference_day is None:
+            self.reference_day = day
+        elif day > self.reference_day:
+            scale = _decay(day - self.reference_day)
+            self.weighted_confidence_sum *= scale
+            self.weight_sum *= scale
+            self.reference_day = day
+
+        weight = _decay(self.reference_day - day)
+        self.weighted_confidence_sum += weight * confidence
+        self.weight_sum += weight
+        if self.last_day is None or day > self.last_day:
+            self.last_day = day
+
+    def weighted_confidence(self, today: int) -> float:
+        """Recency-weighted confidence as of `today` (ordinal)"""
+        if not self.weight_sum:
+            return 0.0
+        staleness = _decay(max(today - self.reference_day, 0))
+        return staleness * self.weighted_confidence_sum / self.weight_sum
+
+
+class CrowdValidationStore:
+    """
+    Community validator confirmations: DIGIPIN -> CrowdAggregate
+
+    Loaded once from mock_crowd_validations.csv (or the compiled snapshot)
+    and updated incrementally via add(). confirm() also journals the
+    confirmation under the request it came from (e.g. an admin recording a
+    postman confirmation); the journal is replayed on load, and a request
+    already confirmed is not counted again.
+    """
+
+    def __init__(self, data_dir: str, snapshot=None, journal_dir: Optional[str] = None):
+        self.path = os.path.join(data_dir, "mock_crowd_validations.csv")
+        self.journal_path = os.path.join(journal_dir or data_dir, CONFIRMATION_JOURNAL)
+        self.rows: List[List[Any]] = []  # [digipin, validator_type, date iso, confidence]
+        self.aggregates: Dict[str, CrowdAggregate] = {}
+        self.confirmed_requests = set()
+        self._lock = threading.Lock()
+        self._journal_lock = threading.Lock()  # Serializes confirm(); add() only takes _lock
+
+        if snapshot is not None:
+            self.rows = snapshot.tables["crowd_validations"]
+        else:
+            self.load()
+        self._build()
+        self.replay_journal()
+
+    def load(self):
+        """Load the crowd validations file"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    try:
+                        date.fromisoformat(row['validation_date'])
+                        self.rows.append([row['digipin'], row['validator_type'], row['validation_date'],
+                                          float(row['confidence_score'])])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+        except Exception as e:
+            print(f"Warning: Could not load crowd validations: {e}")
+
+    def _build(self):
+        for digipin, validator_type, day, confidence in self.rows:
+            self.aggregates.setdefault(digipin, CrowdAggregate()).add(
+                validator_type, date.fromisoformat(day).toordinal(), confidence
+            )
+
+    def __len__(self) -> int:
+        return len(self.aggregates)
+
+    def replay_journal(self) -> int:
+        """Re-apply journalled confirmations; returns confirmations replayed"""
+        if not os.path.exists(self.journal_path):
+            return 0
+        replayed = 0
+        with open(self.journal_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    day, confidence = date.fromisoformat(row['validation_date']), float(row['confidence_score'])
+                except (KeyError, TypeError, ValueError):
+                    continue  # Torn last line after a crash
+                if row['request_id'] in self.confirmed_requests:
+                    continue
+                self.confirmed_requests.add(row['request_id'])
+                self.add(row['digipin'], row['validator_type'], day, confidence)
+                replayed += 1
+        return replayed
+
+    def add(self, digipin: str, validator_type: str, day: date, confidence: float):
+        """Record a new confirmation in O(1)"""
+        with self._lock:
+            self.aggregates.setdefault(digipin, CrowdAggregate()).add(validator_type, day.toordinal(), confidence)
+
+    def confirm(self, request_id: str, digipin: str, validator_type: str, day: date, confidence: float) -> bool:
+        """Journal and record a confirmation for request_id; False if that request was already confirmed"""
+        with self._journal_lock:
+            if request_id in self.confirmed_requests:
+                return False
+            is_new = not os.path.exists(self.journal_path)
+            with open(self.journal_path, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                if is_new:
+                    writer.writerow(CONFIRMATION_COLUMNS)
+                writer.writerow([request_id, digipin, validator_type, day.isoformat(), confidence])
+                f.flush()
+                os.fsync(f.fileno())
+            self.confirmed_requests.add(request_id)
+        self.add(digipin, validator_type, day, confidence)
+        return True
+
+    def stats(self, digipin: str, today: date) -> Optional[Dict[str, Any]]:
+        """Aggregate view for a DIGIPIN as of `today`, or None if it has no confirmations"""
+        with self._lock:
+            agg = self.aggregates.get(digipin)
+            if agg is None or agg.total == 0:
+                return None
+            return {
+                "total": agg.total,
+                "by_type": dict(agg.by_type),
+                "weighted_confidence": agg.weighted_confidence(today.toordinal()),
+                "last_confirmation": date.fromordinal(agg.last_day),
+            }
+
+
+def _decay(days: int) -> float:
+    return 0.5 ** (days / CONFIDENCE_HALF_LIFE_DAYS)
@@ -0,0 +1,158 @@
+"""
+DIGIPIN codec (India Post)
+
+A DIGIPIN is a 10-symbol code for a ~3.8m x 3.8m cell inside the bounding
+box below. Each symbol picks one cell of a 4x4 grid, refining the box ten
+times, so encoding and decoding are pure arithmetic: no lookup table.
+Codes are written XXX-XXX-XXXX.
+"""
+
+import re
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+DIGIPIN_GRID = [
+    ['F', 'C', '9', '8'],
+    ['J', '3', '2', '7'],
+    ['K', '4', '5', '6'],
+    ['L', 'M', 'P', 'T'],
+]
+
+MIN_LAT, MAX_LAT = 2.5, 38.5
+MIN_LON, MAX_LON = 63.5, 99.5
+LEVELS = 10
+
+_VALID_CODE = re.compile(r'^[FC98J327K456LMPT]{3}-?[FC98J327K456LMPT]{3}-?[FC98J327K456LMPT]{4}$')
+
+# Symbol <-> (row, col); rows count down from the north edge
+_SYMBOLS = np.array(DIGIPIN_GRID, dtype='S1')
+_ROW_OF = np.full(256, -1, dtype=np.int8)
+_COL_OF = np.full(256, -1, dtype=np.int8)
+_POSITION = {}
+for _r, _row in enumerate(DIGIPIN_GRID):
+    for _c, _symbol in enumerate(_row):
+        _ROW_OF[ord(_symbol)] = _r
+        _COL_OF[ord(_symbol)] = _c
+        _POSITION[_symbol] = (_r, _c)
+
+
+def is_valid_digipin(code: str) -> bool:
+    """True for a well-formed DIGIPIN (dashes optional, case-insensitive)"""
+    return bool(code) and _VALID_CODE.match(code.upper()) is not None
+
+
+def encode(lat: float, lon: float) -> str:
+    """DIGIPIN of the cell containing (lat, lon)"""
+    if not (MIN_LAT <= lat <= MAX_LAT and MIN_LON <= lon <= MAX_LON):
+        raise ValueError("Coordinates outside the DIGIPIN bounding box")
+
+    min_lat, max_lat, min_lon, max_lon = MIN_LAT, MAX_LAT, MIN_LON, MAX_LON
+    code = []
+    for level in range(LEVELS):
+        lat_div = (max_lat - min_lat) / 4
+        lon_div = (max_lon - min_lon) / 4
+        row = min(max(3 - int((lat - min_lat) // lat_div), 0), 3)
+        col = min(max(int((lon - min_lon) // lon_div), 0), 3)
+        code.append(DIGIPIN_GRID[row][col])
+        if level in (2, 5):
+            code.append('-')
+
+        max_lat = min_lat + lat_div * (4 - row)
+        min_lat = min_lat + lat_div * (3 - row)
+        min_lon = min_lon + lon_div * col
+        max_lon = min_lon + lon_div
+    return ''.join(code)
+
+
+def bounds(code: str) -> Dict[str, float]:
+    """Bounding box of a DIGIPIN cell"""
+    symbols = code.replace('-', '').upper()
+    if len(symbols) != LEVELS:
+        raise ValueError("DIGIPIN must have 10 symbols")
+
+    min_lat, max_lat, min_lon, max_lon = MIN_LAT, MAX_LAT, MIN_LON, MAX_LON
+    for symbol in symbols:
+        if symbol not in _POSITION:
+            raise ValueError(f"Invalid DIGIPIN symbol: {symbol}")
+        row, col = _POSITION[symbol]
+        lat_div = (max_lat - min_lat) / 4
+        lon_div = (max_lon - min_lon) / 4
+        max_lat = min_lat + lat_div * (4 - row)
+        min_lat = max_lat - lat_div
+        min_lon = min_lon + lon_div * col
+        max_lon = min_lon + lon_div
+    return {"min_lat": min_lat, "max_lat": max_lat, "min_lon": min_lon, "max_lon": max_lon}
+
+
+def decode(code: str) -> Tuple[float, float]:
+    """Centre (lat, lon) of a DIGIPIN cell"""
+    box = bounds(code)
+    return (box["min_lat"] + box["max_lat"]) / 2, (box["min_lon"] + box["max_lon"]) / 2
+
+
+def encode_batch(lats, lons) -> np.ndarray:
+    """
+    Vectorized encode: arrays of lat/long -> array of 'XXX-XXX-XXXX' codes
+
+    Raises ValueError if any point lies outside the DIGIPIN bounding box.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if np.any((lats < MIN_LAT) | (lats > MAX_LAT) | (lons < MIN_LON) | (lons > MAX_LON)):
+        raise ValueError("Coordinates outside the DIGIPIN bounding box")
+
+    n = len(lats)
+    min_lat = np.full(n, MIN_LAT)
+    max_lat = np.full(n, MAX_LAT)
+    min_lon = np.full(n, MIN_LON)
+    max_lon = np.full(n, MAX_LON)
+    out = np.full((n, LEVELS + 2), ord('-'), dtype=np.uint8)
+
+    positions = [0, 1, 2, 4, 5, 6, 8, 9, 10, 11]  # Skipping the dashes
+    for level in range(LEVELS):
+        lat_div = (max_lat - min_lat) / 4
+        lon_div = (max_lon - min_lon) / 4
+        row = np.clip(3 - np.floor((lats - min_lat) / lat_div).astype(np.int64), 0, 3)
+        col = np.clip(np.floor((lons - min_lon) / lon_div).astype(np.int64), 0, 3)
+        out[:, positions[level]] = _SYMBOLS[row, col].view(np.uint8)
+
+        max_lat = min_lat + lat_div * (4 - row)
+        min_lat = min_lat + lat_div * (3 - row)
+        min_lon = min_lon + lon_div * col
+        max_lon = min_lon + lon_div
+
+    return out.view(f'S{LEVELS + 2}').ravel().astype(str)
+
+
+def decode_batch(codes) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized decode: iterable of codes -> (centre lats, centre lons)"""
+    min_lat, max_lat, min_lon, max_lon = _decode_bounds(codes)
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+
+def _decode_bounds(codes):
+    cleaned = [code.replace('-', '').upper() for code in codes]
+    if any(len(code) != LEVELS for code in cleaned):
+        raise ValueError("DIGIPIN must have 10 symbols")
+    symbols = np.frombuffer(''.join(cleaned).encode('ascii'), dtype=np.uint8).reshape(-1, LEVELS)
+    rows = _ROW_OF[symbols].astype(np.int64)
+    cols = _COL_OF[symbols].astype(np.int64)
+    if np.any(rows < 0):
+        raise ValueError("Invalid DIGIPIN symbol")
+
+    n = len(cleaned)
+    min_lat = np.full(n, MIN_LAT)
+    max_lat = np.full(n, MAX_LAT)
+    min_lon = np.full(n, MIN_LON)
+    max_lon = np.full(n, MAX_LON)
+    for level in range(LEVELS):
+        lat_div = (max_lat - min_lat) / 4
+        lon_div = (max_lon - min_lon) / 4
+        row, col = rows[:, level], cols[:, level]
+        max_lat = min_lat + lat_div * (4 - row)
+        min_lat = max_lat - lat_div
+        min_lon = min_lon + lon_div * col
+        max_lon = min_lon + lon_div
+    return min_lat, max_lat, min_lon, max_lon
@@ -0,0 +1,60 @@
+"""
+Vectorized great-circle distance kernels
+
+PreparedCentre precomputes a fixed point's radians and cos(lat), so
+scoring many points against the same centre (a DIGIPIN's IoT pings, a
+spatial index query) only pays for the per-point trigonometry.
+"""
+
+import math
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class PreparedCentre:
+    """A fixed point prepared for repeated haversine queries"""
+
+    __slots__ = ("lat", "lon", "lat_rad", "lon_rad", "cos_lat")
+
+    def __init__(self, lat: float, lon: float):
+        self.lat = lat
+        self.lon = lon
+        self.lat_rad = math.radians(lat)
+        self.lon_rad = math.radians(lon)
+        self.cos_lat = math.cos(self.lat_rad)
+
+    def distances_km(self, lats, lons) -> np.ndarray:
+        """Distance in km from the centre to each (lat, lon) in degrees"""
+        return self.distances_km_prepared(PreparedPoints(lats, lons))
+
+    def distances_km_prepared(self, points: "PreparedPoints") -> np.ndarray:
+        """Distance in km from the centre to points whose trigonometry is already done"""
+        a = (np.sin((points.lat_rad - self.lat_rad) * 0.5) ** 2 +
+             self.cos_lat * points.cos_lat * np.sin((points.lon_rad - self.lon_rad) * 0.5) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class PreparedPoints:
+    """Arrays of points with radians and cos(lat) computed once, for scoring against several centres"""
+
+    __slots__ = ("lat_rad", "lon_rad", "cos_lat")
+
+    def __init__(self, lats, lons):
+        self.lat_rad = np.radians(np.asarray(lats, dtype=np.float64))
+        self.lon_rad = np.radians(np.asarray(lons, dtype=np.float64))
+        self.cos_lat = np.cos(self.lat_rad)
+
+
+def haversine_km(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points"""
+    return PreparedCentre(lat, lon).distances_km(lats, lons)
+
+
+def haversine_pairwise_km(lats1, lons1, lats2, lons2) -> np.ndarray:
+    """Element-wise great-circle distance in km between two arrays of points"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lats1, lons1, lats2, lons2))
+    a = np.sin((lat2 - lat1) * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
@@ -0,0 +1,117 @@
+import csv
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# How long a verified document counts as current evidence of residence
+DOC_VALIDITY_DAYS = {
+    "utility_bill": 365,
+    "property_tax": 730,
+    "aadhaar": 3650,
+    "voter_id": 3650,
+}
+DEFAULT_VALIDITY_DAYS = 365
+
+# Sentinel in latest_day for "no verified document of this type"
+NO_DOCUMENT = np.iinfo(np.int32).min
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class DocumentIndex:
+    """
+    Verified documentary evidence keyed by (DIGIPIN, PIN)
+
+    Individual documents are not kept. Each key owns one row in two small
+    matrices indexed by document type code: the newest verification day
+    (int32 days since epoch) and the number of verified documents (uint32).
+    A lookup is one dict probe plus a row read, however many documents
+    were loaded.
+    """
+
+    def __init__(self, keys: np.ndarray, doc_types: List[str], latest_day: np.ndarray, counts: np.ndarray):
+        self.keys = keys
+        self.doc_types = list(doc_types)
+        self.latest_day = latest_day
+        self.counts = counts
+        self._rows = {key: i for i, key in enumerate(keys.tolist())}
+
+    @classmethod
+    def from_records(cls, digipins: List[str], pins: List[str], doc_types: List[str],
+                     statuses: List[str], verified_dates: List[str]) -> "DocumentIndex":
+        """Build from parallel columns; only verified rows with a valid date are kept"""
+        dates = np.array(verified_dates, dtype='datetime64[D]')
+        keep = np.array([s == "verified" for s in statuses], dtype=bool) & ~np.isnat(dates)
+        days = dates[keep].astype(np.int64)
+
+        composite = np.array([_key(d, p) for d, p in zip(digipins, pins)], dtype=str)[keep]
+        keys, key_ids = np.unique(composite, return_inverse=True)
+        types, type_ids = np.unique(np.array(doc_types, dtype=str)[keep], return_inverse=True)
+
+        latest_day = np.full((len(keys), len(types)), NO_DOCUMENT, dtype=np.int32)
+        counts = np.zeros((len(keys), len(types)), dtype=np.uint32)
+        np.maximum.at(latest_day, (key_ids, type_ids), days.astype(np.int32))
+        np.add.at(counts, (key_ids, type_ids), 1)
+        return cls(keys, types.tolist(), latest_day, counts)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "DocumentIndex":
+        columns: Tuple[List[str], ...] = ([], [], [], [], [])
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        for column, name in zip(columns, ("digipin", "pin", "doc_type", "status", "verified_date")):
+                            column.append(row.get(name) or '')
+            except Exception as e:
+                print(f"Warning: Could not load documentary evidence: {e}")
+        digipins, pins, doc_types, statuses, verified_dates = columns
+        verified_dates = [_iso_or_nat(d) for d in verified_dates]
+        return cls.from_records(digipins, pins, doc_types, statuses, verified_dates)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, prefix: str = "documents") -> "DocumentIndex":
+        return cls(snapshot.array(f"{prefix}.keys"), snapshot.tables[f"{prefix}.types"],
+                   snapshot.array(f"{prefix}.latest_day"), snapshot.array(f"{prefix}.counts"))
+
+    def to_snapshot(self, prefix: str = "documents") -> Tuple[Dict[str, np.ndarray], Dict[str, list]]:
+        arrays = {f"{prefix}.keys": self.keys, f"{prefix}.latest_day": self.latest_day,
+                  f"{prefix}.counts": self.counts}
+        return arrays, {f"{prefix}.types": self.doc_types}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def summary(self, digipin: str, pin: str, today: date) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Per document type: newest verification date, age, count and expiry; None if no documents"""
+        i = self._rows.get(_key(digipin, pin))
+        if i is None:
+            return None
+        today_day = today.toordinal() - _EPOCH_ORDINAL
+        documents = {}
+        for t, doc_type in enumerate(self.doc_types):
+            day = int(self.latest_day[i, t])
+            if day == NO_DOCUMENT:
+                continue
+            age_days = today_day - day
+            documents[doc_type] = {
+                "verified_date": date.fromordinal(day + _EPOCH_ORDINAL).isoformat(),
+                "age_days": age_days,
+                "count": int(self.counts[i, t]),
+                "expired": age_days > DOC_VALIDITY_DAYS.get(doc_type, DEFAULT_VALIDITY_DAYS),
+            }
+        return documents
+
+
+def _key(digipin: str, pin: str) -> str:
+    return f"{digipin}|{pin}"
+
+
+def _iso_or_nat(value: str) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        return "NaT"
@@ -0,0 +1,134 @@
+import csv
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class ColumnarEvidenceStore:
+    """
+    Columnar, DIGIPIN-sorted store for append-only evidence logs
+
+    Rows are kept as NumPy column arrays ordered by (digipin, timestamp).
+    `keys` holds each distinct DIGIPIN once and `offsets` marks where its
+    rows start, so a lookup returns zero-copy array slices.
+    """
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, columns: Dict[str, np.ndarray], time_column: str):
+        self.keys = keys
+        self.offsets = offsets
+        self.columns = columns
+        self.time_column = time_column
+
+    @classmethod
+    def from_arrays(cls, digipins: np.ndarray, columns: Dict[str, np.ndarray], time_column: str) -> "ColumnarEvidenceStore":
+        """Sort unsorted per-row arrays by (digipin, time) and build the slice index"""
+        digipins = np.asarray(digipins, dtype=np.str_)
+        order = np.lexsort((columns[time_column], digipins))
+        sorted_digipins = digipins[order]
+        keys, starts = np.unique(sorted_digipins, return_index=True)
+        offsets = np.append(starts, len(sorted_digipins)).astype(np.int64)
+
+        return cls(keys, offsets, {name: col[order] for name, col in columns.items()}, time_column)
+
+    @classmethod
+    def from_csv(
+        cls, path: str, time_column: str, time_unit: str, numeric_columns: Dict[str, str]
+    ) -> "ColumnarEvidenceStore":
+        """Parse a CSV log into columns (a missing file yields an empty store)"""
+        digipins: List[str] = []
+        times: List[str] = []
+        raw = {name: [] for name in numeric_columns}
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for row in csv.DictReader(f):
+                    digipins.append(row.get('digipin', ''))
+                    times.append(row.get(time_column, ''))
+                    for name in numeric_columns:
+                        raw[name].append(row.get(name) or 0)
+
+        return cls.from_values(digipins, times, raw, time_column, time_unit, numeric_columns)
+
+    @classmethod
+    def from_values(
+        cls, digipins: List[str], times: List[str], raw: Dict[str, list],
+        time_column: str, time_unit: str, numeric_columns: Dict[str, str]
+    ) -> "ColumnarEvidenceStore":
+        """
+        Build a store from raw column values.
+        time_unit is a datetime64 unit ('D' or 's'); rows whose timestamp
+        cannot be parsed are dropped at load time.
+        """
+        columns = {time_column: parse_datetimes(times, time_unit)}
+        for name, dtype in numeric_columns.items():
+            columns[name] = np.array(raw.get(name, []), dtype=np.float64).astype(dtype)
+
+        valid = ~np.isnat(columns[time_column])
+        columns = {name: col[valid] for name, col in columns.items()}
+        return cls.from_arrays(np.array(digipins, dtype=np.str_)[valid], columns, time_column)
+
+    @classmethod
+    def empty(cls, time_column: str, time_unit: str, numeric_columns: Dict[str, str]) -> "ColumnarEvidenceStore":
+        return cls.from_values([], [], {}, time_column, time_unit, numeric_columns)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, prefix: str, time_column: str) -> "ColumnarEvidenceStore":
+        """Open a store whose arrays live in a memory-mapped evidence snapshot"""
+        columns = {
+            name: snapshot.array(f"{prefix}.col.{name}")
+            for name in snapshot.tables[f"{prefix}.columns"]
+        }
+        return cls(snapshot.array(f"{prefix}.keys"), snapshot.array(f"{prefix}.offsets"), columns, time_column)
+
+    def to_snapshot(self, prefix: str) -> Tuple[Dict[str, np.ndarray], Dict[str, list]]:
+        """Arrays and table entries needed to rebuild this store with from_snapshot"""
+        arrays = {f"{prefix}.keys": self.keys, f"{prefix}.offsets": self.offsets}
+        for name, col in self.columns.items():
+            arrays[f"{prefix}.col.{name}"] = col
+        return arrays, {f"{prefix}.columns": list(self.columns)}
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __contains__(self, digipin: str) -> bool:
+        return self._position(digipin) is not None
+
+    def _position(self, digipin: str) -> Optional[int]:
+        i = int(np.searchsorted(self.keys, digipin))
+        if i < len(self.keys) and self.keys[i] == digipin:
+            return i
+        return None
+
+    def lookup(self, digipin: str) -> Optional[Dict[str, np.ndarray]]:
+        """Return the rows for one DIGIPIN as column slices, oldest first"""
+        i = self._position(digipin)
+        if i is None:
+            return None
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return {name: col[start:end] for name, col in self.columns.items()}
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the store"""
+        return self.keys.nbytes + self.offsets.nbytes + sum(col.nbytes for col in self.columns.values())
+
+
+def parse_datetimes(values: List[str], unit: str) -> np.ndarray:
+    """Vectorized ISO-8601 parse with a per-value fallback for malformed entries"""
+    dtype = f"datetime64[{unit}]"
+    try:
+        return np.array(values, dtype=dtype)
+    except ValueError:
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(np.datetime64(datetime.fromisoformat(value), unit))
+            except (TypeError, ValueError):
+                parsed.append(np.datetime64('NaT', unit))
+        return np.array(parsed, dtype=dtype)
+
+
+def to_datetime(value: np.datetime64) -> datetime:
+    """Convert a datetime64 scalar back to a naive datetime"""
+    return value.astype('datetime64[s]').astype(datetime)
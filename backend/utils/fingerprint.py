@@ -3,6 +3,10 @@ import re
 from typing import Dict
 
 
+_WHITESPACE = re.compile(r'\s+')
+_SPECIAL_CHARACTERS = re.compile(r'[^\w\s\-/]')
+
+
 def normalize_for_fingerprint(address: Dict[str, str]) -> str:
     """
     Normalize address for consistent fingerprinting
@@ -14,9 +18,9 @@ def normalize_for_fingerprint(address: Dict[str, str]) -> str:
         # Convert to lowercase
         text = text.lower()
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WHITESPACE.sub(' ', text).strip()
         # Remove special characters except hyphens and slashes
-        text = re.sub(r'[^\w\s\-/]', '', text)
+        text = _SPECIAL_CHARACTERS.sub('', text)
         return text
     
     # Normalize each component
@@ -0,0 +1,56 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from utils.distance import PreparedCentre, PreparedPoints
+
+
+# Pings within this distance of the DIGIPIN centre count as inside the cell
+# (covers a ~4m DIGIPIN cell plus typical consumer GPS error)
+GEOFENCE_RADIUS_M = 100.0
+
+
+def geofence_stats(centre: PreparedCentre, lats: np.ndarray, lons: np.ndarray,
+                   signals: np.ndarray, radius_m: float = GEOFENCE_RADIUS_M) -> Optional[Dict[str, Any]]:
+    """
+    How tightly a DIGIPIN's pings cluster around its centre
+
+    Returns the fraction of pings within radius_m, the signal-strength
+    weighted centroid and its offset from the centre, and the weighted RMS
+    spread of pings around that centroid. Pings without a position are
+    skipped; None if no ping has one.
+    """
+    has_position = ~(np.isnan(lats) | np.isnan(lons))
+    if not has_position.any():
+        return None
+    lats, lons, signals = lats[has_position], lons[has_position], signals[has_position]
+
+    # Stronger signal = more trustworthy fix; missing readings get the median weight
+    has_signal = ~np.isnan(signals)
+    fill = float(np.median(signals[has_signal])) if has_signal.any() else 1.0
+    weights = np.maximum(np.where(has_signal, signals, fill), 1e-6)
+    weights = weights / weights.sum()
+
+    points = PreparedPoints(lats, lons)
+    distances_m = centre.distances_km_prepared(points) * 1000.0
+    centroid = PreparedCentre(float(weights @ lats), float(weights @ lons))
+    spread_m = float(np.sqrt(weights @ (centroid.distances_km_prepared(points) * 1000.0) ** 2))
+    offset_m = float(centre.distances_km([centroid.lat], [centroid.lon])[0] * 1000.0)
+
+    return {
+        "pings_with_position": int(len(lats)),
+        "inside_fraction": float(np.count_nonzero(distances_m <= radius_m)) / len(lats),
+        "centroid_lat": centroid.lat,
+        "centroid_long": centroid.lon,
+        "centroid_offset_m": offset_m,
+        "spread_m": spread_m,
+        "radius_m": radius_m,
+    }
+
+
+def geofence_score(stats: Dict[str, Any]) -> float:
+    """0-100: mostly the share of pings inside, adjusted for centroid drift and scatter"""
+    radius = stats["radius_m"]
+    drift = max(0.0, 1.0 - stats["centroid_offset_m"] / (2 * radius))
+    tightness = max(0.0, 1.0 - stats["spread_m"] / (4 * radius))
+    return 100.0 * (0.6 * stats["inside_fraction"] + 0.25 * drift + 0.15 * tightness)
@@ -3,18 +3,45 @@ import csv
 import os
 from typing import Dict, List, Tuple, Optional
 
+import numpy as np
+
+from utils.street_index import StreetSegmentIndex, parse_house_number
+from utils.spatial_index import GridSpatialIndex
+from utils.polygon_index import PolygonIndex, points_in_polygon
+from utils.pin_digipin_table import PIN_REGION_RADIUS_KM, PinCentroidIndex, PinDigipinTable
+from utils import digipin as digipin_codec
+
+
+# Level 4: landmarks counted around the DIGIPIN centre
+LANDMARK_RADIUS_M = 500.0
+
 
 class GeospatialUtils:
     """Geospatial utility functions for address validation"""
     
-    def __init__(self):
+    def __init__(self, snapshot=None):
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+        self.snapshot = snapshot
         self.pin_centroids = {}
         self.digipin_centers = {}
+        self.declared_pins = {}
+        self.street_segments = StreetSegmentIndex.from_records([], [], [], [], [])
+        self.landmark_index = GridSpatialIndex.from_points([], [], [])
+        self.locality_boundaries = PolygonIndex.from_polygons([], [], [])
         self.load_data()
     
     def load_data(self):
         """Load PIN centroids and DIGIPIN centers"""
+        if self.snapshot is not None:
+            self.pin_centroids = self.snapshot.tables["pin_centroids"]
+            self.digipin_centers = self.snapshot.tables["digipin_centers"]
+            self.street_segments = StreetSegmentIndex.from_snapshot(self.snapshot, "street_segments")
+            self.landmark_index = GridSpatialIndex.from_snapshot(self.snapshot, "landmark_grid")
+            self.locality_boundaries = PolygonIndex.from_snapshot(self.snapshot, "localities")
+            self.declared_pins = self.snapshot.tables["digipin_pins"]
+            self.pin_digipin = PinDigipinTable.from_snapshot(self.snapshot, "pin_digipin")
+            return
+        
         try:
             # Load PIN centroids
             pin_path = os.path.join(self.data_dir, "pin_centroids.csv")
@@ -29,18 +56,69 @@ class GeospatialUtils:
                             'state': row['state']
                         }
             
-            # Load DIGIPIN centers from existing grid
+            # Load centers for grid DIGIPINs the codec cannot decode (legacy/mock codes)
             digipin_path = os.path.join(self.data_dir, "mock_digipin_grid.csv")
             if os.path.exists(digipin_path):
                 with open(digipin_path, 'r') as f:
                     reader = csv.DictReader(f)
                     for row in reader:
+                        self.declared_pins[row['digipin']] = row['pin']
+                        if digipin_codec.is_valid_digipin(row['digipin']):
+                            continue
                         self.digipin_centers[row['digipin']] = {
                             'lat': float(row['lat']),
                             'long': float(row['long'])
                         }
+            
+            # House-number ranges per street segment
+            self.street_segments = StreetSegmentIndex.from_csv(os.path.join(self.data_dir, "street_segments.csv"))
+            
+            # Locality boundary polygons
+            self.locality_boundaries = PolygonIndex.from_csv(os.path.join(self.data_dir, "locality_boundaries.csv"))
+            
+            # Landmark positions, labelled "type:name"
+            landmarks_path = os.path.join(self.data_dir, "landmarks.csv")
+            if os.path.exists(landmarks_path):
+                with open(landmarks_path, 'r', encoding='utf-8') as f:
+                    rows = list(csv.DictReader(f))
+                self.landmark_index = GridSpatialIndex.from_points(
+                    [float(row['lat']) for row in rows],
+                    [float(row['long']) for row in rows],
+                    [f"{row['landmark_type']}:{row['landmark_name']}" for row in rows]
+                )
         except Exception as e:
             print(f"Warning: Could not load geospatial data: {e}")
+        
+        # PIN <-> DIGIPIN distances for every known DIGIPIN, so level 1 is a lookup
+        self.pin_digipin = PinDigipinTable.build(self.pin_centroids, self._known_digipin_centers(), self.declared_pins)
+    
+    def _known_digipin_centers(self):
+        """(digipin, lat, long) for every DIGIPIN in the reference grid"""
+        for digipin in self.declared_pins:
+            center = self.get_digipin_center(digipin)
+            if center:
+                yield digipin, center['lat'], center['long']
+    
+    def update_pin_centroid(self, pin: str, centroid: Dict):
+        """Change a PIN centroid and recompute only that PIN's rows of the consistency table"""
+        self.pin_centroids[pin] = centroid
+        index = PinCentroidIndex({pin: centroid})
+        rows = []
+        for digipin, lat, lon in self._known_digipin_centers():
+            for _, distance, in_region in index.pairs(lat, lon, self.declared_pins.get(digipin)):
+                rows.append((digipin, distance, in_region))
+        self.pin_digipin.replace_pin(pin, rows)
+    
+    def update_digipin_center(self, digipin: str, center: Dict, pin: Optional[str] = None):
+        """Add or move a reference DIGIPIN and recompute only its rows of the consistency table"""
+        if not digipin_codec.is_valid_digipin(digipin):
+            self.digipin_centers[digipin] = {'lat': center['lat'], 'long': center['long']}
+        if pin:
+            self.declared_pins[digipin] = pin
+        else:
+            self.declared_pins.setdefault(digipin, '')
+        rows = PinCentroidIndex(self.pin_centroids).pairs(center['lat'], center['long'], self.declared_pins[digipin])
+        self.pin_digipin.replace_digipin(digipin, rows)
     
     def haversine(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """
@@ -67,11 +145,30 @@ class GeospatialUtils:
         return self.pin_centroids.get(pin)
     
     def get_digipin_center(self, digipin: str) -> Optional[Dict[str, float]]:
-        """Get the geographic center of a DIGIPIN"""
+        """Get the geographic center of a DIGIPIN (decoded arithmetically for official codes)"""
+        if digipin_codec.is_valid_digipin(digipin):
+            lat, long = digipin_codec.decode(digipin)
+            return {'lat': lat, 'long': long}
         return self.digipin_centers.get(digipin)
     
+    def pin_digipin_consistency(self, pin: str, digipin: str) -> Optional[Tuple[float, bool]]:
+        """(distance_km, in_region) from the precomputed table, computed on the fly for unlisted pairs"""
+        row = self.pin_digipin.lookup(pin, digipin)
+        if row is not None:
+            return row
+        distance_km = self.calculate_pin_digipin_distance(pin, digipin)
+        if distance_km < 0:
+            return None
+        declared_pin = self.declared_pins.get(digipin)
+        in_region = pin == declared_pin if declared_pin else distance_km <= PIN_REGION_RADIUS_KM
+        return distance_km, in_region
+    
     def calculate_pin_digipin_distance(self, pin: str, digipin: str) -> float:
         """Calculate distance between PIN centroid and DIGIPIN center in km"""
+        row = self.pin_digipin.lookup(pin, digipin)
+        if row is not None:
+            return row[0]
+        
         pin_center = self.get_pin_centroid(pin)
         digipin_center = self.get_digipin_center(digipin)
         
@@ -89,100 +186,145 @@ class GeospatialUtils:
         point: (lat, lon)
         polygon: list of (lat, lon) tuples
         """
-        x, y = point
-        n = len(polygon)
-        inside = False
-        
-        p1x, p1y = polygon[0]
-        for i in range(1, n + 1):
-            p2x, p2y = polygon[i % n]
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-            p1x, p1y = p2x, p2y
-        
-        return inside
+        ring = np.asarray(polygon, dtype=np.float64)
+        return points_in_polygon(point[0], point[1], ring[:, 0], ring[:, 1])
     
-    def calculate_geo_precision_score(self, address: Dict[str, str]) -> Tuple[float, Dict]:
+    def calculate_geo_precision_score(self, address: Dict[str, str], area: Optional[Tuple] = None) -> Tuple[float, Dict]:
         """
         4-level hierarchical geospatial precision scoring
         Returns score 0-100 and details
+        
+        `area` may carry a precomputed area_precision() result for this
+        address's PIN, DIGIPIN and locality (batch scoring shares it).
         """
         pin = address.get('pin', '')
         digipin = address.get('digipin', '')
-        house_no = address.get('house_no', '')
-        street = address.get('street', '')
+        if area is None:
+            area = self.area_precision(pin, digipin, address.get('locality', ''))
+        area_scores, location_details, landmark_details = area
+        house_score, house_details = self.house_precision(digipin, address.get('street', ''), address.get('house_no', ''))
         
         scores = {
-            'level1_pin_digipin': 0.0,
-            'level2_polygon': 0.0,
-            'level3_house_range': 0.0,
-            'level4_landmark': 0.0
+            'level1_pin_digipin': area_scores['level1_pin_digipin'],
+            'level2_polygon': area_scores['level2_polygon'],
+            'level3_house_range': house_score,
+            'level4_landmark': area_scores['level4_landmark']
         }
+        details = {**location_details, **house_details, **landmark_details}
+        
+        # Calculate weighted total
+        total_score = (
+            scores['level1_pin_digipin'] * 0.30 +
+            scores['level2_polygon'] * 0.25 +
+            scores['level3_house_range'] * 0.20 +
+            scores['level4_landmark'] * 0.15
+        )
+        
+        details['breakdown'] = scores
+        details['method'] = 'geo_precision_4level'
+        
+        return round(total_score, 2), details
+    
+    def area_precision(self, pin: str, digipin: str, locality: str) -> Tuple[Dict, Dict, Dict]:
+        """
+        Levels 1, 2 and 4, which depend only on PIN, DIGIPIN and locality
+        Returns (scores, level 1-2 details, level 4 details)
+        """
+        scores = {}
         details = {}
         
-        # Level 1: PIN-DIGIPIN distance (30% weight)
-        distance_km = self.calculate_pin_digipin_distance(pin, digipin)
-        if distance_km >= 0:
+        # Level 1: PIN-DIGIPIN distance (30% weight), one lookup in the precomputed table
+        consistency = self.pin_digipin_consistency(pin, digipin)
+        if consistency is not None:
+            distance_km, in_region = consistency
             # 5km tolerance - perfect score at 0km, 0 score at 5km+
             scores['level1_pin_digipin'] = max(0, 100 - (distance_km / 5 * 100))
             details['pin_digipin_distance_km'] = round(distance_km, 2)
+            details['pin_digipin_in_region'] = in_region
         else:
             scores['level1_pin_digipin'] = 50  # Default when data unavailable
             details['pin_digipin_distance_km'] = None
+            details['pin_digipin_in_region'] = None
         
-        # Level 2: Street/locality polygon intersection (25% weight)
-        # Simulated: Check if street name consistency exists
-        digipin_data = self.digipin_centers.get(digipin)
-        if digipin_data and street:
-            # Mock polygon check - in real system would use actual boundaries
-            scores['level2_polygon'] = 75.0  # Assume match for demo
-            details['street_polygon_match'] = True
+        # Level 2: Locality polygon containment (25% weight)
+        # Which known locality boundaries hold the DIGIPIN centre, via the R-tree
+        digipin_center = self.get_digipin_center(digipin)
+        if digipin_center:
+            containing = self.locality_boundaries.localities_at(digipin_center['lat'], digipin_center['long'])
+            named = [b for b in containing if b['locality'].lower() == locality.strip().lower()]
+            if any(b['pin'] == pin for b in named) or (named and not pin):
+                scores['level2_polygon'] = 95.0
+            elif named:
+                scores['level2_polygon'] = 80.0  # Right locality, different PIN on record
+            elif any(b['pin'] == pin for b in containing):
+                scores['level2_polygon'] = 70.0  # Inside the PIN, locality name not on record
+            elif containing:
+                scores['level2_polygon'] = 25.0  # Inside some other locality
+            elif self.locality_boundaries.has_locality(locality.strip()):
+                scores['level2_polygon'] = 20.0  # Outside the boundary we have for this locality
+            else:
+                scores['level2_polygon'] = 50.0  # No boundary coverage here
+            details['street_polygon_match'] = bool(named)
+            details['locality_polygons'] = [b['locality'] for b in containing]
         else:
             scores['level2_polygon'] = 50.0
             details['street_polygon_match'] = False
         
-        # Level 3: House number range validation (20% weight)
-        # Check if house number is reasonable
-        if house_no:
+        # Level 4: Landmark proximity (15% weight)
+        # Known landmarks within LANDMARK_RADIUS_M of the DIGIPIN centre
+        landmark_details = {}
+        if digipin_center:
+            nearby = self.landmark_index.within(digipin_center['lat'], digipin_center['long'], LANDMARK_RADIUS_M)
+            if nearby:
+                # More landmarks and a closer nearest landmark both raise confidence
+                nearest_label, nearest_m = nearby[0]
+                closeness = 1 - nearest_m / LANDMARK_RADIUS_M
+                scores['level4_landmark'] = round(min(100.0, 50.0 + 10.0 * len(nearby) + 20.0 * closeness), 2)
+                landmark_type, _, landmark_name = nearest_label.partition(':')
+                landmark_details['nearest_landmark'] = {
+                    'name': landmark_name,
+                    'type': landmark_type,
+                    'distance_m': round(nearest_m, 1)
+                }
+            else:
+                scores['level4_landmark'] = 40.0
+            landmark_details['landmarks_within_radius'] = len(nearby)
+        else:
+            scores['level4_landmark'] = 30.0
+        landmark_details['landmark_proximity_score'] = scores['level4_landmark']
+        
+        return scores, details, landmark_details
+    
+    def house_precision(self, digipin: str, street: str, house_no: str) -> Tuple[float, Dict]:
+        """Level 3: house number range validation (20% weight)"""
+        details = {}
+        # Against known street segments when we have them for this street
+        house_num = parse_house_number(house_no)
+        if house_num is not None and self.street_segments.has_street(digipin, street):
+            segment = self.street_segments.find(digipin, street, house_num)
+            if segment:
+                score = 95.0
+                details['house_range_valid'] = True
+                details['street_segment'] = segment
+            else:
+                score = 20.0
+                details['house_range_valid'] = False
+                details['street_segment'] = None
+        # Otherwise check if house number is reasonable
+        elif house_no:
             try:
                 # Extract numeric part
                 house_num = int(''.join(filter(str.isdigit, house_no)))
                 if 1 <= house_num <= 999:
-                    scores['level3_house_range'] = 80.0
+                    score = 80.0
                     details['house_range_valid'] = True
                 else:
-                    scores['level3_house_range'] = 40.0
+                    score = 40.0
                     details['house_range_valid'] = False
             except:
-                scores['level3_house_range'] = 50.0
+                score = 50.0
                 details['house_range_valid'] = False
         else:
-            scores['level3_house_range'] = 50.0
+            score = 50.0
             details['house_range_valid'] = False
-        
-        # Level 4: Landmark proximity (15% weight)
-        # Simulated based on DIGIPIN existence
-        if digipin in self.digipin_centers:
-            scores['level4_landmark'] = 70.0
-            details['landmark_proximity_score'] = 70.0
-        else:
-            scores['level4_landmark'] = 30.0
-            details['landmark_proximity_score'] = 30.0
-        
-        # Calculate weighted total
-        total_score = (
-            scores['level1_pin_digipin'] * 0.30 +
-            scores['level2_polygon'] * 0.25 +
-            scores['level3_house_range'] * 0.20 +
-            scores['level4_landmark'] * 0.15
-        )
-        
-        details['breakdown'] = scores
-        details['method'] = 'geo_precision_4level'
-        
-        return round(total_score, 2), details
+        return score, details
@@ -0,0 +1,245 @@
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from utils.evidence_store import ColumnarEvidenceStore
+
+
+# Raw pings kept per DIGIPIN; older ones are folded into daily summaries
+RAW_PINGS_PER_DIGIPIN = 256
+
+# Daily summaries kept per DIGIPIN; older days only survive in the running totals
+SUMMARY_DAYS = 365
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_SECONDS_PER_DAY = 86400
+
+
+class DailySummary:
+    """Downsampled pings for one day"""
+
+    __slots__ = ("count", "lat_sum", "long_sum", "position_count", "signal_sum", "signal_count")
+
+    def __init__(self):
+        self.count = 0
+        self.lat_sum = 0.0
+        self.long_sum = 0.0
+        self.position_count = 0
+        self.signal_sum = 0.0
+        self.signal_count = 0
+
+    def add(self, lat: float, long: float, signal: float, count: int = 1):
+        self.count += count
+        if not (np.isnan(lat) or np.isnan(long)):
+            self.lat_sum += lat
+            self.long_sum += long
+            self.position_count += count
+        if not np.isnan(signal):
+            self.signal_sum += signal
+            self.signal_count += count
+
+    def to_dict(self, day: int) -> Dict[str, Any]:
+        return {
+            "date": date.fromordinal(day).isoformat(),
+            "count": self.count,
+            "mean_lat": self.lat_sum / self.position_count if self.position_count else None,
+            "mean_long": self.long_sum / self.position_count if self.position_count else None,
+            "mean_signal_strength": self.signal_sum / self.signal_count if self.signal_count else None,
+        }
+
+
+class IotPingHistory:
+    """
+    Bounded ping history for one DIGIPIN
+
+    The newest `capacity` pings live in fixed-size numpy ring buffers
+    (timestamps as epoch seconds, NaN for missing readings). A ping pushed
+    out of the ring is folded into its day's DailySummary, and only the
+    newest `max_days` summaries are kept, so memory per DIGIPIN is bounded
+    however long the service runs. `count` and `last_ping` cover every ping
+    ever seen.
+    """
+
+    __slots__ = ("capacity", "max_days", "timestamps", "lats", "longs", "signals",
+                 "head", "size", "daily", "count", "last_ping")
+
+    def __init__(self, capacity: int = RAW_PINGS_PER_DIGIPIN, max_days: int = SUMMARY_DAYS):
+        self.capacity = capacity
+        self.max_days = max_days
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.lats = np.full(capacity, np.nan)
+        self.longs = np.full(capacity, np.nan)
+        self.signals = np.full(capacity, np.nan)
+        self.head = 0  # Next slot to write
+        self.size = 0
+        self.daily: Dict[int, DailySummary] = {}
+        self.count = 0
+        self.last_ping: Optional[int] = None
+
+    @classmethod
+    def from_rows(cls, rows: Dict[str, np.ndarray], time_column: str,
+                  capacity: int = RAW_PINGS_PER_DIGIPIN, max_days: int = SUMMARY_DAYS) -> "IotPingHistory":
+        """Seed from a columnar log slice (sorted oldest first)"""
+        history = cls(capacity, max_days)
+        seconds = rows[time_column].astype('datetime64[s]').astype(np.int64)
+        n = len(seconds)
+        lats, longs, signals = (_column(rows, name, n) for name in ("lat", "long", "signal_strength"))
+
+        # Everything older than the newest `capacity` pings goes straight into daily summaries
+        split = max(0, n - capacity)
+        if split:
+            days, inverse = np.unique(seconds[:split] // _SECONDS_PER_DAY + _EPOCH_ORDINAL, return_inverse=True)
+            has_position = ~(np.isnan(lats[:split]) | np.isnan(longs[:split]))
+            has_signal = ~np.isnan(signals[:split])
+            counts = np.bincount(inverse, minlength=len(days))
+            lat_sums = np.bincount(inverse, np.where(has_position, lats[:split], 0.0), len(days))
+            long_sums = np.bincount(inverse, np.where(has_position, longs[:split], 0.0), len(days))
+            position_counts = np.bincount(inverse, has_position, len(days))
+            signal_sums = np.bincount(inverse, np.where(has_signal, signals[:split], 0.0), len(days))
+            signal_counts = np.bincount(inverse, has_signal, len(days))
+            for i in range(max(0, len(days) - max_days), len(days)):
+                summary = history.daily[int(days[i])] = DailySummary()
+                summary.count = int(counts[i])
+                summary.lat_sum = float(lat_sums[i])
+                summary.long_sum = float(long_sums[i])
+                summary.position_count = int(position_counts[i])
+                summary.signal_sum = float(signal_sums[i])
+                summary.signal_count = int(signal_counts[i])
+
+        raw = n - split
+        history.timestamps[:raw] = seconds[split:]
+        history.lats[:raw] = lats[split:]
+        history.longs[:raw] = longs[split:]
+        history.signals[:raw] = signals[split:]
+        history.head = raw % capacity
+        history.size = raw
+        history.count = n
+        history.last_ping = int(seconds.max()) if n else None
+        return history
+
+    def add(self, timestamp: int, lat: float, long: float, signal: float):
+        """Record one ping (epoch seconds), evicting the oldest raw ping if the ring is full"""
+        if self.size == self.capacity:
+            self._fold(self.head)
+        else:
+            self.size += 1
+        self.timestamps[self.head] = timestamp
+        self.lats[self.head] = lat
+        self.longs[self.head] = long
+        self.signals[self.head] = signal
+        self.head = (self.head + 1) % self.capacity
+
+        self.count += 1
+        if self.last_ping is None or timestamp > self.last_ping:
+            self.last_ping = timestamp
+
+    def _fold(self, slot: int):
+        day = int(self.timestamps[slot]) // _SECONDS_PER_DAY + _EPOCH_ORDINAL
+        summary = self.daily.get(day)
+        if summary is None:
+            if len(self.daily) >= self.max_days:
+                oldest = min(self.daily)
+                if day < oldest:
+                    return  # Older than anything we still summarise; only the totals keep it
+                del self.daily[oldest]
+            summary = self.daily[day] = DailySummary()
+        summary.add(self.lats[slot], self.longs[slot], self.signals[slot])
+
+    def raw(self) -> Dict[str, np.ndarray]:
+        """Raw pings currently held, oldest first"""
+        order = (np.arange(self.size) + self.head - self.size) % self.capacity
+        return {
+            "timestamp": self.timestamps[order].astype('datetime64[s]'),
+            "lat": self.lats[order],
+            "long": self.longs[order],
+            "signal_strength": self.signals[order],
+        }
+
+
+class IotPingRetention:
+    """
+    Per-DIGIPIN bounded IoT ping histories over a columnar ping log
+
+    A DIGIPIN's history is seeded from its log slice the first time
+    append_many() touches it, then maintained incrementally. Reads of a
+    DIGIPIN that was never appended to are served from a throwaway history
+    sized to its log slice, so lookups never grow the cache.
+    """
+
+    def __init__(self, store: ColumnarEvidenceStore,
+                 capacity: int = RAW_PINGS_PER_DIGIPIN, max_days: int = SUMMARY_DAYS):
+        self.store = store
+        self.capacity = capacity
+        self.max_days = max_days
+        self._histories: Dict[str, IotPingHistory] = {}
+        self._appended = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.store) + self._appended
+
+    def _get(self, digipin: str, create: bool) -> Optional[IotPingHistory]:
+        history = self._histories.get(digipin)
+        if history is not None:
+            return history
+        rows = self.store.lookup(digipin)
+        if not create:
+            if rows is None:
+                return None
+            n = len(rows[self.store.time_column])
+            return IotPingHistory.from_rows(rows, self.store.time_column, max(1, min(n, self.capacity)), self.max_days)
+        if rows is None:
+            history = IotPingHistory(self.capacity, self.max_days)
+        else:
+            history = IotPingHistory.from_rows(rows, self.store.time_column, self.capacity, self.max_days)
+        self._histories[digipin] = history
+        return history
+
+    def append_many(self, pings: List[Dict[str, Any]]):
+        """Record a batch of pings ({digipin, timestamp: datetime, lat, long, signal_strength})"""
+        with self._lock:
+            for ping in pings:
+                self._get(ping["digipin"], create=True).add(
+                    int((ping["timestamp"] - _EPOCH).total_seconds()),
+                    _float(ping.get("lat")), _float(ping.get("long")), _float(ping.get("signal_strength"))
+                )
+            self._appended += len(pings)
+
+    def summary(self, digipin: str) -> Optional[Dict[str, Any]]:
+        """Ping count and latest ping for a DIGIPIN, or None if it has no pings"""
+        with self._lock:
+            history = self._get(digipin, create=False)
+            if history is None or history.count == 0:
+                return None
+            return {
+                "count": history.count,
+                "last_ping": _EPOCH + timedelta(seconds=history.last_ping),
+                "raw_pings": history.size,
+                "summarised_days": len(history.daily),
+            }
+
+    def recent_pings(self, digipin: str) -> Optional[Dict[str, np.ndarray]]:
+        """Raw pings still held for a DIGIPIN (oldest first), or None"""
+        with self._lock:
+            history = self._get(digipin, create=False)
+            return None if history is None or history.size == 0 else history.raw()
+
+    def daily_summaries(self, digipin: str) -> List[Dict[str, Any]]:
+        """Downsampled history for a DIGIPIN, oldest day first"""
+        with self._lock:
+            history = self._get(digipin, create=False)
+            if history is None:
+                return []
+            return [history.daily[day].to_dict(day) for day in sorted(history.daily)]
+
+
+def _column(rows: Dict[str, np.ndarray], name: str, n: int) -> np.ndarray:
+    values = rows.get(name)
+    return np.full(n, np.nan) if values is None else values.astype(np.float64)
+
+
+def _float(value) -> float:
+    return np.nan if value is None else float(value)
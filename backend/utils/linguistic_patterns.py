@@ -7,8 +7,9 @@ from typing import Dict, List, Set, Tuple
 class LinguisticValidator:
     """Validates addresses using India-specific linguistic and cultural patterns"""
     
-    def __init__(self):
+    def __init__(self, snapshot=None):
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+        self.snapshot = snapshot
         self.landmarks_by_digipin = {}
         self.load_landmarks()
         
@@ -35,6 +36,10 @@ class LinguisticValidator:
     
     def load_landmarks(self):
         """Load landmark data for each DIGIPIN"""
+        if self.snapshot is not None:
+            self.landmarks_by_digipin = self.snapshot.tables["landmarks_by_digipin"]
+            return
+        
         try:
             landmarks_path = os.path.join(self.data_dir, "landmarks.csv")
             if os.path.exists(landmarks_path):
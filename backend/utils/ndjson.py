@@ -0,0 +1,36 @@
+"""
+Helpers for endpoints that accept either a JSON array or NDJSON
+(one JSON object per line, Content-Type application/x-ndjson)
+"""
+
+import json
+from typing import Any, List
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def parse_json_or_ndjson(body: bytes, content_type: str = "") -> List[Any]:
+    """
+    Parse a request body into a list of items
+
+    NDJSON is used when the content type says so; otherwise the body is read
+    as JSON, where a single object is treated as a one-item batch.
+    Raises ValueError (with the offending line number for NDJSON) on bad input.
+    """
+    if "ndjson" in content_type:
+        items = []
+        for line_no, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_no}: {e.msg}")
+        return items
+
+    try:
+        data = json.loads(body or b"[]")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e.msg}")
+    return data if isinstance(data, list) else [data]
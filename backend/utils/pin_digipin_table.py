@@ -0,0 +1,160 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from utils.distance import PreparedCentre
+from utils.spatial_index import GridSpatialIndex
+
+
+# Pairs further apart than this are not stored; level 1 already scores 0 beyond 5 km
+TABLE_RADIUS_KM = 25.0
+
+# A DIGIPIN with no declared PIN counts as inside a PIN's region within this distance
+PIN_REGION_RADIUS_KM = 5.0
+
+# Grid cell for the PIN centroid index used while building (~11 km)
+_PIN_CELL_DEGREES = 0.1
+
+
+class PinDigipinTable:
+    """
+    Precomputed PIN <-> DIGIPIN consistency: distance and in-region flag
+
+    Rows live in flat arrays sorted by "digipin|pin", so a lookup is one
+    binary search. Only pairs within TABLE_RADIUS_KM are stored. When a
+    PIN centroid or DIGIPIN centre changes, the affected rows are
+    recomputed into a small overlay instead of rebuilding the arrays; the
+    next snapshot build folds the overlay back in.
+    """
+
+    def __init__(self, keys: np.ndarray, distance_km: np.ndarray, in_region: np.ndarray):
+        self.keys = keys
+        self.distance_km = distance_km
+        self.in_region = in_region
+        self._overlay: Dict[str, Optional[Tuple[float, bool]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, pin_centroids: Dict[str, Dict], digipin_centers: Iterable[Tuple[str, float, float]],
+              declared_pins: Dict[str, str]) -> "PinDigipinTable":
+        """
+        Compute every pair within TABLE_RADIUS_KM
+
+        digipin_centers yields (digipin, lat, long); declared_pins maps a
+        DIGIPIN to the PIN its reference record names, which always counts
+        as in-region.
+        """
+        pins = PinCentroidIndex(pin_centroids)
+        keys, distances, flags = [], [], []
+        for digipin, lat, lon in digipin_centers:
+            for pin, distance, in_region in pins.pairs(lat, lon, declared_pins.get(digipin)):
+                keys.append(_key(digipin, pin))
+                distances.append(distance)
+                flags.append(in_region)
+
+        keys = np.array(keys, dtype=str) if keys else np.empty(0, dtype='<U1')
+        order = np.argsort(keys, kind='stable')
+        return cls(keys[order], np.asarray(distances, dtype=np.float32)[order],
+                   np.asarray(flags, dtype=bool)[order])
+
+    @classmethod
+    def from_snapshot(cls, snapshot, prefix: str = "pin_digipin") -> "PinDigipinTable":
+        return cls(*(snapshot.array(f"{prefix}.{name}") for name in _ARRAYS))
+
+    def to_snapshot(self, prefix: str = "pin_digipin") -> Tuple[Dict[str, np.ndarray], Dict[str, list]]:
+        keys, distance_km, in_region = self._merged()
+        arrays = {f"{prefix}.keys": keys, f"{prefix}.distance_km": distance_km, f"{prefix}.in_region": in_region}
+        return arrays, {}
+
+    def __len__(self) -> int:
+        return len(self.keys) + sum(1 for value in self._overlay.values() if value is not None)
+
+    def lookup(self, pin: str, digipin: str) -> Optional[Tuple[float, bool]]:
+        """(distance_km, in_region) for the pair, or None if it is not in the table"""
+        key = _key(digipin, pin)
+        if self._overlay:
+            with self._lock:
+                if key in self._overlay:
+                    return self._overlay[key]
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return float(self.distance_km[i]), bool(self.in_region[i])
+        return None
+
+    def replace_digipin(self, digipin: str, rows: Iterable[Tuple[str, float, bool]]):
+        """Swap in freshly computed (pin, distance_km, in_region) rows for one DIGIPIN"""
+        lo = int(np.searchsorted(self.keys, _key(digipin, "")))
+        hi = int(np.searchsorted(self.keys, _key(digipin, "\uffff")))
+        with self._lock:
+            for key in self.keys[lo:hi].tolist():
+                self._overlay[key] = None
+            for key in [k for k in self._overlay if k.startswith(_key(digipin, ""))]:
+                self._overlay[key] = None
+            for pin, distance, in_region in rows:
+                self._overlay[_key(digipin, pin)] = (float(distance), bool(in_region))
+
+    def replace_pin(self, pin: str, rows: Iterable[Tuple[str, float, bool]]):
+        """Swap in freshly computed (digipin, distance_km, in_region) rows for one PIN"""
+        suffix = f"|{pin}"
+        stale = np.char.endswith(self.keys, suffix) if len(self.keys) else np.zeros(0, dtype=bool)
+        with self._lock:
+            for key in self.keys[stale].tolist():
+                self._overlay[key] = None
+            for key in [k for k in self._overlay if k.endswith(suffix)]:
+                self._overlay[key] = None
+            for digipin, distance, in_region in rows:
+                self._overlay[_key(digipin, pin)] = (float(distance), bool(in_region))
+
+    def _merged(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Base arrays with the overlay applied, for writing a snapshot"""
+        with self._lock:
+            overlay = dict(self._overlay)
+        if not overlay:
+            return self.keys, self.distance_km, self.in_region
+
+        keep = ~np.isin(self.keys, list(overlay))
+        added = [(key, value) for key, value in overlay.items() if value is not None]
+        keys = np.concatenate([self.keys[keep].astype(str), np.array([k for k, _ in added], dtype=str)])
+        distance_km = np.concatenate([self.distance_km[keep], np.array([v[0] for _, v in added], dtype=np.float32)])
+        in_region = np.concatenate([self.in_region[keep], np.array([v[1] for _, v in added], dtype=bool)])
+        order = np.argsort(keys, kind='stable')
+        return keys[order], distance_km[order], in_region[order]
+
+
+class PinCentroidIndex:
+    """PIN centroids on a coarse grid, for finding the PINs near a DIGIPIN"""
+
+    def __init__(self, pin_centroids: Dict[str, Dict]):
+        pins = list(pin_centroids)
+        self.grid = GridSpatialIndex.from_points(
+            [pin_centroids[p]['lat'] for p in pins],
+            [pin_centroids[p]['long'] for p in pins],
+            pins,
+            cell_degrees=_PIN_CELL_DEGREES,
+        )
+        self.pin_centroids = pin_centroids
+
+    def pairs(self, lat: float, lon: float, declared_pin: Optional[str]):
+        """(pin, distance_km, in_region) for PINs within TABLE_RADIUS_KM, plus the declared PIN"""
+        found = {pin: metres / 1000.0 for pin, metres in self.grid.within(lat, lon, TABLE_RADIUS_KM * 1000.0)}
+        if declared_pin and declared_pin not in found and declared_pin in self.pin_centroids:
+            centroid = self.pin_centroids[declared_pin]
+            found[declared_pin] = float(PreparedCentre(lat, lon).distances_km([centroid['lat']], [centroid['long']])[0])
+        return [
+            (pin, distance, _in_region(pin, distance, declared_pin))
+            for pin, distance in found.items()
+        ]
+
+
+def _in_region(pin: str, distance_km: float, declared_pin: Optional[str]) -> bool:
+    if declared_pin:
+        return pin == declared_pin
+    return distance_km <= PIN_REGION_RADIUS_KM
+
+
+_ARRAYS = ("keys", "distance_km", "in_region")
+
+
+def _key(digipin: str, pin: str) -> str:
+    return f"{digipin}|{pin}"
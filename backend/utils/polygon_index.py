@@ -0,0 +1,199 @@
+import csv
+import math
+import os
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+# R-tree fan-out: boxes per node
+NODE_CAPACITY = 16
+
+# The top level is scanned in full, so stop adding levels once it is this small
+ROOT_SCAN_LIMIT = 1024
+
+
+def points_in_polygon(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> bool:
+    """Even-odd ray cast of one point against one ring of vertices, vectorized over edges"""
+    lat2, lon2 = np.roll(lats, -1), np.roll(lons, -1)
+    return bool(_crossings(lat, lon, lats, lat2, lons, _slopes(lats, lon_span=lon2 - lons, lat2=lat2)).sum() & 1)
+
+
+def _slopes(lat1: np.ndarray, lon_span: np.ndarray, lat2: np.ndarray) -> np.ndarray:
+    """d(long)/d(lat) per edge; 0 for edges along a parallel, which never straddle a ray"""
+    lat_span = lat2 - lat1
+    flat = lat_span == 0
+    return np.where(flat, 0.0, lon_span / np.where(flat, 1.0, lat_span))
+
+
+def _crossings(lat, lon, lat1, lat2, lon1, slope) -> np.ndarray:
+    """True for each edge that a ray from the point towards +longitude crosses"""
+    return ((lat1 > lat) != (lat2 > lat)) & (lon < lon1 + (lat - lat1) * slope)
+
+
+class PolygonIndex:
+    """
+    Locality boundary polygons behind a packed bounding-box R-tree
+
+    Vertices of every polygon sit in flat arrays with per-polygon offsets,
+    and each edge is stored once (start point, end latitude, slope) so
+    containment is a vectorized crossing count over a polygon's edges.
+    Bounding boxes are Sort-Tile-Recursive packed into a static R-tree of
+    NODE_CAPACITY-wide levels: a query scans the small top level, descends
+    keeping only the nodes whose box holds the point, then ray casts just
+    the surviving polygons.
+    """
+
+    def __init__(self, names: np.ndarray, pins: np.ndarray, edge_offsets: np.ndarray, edges: np.ndarray,
+                 level_boxes: List[np.ndarray]):
+        self.names = names
+        self.pins = pins
+        self.edge_offsets = edge_offsets
+        # (4, n_edges): start lat, end lat, start long, slope; one gather fetches a polygon's edges
+        self.edges = edges
+        # level_boxes[0] holds polygon boxes in tree order; the last level is scanned in full.
+        # Each level is a (4, n) array of min_lat, min_lon, max_lat, max_lon rows
+        self.level_boxes = level_boxes
+        self._known_names = {name.lower() for name in names.tolist()}
+
+    @classmethod
+    def from_polygons(cls, names: Sequence[str], pins: Sequence[str],
+                      rings: Sequence[Sequence[Tuple[float, float]]]) -> "PolygonIndex":
+        """Build from parallel lists of names, PINs and rings of (lat, long) vertices"""
+        rings = [np.asarray(ring, dtype=np.float64).reshape(-1, 2) for ring in rings]
+        boxes = np.array([[r[:, 0].min(), r[:, 1].min(), r[:, 0].max(), r[:, 1].max()] for r in rings],
+                         dtype=np.float64).reshape(-1, 4)
+        order = _str_order(boxes)
+        rings = [rings[i] for i in order]
+
+        sizes = np.array([len(r) for r in rings], dtype=np.int64)
+        edge_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        starts = np.concatenate(rings) if rings else np.empty((0, 2))
+        ends = np.concatenate([np.roll(r, -1, axis=0) for r in rings]) if rings else np.empty((0, 2))
+
+        level_boxes = [_padded(boxes[order].T)]
+        while level_boxes[-1].shape[1] > ROOT_SCAN_LIMIT:
+            level_boxes.append(_padded(_parent_boxes(level_boxes[-1])))
+
+        slope = _slopes(starts[:, 0], lon_span=ends[:, 1] - starts[:, 1], lat2=ends[:, 0])
+        edges = np.stack([starts[:, 0], ends[:, 0], starts[:, 1], slope])
+        return cls(np.asarray(names, dtype=str)[order] if len(order) else np.empty(0, dtype='<U1'),
+                   np.asarray(pins, dtype=str)[order] if len(order) else np.empty(0, dtype='<U1'),
+                   edge_offsets, edges, level_boxes)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "PolygonIndex":
+        """Load locality,pin,vertices rows; vertices are 'lat long' pairs separated by ';'"""
+        names, pins, rings = [], [], []
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        try:
+                            ring = [tuple(float(v) for v in pair.split()) for pair in row['vertices'].split(';')]
+                        except (KeyError, AttributeError, ValueError):
+                            continue
+                        if len(ring) < 3:
+                            continue
+                        names.append(row['locality'])
+                        pins.append(row.get('pin') or '')
+                        rings.append(ring)
+            except Exception as e:
+                print(f"Warning: Could not load locality boundaries: {e}")
+        return cls.from_polygons(names, pins, rings)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, prefix: str = "localities") -> "PolygonIndex":
+        levels = snapshot.tables[f"{prefix}.levels"]
+        return cls(*(snapshot.array(f"{prefix}.{name}") for name in _ARRAYS),
+                   level_boxes=[snapshot.array(f"{prefix}.boxes{level}") for level in range(levels)])
+
+    def to_snapshot(self, prefix: str = "localities") -> Tuple[Dict[str, np.ndarray], Dict[str, int]]:
+        arrays = {f"{prefix}.{name}": getattr(self, name) for name in _ARRAYS}
+        arrays.update({f"{prefix}.boxes{level}": boxes for level, boxes in enumerate(self.level_boxes)})
+        return arrays, {f"{prefix}.levels": len(self.level_boxes)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _box_candidates(self, lat: float, lon: float) -> np.ndarray:
+        """Polygons whose bounding box holds the point, found by descending the R-tree"""
+        top = self.level_boxes[-1]
+        nodes = np.flatnonzero((top[0] <= lat) & (lat <= top[2]) & (top[1] <= lon) & (lon <= top[3]))
+        for level in range(len(self.level_boxes) - 2, -1, -1):
+            if len(nodes) == 0:
+                break
+            # Children of node j are boxes [j * NODE_CAPACITY, (j + 1) * NODE_CAPACITY) one level down;
+            # levels are padded to whole nodes with empty boxes, so no bounds check is needed
+            children = (nodes[:, None] * NODE_CAPACITY + _CHILD_SLOTS).ravel()
+            boxes = self.level_boxes[level][:, children]
+            nodes = children[(boxes[0] <= lat) & (lat <= boxes[2]) & (boxes[1] <= lon) & (lon <= boxes[3])]
+        return nodes
+
+    def containing(self, lat: float, lon: float) -> List[int]:
+        """Positions of every polygon containing the point"""
+        if len(self.names) == 0:
+            return []
+        candidates = self._box_candidates(lat, lon)
+        if len(candidates) == 0:
+            return []
+
+        lo, hi = self.edge_offsets[candidates], self.edge_offsets[candidates + 1]
+        if len(candidates) == 1:
+            lat1, lat2, lon1, slope = self.edges[:, int(lo[0]):int(hi[0])]
+            return candidates.tolist() if np.count_nonzero(_crossings(lat, lon, lat1, lat2, lon1, slope)) & 1 else []
+
+        # Concatenated edge ranges of all candidates, without a Python loop
+        sizes = hi - lo
+        firsts = np.cumsum(sizes) - sizes
+        lat1, lat2, lon1, slope = self.edges[:, np.repeat(lo - firsts, sizes) + np.arange(int(sizes.sum()))]
+        # Odd crossing count per candidate: runs of edges are contiguous in candidate order
+        inside = np.logical_xor.reduceat(_crossings(lat, lon, lat1, lat2, lon1, slope), firsts)
+        return candidates[inside].tolist()
+
+    def localities_at(self, lat: float, lon: float) -> List[Dict[str, str]]:
+        """[{"locality", "pin"}] for every boundary containing the point"""
+        return [{"locality": str(self.names[i]), "pin": str(self.pins[i])} for i in self.containing(lat, lon)]
+
+    def has_locality(self, locality: str) -> bool:
+        """True if a boundary is known for this locality name (case-insensitive)"""
+        return locality.lower() in self._known_names
+
+
+_ARRAYS = ("names", "pins", "edge_offsets", "edges")
+
+_CHILD_SLOTS = np.arange(NODE_CAPACITY)
+
+
+def _str_order(boxes: np.ndarray) -> np.ndarray:
+    """Sort-Tile-Recursive order: vertical slices by centre longitude, each sorted by centre latitude"""
+    n = len(boxes)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    centre_lat = (boxes[:, 0] + boxes[:, 2]) / 2
+    centre_lon = (boxes[:, 1] + boxes[:, 3]) / 2
+    leaves = math.ceil(n / NODE_CAPACITY)
+    slice_size = math.ceil(math.sqrt(leaves)) * NODE_CAPACITY
+
+    by_lon = np.argsort(centre_lon, kind='stable')
+    slice_of = np.empty(n, dtype=np.int64)
+    slice_of[by_lon] = np.arange(n) // slice_size
+    return np.lexsort((centre_lat, slice_of))
+
+
+def _padded(boxes: np.ndarray) -> np.ndarray:
+    """Append empty boxes (min > max) up to a whole number of nodes"""
+    missing = -boxes.shape[1] % NODE_CAPACITY
+    empty = np.array([[np.inf], [np.inf], [-np.inf], [-np.inf]]).repeat(missing, axis=1)
+    return np.ascontiguousarray(np.concatenate([boxes, empty], axis=1))
+
+
+def _parent_boxes(boxes: np.ndarray) -> np.ndarray:
+    """Union of each consecutive run of NODE_CAPACITY boxes"""
+    starts = np.arange(0, boxes.shape[1], NODE_CAPACITY)
+    return np.stack([
+        np.minimum.reduceat(boxes[0], starts),
+        np.minimum.reduceat(boxes[1], starts),
+        np.maximum.reduceat(boxes[2], starts),
+        np.maximum.reduceat(boxes[3], starts),
+    ])
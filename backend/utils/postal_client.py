@@ -0,0 +1,186 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+POSTAL_API_URL = os.getenv("POSTAL_API_URL", "https://api.postalpincode.in")
+POSTAL_API_TIMEOUT = float(os.getenv("POSTAL_API_TIMEOUT", 2.0))
+POSTAL_CACHE_SIZE = int(os.getenv("POSTAL_CACHE_SIZE", 4096))
+POSTAL_CACHE_TTL = float(os.getenv("POSTAL_CACHE_TTL", 24 * 3600))
+POSTAL_NEGATIVE_TTL = float(os.getenv("POSTAL_NEGATIVE_TTL", 600))
+POSTAL_MAX_CONNECTIONS = int(os.getenv("POSTAL_MAX_CONNECTIONS", 20))
+
+UNAVAILABLE = {"available": False}
+
+
+class TTLCache:
+    """Small LRU cache whose entries also expire after a per-entry TTL"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+    closed -> open after `failure_threshold` failures; after `reset_timeout`
+    one trial call is let through (half-open) and its outcome decides.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+class PostalPinClient:
+    """
+    Async client for the India Post PIN lookup (api.postalpincode.in)
+
+    - pooled keep-alive connections via one httpx.AsyncClient
+    - TTL + LRU cache keyed by PIN, with shorter-lived negative entries
+    - single-flight: concurrent lookups of one PIN share a single request,
+      run as its own task so a cancelled caller doesn't cancel it for the rest
+    - circuit breaker: a failing upstream is skipped instead of awaited
+    """
+
+    def __init__(
+        self,
+        base_url: str = POSTAL_API_URL,
+        timeout: float = POSTAL_API_TIMEOUT,
+        cache_size: int = POSTAL_CACHE_SIZE,
+        ttl: float = POSTAL_CACHE_TTL,
+        negative_ttl: float = POSTAL_NEGATIVE_TTL,
+        breaker: Optional[CircuitBreaker] = None,
+        max_connections: int = POSTAL_MAX_CONNECTIONS,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.cache = TTLCache(cache_size)
+        self.breaker = breaker or CircuitBreaker()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    def get_cached(self, pin: str) -> Optional[Dict[str, Any]]:
+        """Cached lookup result for a PIN without touching the network"""
+        return self.cache.get(pin)
+
+    async def lookup(self, pin: str) -> Dict[str, Any]:
+        """Return {"available": bool, "offices": [...]} for a PIN"""
+        cached = self.cache.get(pin)
+        if cached is not None:
+            return cached
+
+        # Single-flight: piggyback on an in-progress request for the same PIN
+        task = self._in_flight.get(pin)
+        if task is None:
+            if not self.breaker.allow_request():
+                return {"available": False, "circuit_open": True}
+            task = asyncio.create_task(self._fetch(pin))
+            self._in_flight[pin] = task
+            task.add_done_callback(lambda done: self._fetch_done(pin, done))
+
+        # Cancelling a caller leaves the shared fetch running for the others
+        return await asyncio.shield(task)
+
+    def _fetch_done(self, pin: str, task: asyncio.Task):
+        if self._in_flight.get(pin) is task:
+            del self._in_flight[pin]
+        # A fetch that was cancelled or crashed still settles the breaker, so a half-open trial
+        # can't stay in flight forever (retrieving the exception also keeps asyncio quiet)
+        if task.cancelled() or task.exception() is not None:
+            self.breaker.record_failure()
+
+    async def _fetch(self, pin: str) -> Dict[str, Any]:
+        client = self._get_client()
+        try:
+            response = await client.get(f"{self.base_url}/pincode/{pin}")
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.HTTPError, ValueError):
+            # Transport errors are not cached; they only count against the breaker
+            self.breaker.record_failure()
+            return dict(UNAVAILABLE)
+
+        self.breaker.record_success()
+        if data and isinstance(data, list) and data[0].get('Status') == 'Success':
+            result = {"available": True, "offices": data[0].get('PostOffice') or []}
+            self.cache.set(pin, result, self.ttl)
+        else:
+            # Unknown PIN: remember the miss, but not for as long as a hit
+            result = dict(UNAVAILABLE)
+            self.cache.set(pin, result, self.negative_ttl)
+        return result
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers={"User-Agent": "DigiTrust-AVP/1.0"},
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=max(self.max_connections // 2, 1)),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
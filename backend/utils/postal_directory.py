@@ -0,0 +1,81 @@
+import csv
+import os
+from typing import Any, Dict, List, Optional
+
+
+# Bulk file columns -> keys used by the api.postalpincode.in PostOffice records
+FIELD_MAP = {
+    "office_name": "Name",
+    "branch_type": "BranchType",
+    "delivery_status": "DeliveryStatus",
+    "district": "District",
+    "division": "Division",
+    "region": "Region",
+    "state": "State",
+}
+
+
+class PostalDirectory:
+    """
+    Offline India Post directory: PIN -> post offices
+
+    Loaded once from a bulk CSV export. Office records use the same keys as
+    the postal API, and each PIN also gets a precomputed set of lowercase
+    district/division/region names so place checks are a set scan per PIN.
+    """
+
+    def __init__(self, data_dir: str, snapshot=None):
+        self.path = os.path.join(data_dir, "postal_directory.csv")
+        self.offices_by_pin: Dict[str, List[Dict[str, str]]] = {}
+        self.places_by_pin: Dict[str, frozenset] = {}
+
+        if snapshot is not None:
+            self.offices_by_pin = snapshot.tables["postal_directory"]
+        else:
+            self.load()
+        self._index_places()
+
+    def load(self):
+        """Load the bulk directory file"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    office = {api_key: row.get(column, '') for column, api_key in FIELD_MAP.items()}
+                    self.offices_by_pin.setdefault(row['pin'], []).append(office)
+        except Exception as e:
+            print(f"Warning: Could not load postal directory: {e}")
+
+    def _index_places(self):
+        self.places_by_pin = {pin: self._places(offices) for pin, offices in self.offices_by_pin.items()}
+
+    @staticmethod
+    def _places(offices: List[Dict[str, Any]]) -> frozenset:
+        return frozenset(
+            office.get(key, '').lower()
+            for office in offices
+            for key in ("District", "Division", "Region")
+            if office.get(key)
+        )
+
+    def __contains__(self, pin: str) -> bool:
+        return pin in self.offices_by_pin
+
+    def lookup(self, pin: str) -> Optional[Dict[str, Any]]:
+        """Directory entry in the postal client's result shape, or None if the PIN is unknown"""
+        offices = self.offices_by_pin.get(pin)
+        if offices is None:
+            return None
+        return {"available": True, "offices": offices, "source": "offline_directory"}
+
+    def matches_place(self, pin: str, city: str) -> bool:
+        """Does `city` appear in the district, division or region of any office for this PIN?"""
+        if not city:
+            return False
+        return any(city in place for place in self.places_by_pin.get(pin, ()))
+
+    def update(self, pin: str, offices: List[Dict[str, Any]]):
+        """Refresh one PIN (e.g. from a live postal API lookup)"""
+        self.offices_by_pin[pin] = offices
+        self.places_by_pin[pin] = self._places(offices)
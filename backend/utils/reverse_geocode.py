@@ -0,0 +1,96 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils import digipin as digipin_codec
+from utils.spatial_index import GridSpatialIndex
+
+
+# Known DIGIPIN cells are dense; PIN centroids are a few per district
+CELL_GRID_DEGREES = 0.01
+PIN_GRID_DEGREES = 0.1
+
+# Give up beyond these distances rather than report a far-away match
+MAX_CELL_DISTANCE_M = 25_000.0
+MAX_PIN_DISTANCE_M = 100_000.0
+
+
+class ReverseGeocoder:
+    """
+    Coordinate -> official DIGIPIN, nearest known DIGIPIN cell and nearest PIN
+
+    Known cells (the DIGIPIN grid) and PIN centroids each get a
+    GridSpatialIndex sized to their density; a query is an expanding
+    radius search on each plus an arithmetic DIGIPIN encode.
+    """
+
+    def __init__(self, cells: Dict[str, Dict[str, Any]], pin_centroids: Dict[str, Dict[str, Any]]):
+        self.cells = cells
+        self.pin_centroids = pin_centroids
+        self.cell_index = _build_index(cells, CELL_GRID_DEGREES)
+        self.pin_index = _build_index(pin_centroids, PIN_GRID_DEGREES)
+
+    def reverse(self, lat: float, lon: float) -> Dict[str, Any]:
+        official = None
+        if _in_digipin_bounds(lat, lon):
+            official = digipin_codec.encode(lat, lon)
+        return self._result(lat, lon, official)
+
+    def reverse_batch(self, points: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
+        """reverse() for many points; official DIGIPINs are encoded in one vectorized pass"""
+        if not points:
+            return []
+        lats = np.array([p[0] for p in points], dtype=np.float64)
+        lons = np.array([p[1] for p in points], dtype=np.float64)
+        inside = _in_digipin_bounds(lats, lons)
+        official = np.full(len(points), None, dtype=object)
+        if inside.any():
+            official[inside] = digipin_codec.encode_batch(lats[inside], lons[inside])
+        return [self._result(float(lat), float(lon), code) for lat, lon, code in zip(lats, lons, official)]
+
+    def _result(self, lat: float, lon: float, official: Optional[str]) -> Dict[str, Any]:
+        result = {"lat": lat, "long": lon, "digipin": official, "nearest_cell": None, "nearest_pin": None}
+
+        hit = self.cell_index.nearest(lat, lon, MAX_CELL_DISTANCE_M)
+        if hit:
+            code, distance_m = hit
+            row = self.cells[code]
+            result["nearest_cell"] = {
+                "digipin": code,
+                "lat": float(row["lat"]),
+                "long": float(row["long"]),
+                "locality": row.get("locality"),
+                "city": row.get("city"),
+                "pin": row.get("pin"),
+                "distance_m": round(distance_m, 1),
+            }
+
+        hit = self.pin_index.nearest(lat, lon, MAX_PIN_DISTANCE_M)
+        if hit:
+            pin, distance_m = hit
+            centroid = self.pin_centroids[pin]
+            result["nearest_pin"] = {
+                "pin": pin,
+                "district": centroid.get("district"),
+                "state": centroid.get("state"),
+                "distance_km": round(distance_m / 1000, 2),
+            }
+        return result
+
+
+def _build_index(points: Dict[str, Dict[str, Any]], cell_degrees: float) -> GridSpatialIndex:
+    labels, lats, lons = [], [], []
+    for label, point in points.items():
+        try:
+            lat, lon = float(point["lat"]), float(point["long"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        labels.append(label)
+        lats.append(lat)
+        lons.append(lon)
+    return GridSpatialIndex.from_points(lats, lons, labels, cell_degrees)
+
+
+def _in_digipin_bounds(lat, lon):
+    return ((lat >= digipin_codec.MIN_LAT) & (lat <= digipin_codec.MAX_LAT) &
+            (lon >= digipin_codec.MIN_LON) & (lon <= digipin_codec.MAX_LON))
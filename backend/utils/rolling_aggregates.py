@@ -0,0 +1,150 @@
+import threading
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.evidence_store import ColumnarEvidenceStore
+
+
+# "delivered within the last N days" windows (inclusive: age_days <= N)
+WINDOWS = (1, 7, 30, 90)
+MAX_WINDOW = max(WINDOWS)
+
+# Temporal decay: each delivery contributes 0.9 ** age_days
+DECAY_RATE = 0.9
+
+
+class DeliveryAggregate:
+    """
+    Rolling delivery statistics for one DIGIPIN
+
+    Per-day counts are only kept for the last MAX_WINDOW days. Window counts
+    are adjusted as days roll out of each window, and the decayed sum is
+    stored relative to `current_day`, so both appends and reads are O(1)
+    amortised no matter how long the delivery history is.
+    """
+
+    __slots__ = ("total", "most_recent", "current_day", "decayed_sum", "day_counts", "window_counts")
+
+    def __init__(self, current_day: int):
+        self.total = 0
+        self.most_recent: Optional[int] = None
+        self.current_day = current_day
+        self.decayed_sum = 0.0
+        self.day_counts: Dict[int, int] = {}
+        self.window_counts = {w: 0 for w in WINDOWS}
+
+    @classmethod
+    def from_days(cls, days: np.ndarray, current_day: int) -> "DeliveryAggregate":
+        """Seed from an array of delivery day ordinals (one entry per delivery)"""
+        agg = cls(current_day)
+        if len(days) == 0:
+            return agg
+        ages = current_day - days
+        agg.total = len(days)
+        agg.most_recent = int(days.max())
+        agg.decayed_sum = float(np.sum(DECAY_RATE ** ages.astype(np.float64)))
+        for w in WINDOWS:
+            agg.window_counts[w] = int(np.count_nonzero(ages <= w))
+        recent_days, counts = np.unique(days[ages <= MAX_WINDOW], return_counts=True)
+        agg.day_counts = {int(d): int(c) for d, c in zip(recent_days, counts)}
+        return agg
+
+    def advance(self, today: int):
+        """Roll windows and the decay reference forward to `today`"""
+        elapsed = today - self.current_day
+        if elapsed <= 0:
+            return
+
+        if elapsed > MAX_WINDOW:
+            # Everything we still hold per-day has aged out of some window; recount
+            for w in WINDOWS:
+                self.window_counts[w] = sum(c for d, c in self.day_counts.items() if today - d <= w)
+        else:
+            for w in WINDOWS:
+                # Days whose age goes from <= w to > w
+                for day in range(self.current_day - w, today - w):
+                    self.window_counts[w] -= self.day_counts.get(day, 0)
+
+        for day in [d for d in self.day_counts if today - d > MAX_WINDOW]:
+            del self.day_counts[day]
+
+        self.decayed_sum *= DECAY_RATE ** elapsed
+        self.current_day = today
+
+    def add(self, day: int, count: int = 1):
+        """Record `count` deliveries on `day` (ordinal)"""
+        age = self.current_day - day
+        self.total += count
+        if self.most_recent is None or day > self.most_recent:
+            self.most_recent = day
+        self.decayed_sum += count * DECAY_RATE ** age
+        for w in WINDOWS:
+            if age <= w:
+                self.window_counts[w] += count
+        if age <= MAX_WINDOW:
+            self.day_counts[day] = self.day_counts.get(day, 0) + count
+
+
+class DeliveryAggregates:
+    """
+    Per-DIGIPIN rolling delivery aggregates over a columnar delivery log
+
+    Each DIGIPIN's aggregate is seeded from its log slice the first time it
+    is read, then maintained incrementally by append().
+    """
+
+    def __init__(self, store: ColumnarEvidenceStore):
+        self.store = store
+        self._aggregates: Dict[str, DeliveryAggregate] = {}
+        self._appended = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.store) + self._appended
+
+    def _get(self, digipin: str, today: int, create: bool) -> Optional[DeliveryAggregate]:
+        agg = self._aggregates.get(digipin)
+        if agg is None:
+            rows = self.store.lookup(digipin)
+            if rows is None and not create:
+                return None
+            days = np.array([], dtype=np.int64) if rows is None else _day_ordinals(rows[self.store.time_column])
+            agg = DeliveryAggregate.from_days(days, today)
+            self._aggregates[digipin] = agg
+        agg.advance(today)
+        return agg
+
+    def stats(self, digipin: str, today: date) -> Optional[Dict]:
+        """Current aggregate view for a DIGIPIN, or None if it has no deliveries"""
+        with self._lock:
+            agg = self._get(digipin, today.toordinal(), create=False)
+            if agg is None or agg.total == 0:
+                return None
+            return {
+                "total": agg.total,
+                "most_recent": date.fromordinal(agg.most_recent),
+                "window_counts": dict(agg.window_counts),
+                "decayed_sum": agg.decayed_sum,
+            }
+
+    def append(self, digipin: str, day: date, today: date, count: int = 1):
+        """Record deliveries for a DIGIPIN in O(1)"""
+        self.append_many([(digipin, day, count)], today)
+
+    def append_many(self, deliveries: List[Tuple[str, date, int]], today: date):
+        """Record a batch of (digipin, day, count) deliveries under a single lock acquisition"""
+        today_ordinal = today.toordinal()
+        with self._lock:
+            for digipin, day, count in deliveries:
+                self._get(digipin, today_ordinal, create=True).add(day.toordinal(), count)
+                self._appended += count
+
+
+# Offset between numpy's day count (days since 1970-01-01) and date.toordinal()
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _day_ordinals(dates: np.ndarray) -> np.ndarray:
+    return dates.astype('datetime64[D]').astype(np.int64) + _EPOCH_ORDINAL
@@ -0,0 +1,137 @@
+import json
+import mmap
+import os
+import struct
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+SNAPSHOT_MAGIC = b"DTSNAP\0\0"
+SNAPSHOT_VERSION = 10
+ALIGNMENT = 64
+
+# magic, format version, header length
+_PREAMBLE = struct.Struct("<8sII")
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "evidence.snapshot")
+
+
+class EvidenceSnapshot:
+    """
+    Read-only view over a compiled evidence snapshot
+
+    Layout: fixed preamble, JSON header, then 64-byte aligned raw arrays.
+    Arrays are NumPy views straight onto the mmap, so every worker on a
+    host shares the same page cache instead of parsing its own copy.
+    Small reference tables live in the header as JSON.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not an evidence snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot version {version} does not match expected {SNAPSHOT_VERSION}")
+
+        header = json.loads(self._mmap[_PREAMBLE.size:_PREAMBLE.size + header_len])
+        self.built_at = header["built_at"]
+        self.sources = header["sources"]
+        self.tables = header["tables"]
+        self._array_specs = header["arrays"]
+
+    def array(self, name: str) -> np.ndarray:
+        spec = self._array_specs[name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        if count == 0:
+            return np.empty(spec["shape"], dtype=dtype)
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=spec["offset"]).reshape(spec["shape"])
+
+    def has_array(self, name: str) -> bool:
+        return name in self._array_specs
+
+    def is_fresh(self, data_dir: str) -> bool:
+        """True when every source CSV still has the size and mtime recorded at build time"""
+        for filename, recorded in self.sources.items():
+            stat = _source_stat(os.path.join(data_dir, filename))
+            if stat != recorded:
+                return False
+        return True
+
+
+def write_snapshot(
+    path: str, arrays: Dict[str, np.ndarray], tables: Dict[str, Any], data_dir: str, source_files: List[str]
+) -> None:
+    """Serialize arrays and JSON tables into a snapshot file (written atomically)"""
+    specs = {}
+    relative = {}
+    offset = 0
+    for name, arr in arrays.items():
+        offset = _align(offset)
+        relative[name] = offset
+        specs[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+
+    header = {
+        "built_at": datetime.utcnow().isoformat(),
+        "sources": {name: _source_stat(os.path.join(data_dir, name)) for name in source_files},
+        "tables": tables,
+        "arrays": specs,
+    }
+
+    # Array offsets are absolute, so grow the header until they stop moving it
+    data_start = _align(_PREAMBLE.size + len(json.dumps(header).encode()))
+    while True:
+        for name, spec in specs.items():
+            spec["offset"] = relative[name] + data_start
+        header_bytes = json.dumps(header).encode()
+        if _PREAMBLE.size + len(header_bytes) <= data_start:
+            break
+        data_start = _align(_PREAMBLE.size + len(header_bytes))
+    header_bytes = header_bytes.ljust(data_start - _PREAMBLE.size)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.seek(specs[name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+    os.replace(tmp_path, path)
+
+
+def open_snapshot(data_dir: str, path: Optional[str] = None) -> Optional[EvidenceSnapshot]:
+    """
+    Open the compiled snapshot if it exists and matches the CSVs in data_dir.
+    Returns None (callers fall back to parsing CSVs) when it is missing,
+    from another format version, or stale.
+    """
+    path = path or os.getenv("EVIDENCE_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = EvidenceSnapshot(path)
+    except (ValueError, OSError, struct.error) as e:
+        print(f"Warning: Ignoring evidence snapshot {path}: {e}")
+        return None
+    if not snapshot.is_fresh(data_dir):
+        print(f"Warning: Evidence snapshot {path} is stale, re-run build_snapshot.py")
+        return None
+    return snapshot
+
+
+def _source_stat(path: str) -> Optional[Dict[str, int]]:
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
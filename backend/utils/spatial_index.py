@@ -0,0 +1,115 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.distance import PreparedCentre
+
+
+METERS_PER_DEGREE_LAT = 111320.0
+
+# Default grid cell edge (~1.1 km of latitude)
+DEFAULT_CELL_DEGREES = 0.01
+
+
+class GridSpatialIndex:
+    """
+    Uniform lat/long grid over a set of points
+
+    Points are stored in flat arrays sorted by cell id (row-major over the
+    whole globe), so each grid row of a query window is one contiguous run
+    found with two binary searches. A radius query only computes distances
+    for the handful of points in the cells overlapping the search circle.
+    """
+
+    def __init__(self, cell_ids: np.ndarray, lats: np.ndarray, lons: np.ndarray, labels: np.ndarray,
+                 cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_ids = cell_ids
+        self.lats = lats
+        self.lons = lons
+        self.labels = labels
+        self.cell_degrees = cell_degrees
+        self._columns = int(round(360 / cell_degrees))
+
+    @classmethod
+    def from_points(cls, lats, lons, labels, cell_degrees: float = DEFAULT_CELL_DEGREES) -> "GridSpatialIndex":
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        labels = np.asarray(labels, dtype=str) if len(labels) else np.empty(0, dtype='<U1')
+        rows, cols = _rows_cols(lats, lons, cell_degrees)
+        cell_ids = rows * int(round(360 / cell_degrees)) + cols
+        order = np.argsort(cell_ids, kind='stable')
+        return cls(cell_ids[order], lats[order], lons[order], labels[order], cell_degrees)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, prefix: str) -> "GridSpatialIndex":
+        return cls(*(snapshot.array(f"{prefix}.{name}") for name in _ARRAYS),
+                   cell_degrees=snapshot.tables[f"{prefix}.cell_degrees"])
+
+    def to_snapshot(self, prefix: str) -> Tuple[Dict[str, np.ndarray], Dict[str, float]]:
+        arrays = {f"{prefix}.{name}": getattr(self, name) for name in _ARRAYS}
+        return arrays, {f"{prefix}.cell_degrees": self.cell_degrees}
+
+    def __len__(self) -> int:
+        return len(self.cell_ids)
+
+    def _candidates(self, lat: float, lon: float, radius_m: float) -> np.ndarray:
+        """Positions of points in grid cells overlapping the search circle's bounding box"""
+        dlat = radius_m / METERS_PER_DEGREE_LAT
+        dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        row0 = math.floor((lat - dlat + 90.0) / self.cell_degrees)
+        row1 = math.floor((lat + dlat + 90.0) / self.cell_degrees)
+        col0 = min(max(math.floor((lon - dlon + 180.0) / self.cell_degrees), 0), self._columns - 1)
+        col1 = min(max(math.floor((lon + dlon + 180.0) / self.cell_degrees), 0), self._columns - 1)
+
+        # One contiguous run of cell ids per grid row; both ends found in one vectorized search each
+        row_starts = np.arange(row0, row1 + 1, dtype=np.int64) * self._columns
+        lo = self.cell_ids.searchsorted(row_starts + col0, side='left')
+        hi = self.cell_ids.searchsorted(row_starts + col1, side='right')
+        runs = [np.arange(a, b) for a, b in zip(lo.tolist(), hi.tolist()) if b > a]
+        if not runs:
+            return np.empty(0, dtype=np.int64)
+        return runs[0] if len(runs) == 1 else np.concatenate(runs)
+
+    def _hits(self, centre: PreparedCentre, radius_m: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions and distances (metres) of points within radius_m, unordered"""
+        candidates = self._candidates(centre.lat, centre.lon, radius_m)
+        if len(candidates) == 0:
+            return candidates, np.empty(0)
+        distances = centre.distances_km(self.lats[candidates], self.lons[candidates]) * 1000.0
+        inside = distances <= radius_m
+        return candidates[inside], distances[inside]
+
+    def within(self, lat: float, lon: float, radius_m: float) -> List[Tuple[str, float]]:
+        """(label, distance in metres) for every point within radius_m, nearest first"""
+        hits, distances = self._hits(PreparedCentre(lat, lon), radius_m)
+        order = np.argsort(distances, kind='stable')
+        return [(str(self.labels[i]), float(d)) for i, d in zip(hits[order], distances[order])]
+
+    def nearest(self, lat: float, lon: float, max_radius_m: float) -> Optional[Tuple[str, float]]:
+        """
+        Closest point within max_radius_m, or None
+
+        Searches one cell's width first and doubles the radius until
+        something is found, so dense areas never scan the full window.
+        """
+        centre = PreparedCentre(lat, lon)
+        radius = self.cell_degrees * METERS_PER_DEGREE_LAT
+        while True:
+            hits, distances = self._hits(centre, min(radius, max_radius_m))
+            if len(hits):
+                i = int(np.argmin(distances))
+                return str(self.labels[hits[i]]), float(distances[i])
+            if radius >= max_radius_m:
+                return None
+            radius *= 2
+
+
+_ARRAYS = ("cell_ids", "lats", "lons", "labels")
+
+
+def _rows_cols(lats, lons, cell_degrees: float) -> Tuple[np.ndarray, np.ndarray]:
+    columns = int(round(360 / cell_degrees))
+    rows = np.floor((np.asarray(lats, dtype=np.float64) + 90.0) / cell_degrees).astype(np.int64)
+    cols = np.floor((np.asarray(lons, dtype=np.float64) + 180.0) / cell_degrees).astype(np.int64)
+    return rows, np.clip(cols, 0, columns - 1)
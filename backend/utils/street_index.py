@@ -0,0 +1,170 @@
+import csv
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Street-type abbreviations folded together when normalizing street names
+STREET_ABBREVIATIONS = {
+    "rd": "road",
+    "st": "street",
+    "ln": "lane",
+    "ave": "avenue",
+    "marg": "road",
+    "salai": "road",
+}
+
+
+def normalize_street(street: str) -> str:
+    """Lowercase, drop punctuation and expand common street-type abbreviations"""
+    text = re.sub(r"[.']", "", (street or "").lower())  # "M.G. Rd" -> "mg rd"
+    words = re.sub(r"[^a-z0-9 ]+", " ", text).split()
+    return " ".join(STREET_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def parse_house_number(house_no: str) -> Optional[int]:
+    """Leading house number, e.g. '12/345' -> 12, '7B' -> 7"""
+    match = re.search(r"\d+", house_no or "")
+    return int(match.group()) if match else None
+
+
+class StreetSegmentIndex:
+    """
+    House-number intervals per (DIGIPIN, normalized street)
+
+    All segments live in flat arrays sorted by (key, house_min), with
+    per-key offsets as in ColumnarEvidenceStore. `end_tree` is a max
+    segment tree over house_max in that order. A lookup binary-searches
+    for the last segment starting at or before h, then descends the tree
+    for the last segment up to there that ends at or after h: O(log n)
+    overall, however many segments overlap.
+    """
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, starts: np.ndarray,
+                 ends: np.ndarray, end_tree: np.ndarray, sides: np.ndarray):
+        self.keys = keys
+        self.offsets = offsets
+        self.starts = starts
+        self.ends = ends
+        self.end_tree = end_tree
+        self.sides = sides
+        self._leaves = len(end_tree) // 2
+
+    @classmethod
+    def from_records(cls, digipins: List[str], streets: List[str], house_min: List[int],
+                     house_max: List[int], sides: List[str]) -> "StreetSegmentIndex":
+        composite = np.array([_key(d, normalize_street(s)) for d, s in zip(digipins, streets)], dtype=str)
+        starts = np.asarray(house_min, dtype=np.int32)
+        ends = np.asarray(house_max, dtype=np.int32)
+        order = np.lexsort((starts, composite))
+        composite, starts, ends = composite[order], starts[order], ends[order]
+        sides = np.array(sides, dtype=str)[order]
+
+        keys, first = np.unique(composite, return_index=True)
+        offsets = np.append(first, len(composite)).astype(np.int64)
+        return cls(keys, offsets, starts, ends, _max_tree(ends), sides)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "StreetSegmentIndex":
+        digipins, streets, house_min, house_max, sides = [], [], [], [], []
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        try:
+                            low, high = int(row['house_min']), int(row['house_max'])
+                        except (KeyError, TypeError, ValueError):
+                            continue
+                        digipins.append(row['digipin'])
+                        streets.append(row['street'])
+                        house_min.append(low)
+                        house_max.append(high)
+                        sides.append(row.get('side') or '')
+            except Exception as e:
+                print(f"Warning: Could not load street segments: {e}")
+        return cls.from_records(digipins, streets, house_min, house_max, sides)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, prefix: str = "street_segments") -> "StreetSegmentIndex":
+        return cls(*(snapshot.array(f"{prefix}.{name}") for name in _ARRAYS))
+
+    def to_snapshot(self, prefix: str = "street_segments") -> Tuple[Dict[str, np.ndarray], Dict[str, list]]:
+        return {f"{prefix}.{name}": getattr(self, name) for name in _ARRAYS}, {}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _range(self, digipin: str, street: str) -> Optional[Tuple[int, int]]:
+        key = _key(digipin, normalize_street(street))
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return int(self.offsets[i]), int(self.offsets[i + 1])
+        return None
+
+    def has_street(self, digipin: str, street: str) -> bool:
+        return self._range(digipin, street) is not None
+
+    def find(self, digipin: str, street: str, house_number: int) -> Optional[Dict[str, Any]]:
+        """
+        Segment covering `house_number` on this street, or None
+
+        Returns {"house_min", "house_max", "side"} for the covering segment
+        that starts closest below the house number.
+        """
+        bounds = self._range(digipin, street)
+        if bounds is None:
+            return None
+        lo, hi = bounds
+        # Last segment starting at or before the house number
+        j = lo + int(np.searchsorted(self.starts[lo:hi], house_number, side='right')) - 1
+        if j < lo:
+            return None
+        # Segments in [lo, j] all start in time; the one nearest j that ends in time covers it
+        j = self._last_reaching(lo, j, house_number)
+        if j is None:
+            return None
+        return {"house_min": int(self.starts[j]), "house_max": int(self.ends[j]), "side": str(self.sides[j])}
+
+    def _last_reaching(self, lo: int, hi: int, house_number: int) -> Optional[int]:
+        """Largest i in [lo, hi] with ends[i] >= house_number, via end_tree"""
+        tree, leaves = self.end_tree, self._leaves
+        # Canonical nodes covering [lo, hi], collected so they can be visited right to left
+        left_nodes, right_nodes = [], []
+        l, r = lo + leaves, hi + leaves + 1
+        while l < r:
+            if l & 1:
+                left_nodes.append(l)
+                l += 1
+            if r & 1:
+                r -= 1
+                right_nodes.append(r)
+            l >>= 1
+            r >>= 1
+        for node in right_nodes + left_nodes[::-1]:
+            if tree[node] >= house_number:
+                # Descend, preferring the right child
+                while node < leaves:
+                    node = 2 * node + 1 if tree[2 * node + 1] >= house_number else 2 * node
+                return node - leaves
+        return None
+
+
+_ARRAYS = ("keys", "offsets", "starts", "ends", "end_tree", "sides")
+
+
+def _max_tree(values: np.ndarray) -> np.ndarray:
+    """Implicit max segment tree: node i covers children 2i and 2i+1, leaves start at len // 2"""
+    leaves = 1 << max(len(values) - 1, 0).bit_length()
+    tree = np.full(2 * leaves, np.iinfo(np.int32).min, dtype=np.int32)
+    tree[leaves:leaves + len(values)] = values
+    level = leaves
+    while level > 1:
+        tree[level // 2:level] = np.maximum(tree[level:2 * level:2], tree[level + 1:2 * level:2])
+        level //= 2
+    return tree
+
+
+def _key(digipin: str, street: str) -> str:
+    return f"{digipin}|{street}"
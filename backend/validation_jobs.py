@@ -0,0 +1,333 @@
+"""
+Asynchronous validation jobs
+
+/api/validate?mode=async stores the request with status "queued" and
+returns 202 straight away. The validation_requests table is the durable
+queue: a worker claims the oldest queued row by flipping it to
+"processing" with a conditional UPDATE (so any number of workers, in any
+number of processes, never claim the same job), scores it, stores the
+result and marks it "done" or "failed". ValidationJobPool runs a bounded
+number of worker tasks on the API's event loop; job_worker.py runs the
+same pool in a separate process. Jobs left "processing" by a worker that
+died are requeued once they go stale: at pool start and then every
+VALIDATION_SWEEP_INTERVAL seconds by whichever worker gets there first.
+A claim is stamped with claimed_at, and a worker only records its outcome
+while the row still carries its claim, so a slow job that was requeued and
+claimed again is stored once.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, ValidationRequest, Address, ValidationResult, Token, AuditLog
+from evidence_storage import store_evidence
+from scoring_engine import ScoringEngine
+from token_service import TokenService
+from utils.concurrency import run_blocking
+
+
+# Tunables
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", "4"))  # 0 leaves the queue to job_worker.py
+VALIDATION_QUEUE_CAPACITY = int(os.getenv("VALIDATION_QUEUE_CAPACITY", "10000"))
+VALIDATION_POLL_INTERVAL = float(os.getenv("VALIDATION_POLL_INTERVAL", "1.0"))
+VALIDATION_JOB_TIMEOUT = float(os.getenv("VALIDATION_JOB_TIMEOUT", "300"))
+VALIDATION_SWEEP_INTERVAL = float(os.getenv("VALIDATION_SWEEP_INTERVAL", "60"))
+
+TOKEN_MIN_ACS = 65  # VL2 threshold
+
+token_service = TokenService()
+
+
+class ValidationQueueFull(Exception):
+    """Raised when the number of queued jobs has reached VALIDATION_QUEUE_CAPACITY"""
+    pass
+
+
+def score_address(db: Session, scoring_engine: ScoringEngine, address_data: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Run the scoring engine with no write transaction open
+
+    Call before adding any rows to db. Any transaction the history
+    lookups opened is ended before returning, so the write that follows
+    holds the database lock only for as long as the inserts take.
+    """
+    try:
+        acs, evidence, reason_codes, suggestions, advanced_metrics = scoring_engine.calculate_acs(address_data, db)
+    finally:
+        db.rollback()
+    return {
+        "acs": acs,
+        "vl": scoring_engine.get_validation_level(acs),
+        "evidence": evidence,
+        "reason_codes": reason_codes,
+        "suggestions": suggestions,
+        "advanced_metrics": advanced_metrics,
+    }
+
+
+def persist_validation(db: Session, validation_request: ValidationRequest, address_data: Dict[str, str],
+                       scored: Dict[str, Any], claimed_at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """
+    Persist the outcome of score_address() in one transaction
+
+    Stores the evidence (one bulk insert) and the result, issues a
+    token when ACS reaches VL2, marks the request done and writes the
+    audit row, then commits once. The request row itself may still be
+    pending in the same transaction. Returns scored plus the issued
+    token id (or None).
+
+    A job worker passes the claimed_at of its claim: if the job has
+    since been requeued or claimed again, nothing is written and None is
+    returned.
+    """
+    validation_id = validation_request.id
+    user_id = validation_request.requester_id
+    acs, vl = scored["acs"], scored["vl"]
+    now = datetime.utcnow()
+
+    if claimed_at is None:
+        validation_request.status = "done"
+    elif not _update_claimed(db, validation_id, claimed_at, {"status": "done"}):
+        db.rollback()
+        return None
+
+    # Issue token if ACS is high enough (VL2 or VL3)
+    token = None
+    if acs >= TOKEN_MIN_ACS:
+        jwt_token, expires_at = token_service.create_validation_token(
+            validation_id, address_data, acs, vl, user_id
+        )
+        token = Token(validation_request_id=validation_id, jwt=jwt_token, issued_at=now,
+                      expires_at=expires_at, revoked=False)
+        db.add(token)
+
+    # Writes the request (when new) and the token, assigning token.id, without committing
+    db.flush()
+    token_id = token.id if token is not None else None
+
+    store_evidence(db, [(validation_id, scored["evidence"])], now)
+    db.add_all([
+        ValidationResult(validation_request_id=validation_id, acs=acs, vl=vl, reason_codes=scored["reason_codes"],
+                         suggestions=scored["suggestions"], token_id=token_id, created_at=now),
+        AuditLog(action="validation_completed", user_id=user_id,
+                 details_json={"validation_id": validation_id, "acs": acs, "vl": vl}, timestamp=now),
+    ])
+    db.commit()
+
+    return {**scored, "token_id": token_id}
+
+
+def queue_depth(db: Session) -> int:
+    """Number of jobs waiting to be claimed"""
+    return db.query(ValidationRequest).filter(ValidationRequest.status == "queued").count()
+
+
+def queue_position(db: Session, validation_request: ValidationRequest) -> int:
+    """Queued jobs that will be claimed before this one"""
+    return db.query(ValidationRequest).filter(
+        ValidationRequest.status == "queued",
+        or_(ValidationRequest.created_at < validation_request.created_at,
+            and_(ValidationRequest.created_at == validation_request.created_at,
+                 ValidationRequest.id < validation_request.id))
+    ).count()
+
+
+def claim_next_job(db: Session) -> Optional[Tuple[str, datetime]]:
+    """Move the oldest queued request to "processing"; returns (id, claimed_at), or None when the queue is empty"""
+    while True:
+        candidate = db.query(ValidationRequest.id).filter(ValidationRequest.status == "queued").order_by(
+            ValidationRequest.created_at, ValidationRequest.id
+        ).first()
+        if candidate is None:
+            return None
+        # Only one worker's UPDATE matches while the row is still queued; losers try the next row
+        now = datetime.utcnow()
+        claimed = db.query(ValidationRequest).filter(
+            ValidationRequest.id == candidate.id, ValidationRequest.status == "queued"
+        ).update({"status": "processing", "updated_at": now, "claimed_at": now}, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return candidate.id, now
+
+
+def requeue_stale_jobs(db: Session, timeout: float = VALIDATION_JOB_TIMEOUT) -> int:
+    """Return jobs stuck in "processing" for longer than timeout seconds to the queue"""
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+    requeued = db.query(ValidationRequest).filter(
+        ValidationRequest.status == "processing", ValidationRequest.updated_at < cutoff
+    ).update({"status": "queued", "updated_at": datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return requeued
+
+
+def _load_job(db: Session, validation_id: str) -> Optional[Dict[str, str]]:
+    validation_request = db.query(ValidationRequest).filter(ValidationRequest.id == validation_id).first()
+    if validation_request is None:
+        return None
+    address = db.query(Address).filter(Address.id == validation_request.address_id).first()
+    address_data = {field: getattr(address, field) or "" for field in
+                    ("house_no", "street", "locality", "city", "district", "state", "pin", "digipin")}
+    db.commit()  # Don't hold a transaction across the postal prefetch
+    return address_data
+
+
+def _update_claimed(db: Session, validation_id: str, claimed_at: datetime, values: Dict[str, Any]) -> bool:
+    """Update a job that still carries this claim and has no result yet; False if the claim was lost"""
+    return bool(db.query(ValidationRequest).filter(
+        ValidationRequest.id == validation_id,
+        ValidationRequest.status == "processing",
+        ValidationRequest.claimed_at == claimed_at,
+        ~exists().where(ValidationResult.validation_request_id == validation_id)
+    ).update({**values, "updated_at": datetime.utcnow()}, synchronize_session=False))
+
+
+def _run_job(db: Session, scoring_engine: ScoringEngine, validation_id: str, claimed_at: datetime,
+             address_data: Dict[str, str]) -> bool:
+    """Score and store a claimed job; False if another worker's claim stored (or will store) it instead"""
+    # Scores first: the request row is only read back in persist_validation's own short transaction
+    scored = score_address(db, scoring_engine, address_data)
+    validation_request = db.query(ValidationRequest).filter(ValidationRequest.id == validation_id).first()
+    try:
+        return persist_validation(db, validation_request, address_data, scored, claimed_at) is not None
+    except IntegrityError:
+        # Another worker stored this job's result first; that result stands
+        db.rollback()
+        if not db.query(exists().where(ValidationResult.validation_request_id == validation_id)).scalar():
+            raise
+        return False
+
+
+def _mark_failed(db: Session, validation_id: str, claimed_at: datetime, error: str) -> bool:
+    """Mark a claimed job failed unless its claim was lost or it already has a result"""
+    db.rollback()
+    if not _update_claimed(db, validation_id, claimed_at, {"status": "failed"}):
+        db.rollback()
+        return False
+    db.add(AuditLog(
+        action="validation_failed",
+        details_json={"validation_id": validation_id, "error": error},
+        timestamp=datetime.utcnow()
+    ))
+    db.commit()
+    return True
+
+
+class ValidationJobPool:
+    """Bounded set of asyncio worker tasks draining the validation job queue"""
+
+    def __init__(self, scoring_engine: ScoringEngine, session_factory=SessionLocal,
+                 workers: int = VALIDATION_WORKERS, poll_interval: float = VALIDATION_POLL_INTERVAL,
+                 capacity: int = VALIDATION_QUEUE_CAPACITY, job_timeout: float = VALIDATION_JOB_TIMEOUT,
+                 sweep_interval: float = VALIDATION_SWEEP_INTERVAL):
+        self.scoring_engine = scoring_engine
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.capacity = capacity
+        self.job_timeout = job_timeout
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks = []
+
+        self.stats = {"completed": 0, "failed": 0, "requeued": 0, "superseded": 0}
+
+    def check_capacity(self, db: Session):
+        """Raise ValidationQueueFull if another job would exceed the queue capacity"""
+        depth = queue_depth(db)
+        if depth >= self.capacity:
+            raise ValidationQueueFull(f"Validation queue full ({depth}/{self.capacity})")
+
+    def notify(self):
+        """Wake idle workers after a job was queued (they also poll every poll_interval)"""
+        self._wakeup.set()
+
+    async def start(self):
+        """Requeue stale jobs and start the worker tasks"""
+        if self._tasks or self.workers <= 0:
+            return
+        self._stopping = False
+        await self._sweep()
+        self._tasks = [asyncio.create_task(self._worker(), name=f"validation-worker-{i}")
+                       for i in range(self.workers)]
+
+    async def stop(self):
+        """Let workers finish their current job, then stop them"""
+        self._stopping = True
+        self._wakeup.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self) -> int:
+        """Requeue stale jobs, then process queued jobs in this task until the queue is empty; returns jobs processed"""
+        await self._sweep()
+        processed = 0
+        while (claim := await self._with_session(claim_next_job)) is not None:
+            await self.process(*claim)
+            processed += 1
+        return processed
+
+    async def process(self, validation_id: str, claimed_at: datetime):
+        """Score one job claimed at claimed_at; failures mark the job failed instead of raising"""
+        db = self.session_factory()
+        try:
+            # Each hop commits before returning, so no transaction is held across an await
+            address_data = await run_blocking(_load_job, db, validation_id)
+            if address_data is None:
+                return
+            try:
+                await self.scoring_engine.evidence_aggregator.prefetch_postal_data(address_data["pin"])
+                stored = await run_blocking(_run_job, db, self.scoring_engine, validation_id, claimed_at, address_data)
+            except Exception as e:
+                failed = await run_blocking(_mark_failed, db, validation_id, claimed_at, f"Validation failed: {str(e)}")
+                self.stats["failed" if failed else "superseded"] += 1
+            else:
+                self.stats["completed" if stored else "superseded"] += 1
+        finally:
+            db.close()
+
+    async def _sweep(self):
+        """Requeue stale jobs and schedule the next sweep"""
+        self._next_sweep = time.monotonic() + self.sweep_interval
+        self.stats["requeued"] += await self._with_session(requeue_stale_jobs, self.job_timeout)
+
+    async def _worker(self):
+        while not self._stopping:
+            if time.monotonic() >= self._next_sweep:
+                try:
+                    await self._sweep()
+                except Exception as e:
+                    print(f"Warning: could not requeue stale validation jobs: {e}")
+            try:
+                claim = await self._with_session(claim_next_job)
+            except Exception as e:
+                print(f"Warning: could not claim validation job: {e}")
+                claim = None
+            if claim is not None:
+                try:
+                    await self.process(*claim)
+                except Exception as e:
+                    print(f"Warning: validation job {claim[0]} could not be processed: {e}")
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _with_session(self, fn, *args):
+        db = self.session_factory()
+        try:
+            return await run_blocking(fn, db, *args)
+        finally:
+            db.close()
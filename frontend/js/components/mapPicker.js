@@ -53,15 +53,35 @@ function initMap() {
     });
 
     // Add click listener for map
-    map.on('click', (e) => {
-        // Find nearest DIGIPIN cell
-        const nearest = findNearestDigipin(e.latlng.lat, e.latlng.lng);
+    map.on('click', async (e) => {
+        // Find nearest DIGIPIN cell (backend index, falling back to the sample cells)
+        const nearest = await reverseGeocode(e.latlng.lat, e.latlng.lng)
+            || findNearestDigipin(e.latlng.lat, e.latlng.lng);
         if (nearest) {
             selectDigipinCell(nearest);
         }
     });
 }
 
+async function reverseGeocode(lat, lng) {
+    try {
+        const result = await apiRequest(`/api/geocode/reverse?lat=${lat}&long=${lng}`);
+        const cell = result.nearest_cell;
+        if (!cell) {
+            return null;
+        }
+        return {
+            digipin: cell.digipin,
+            lat: cell.lat,
+            lng: cell.long,
+            locality: cell.locality,
+            city: cell.city
+        };
+    } catch (error) {
+        return null;
+    }
+}
+
 function findNearestDigipin(lat, lng) {
     let nearest = null;
     let minDistance = Infinity;